@@ -115,20 +115,15 @@ class YuMeiYouJiaoFullTest:
             
             self.log_progress(f"📚 开始处理EPUB文件: {self.epub_path}")
             
-            # 提取章节（简化版本，实际应该使用EPUB解析）
-            import ebooklib
-            from ebooklib import epub
-            from bs4 import BeautifulSoup
+            # 提取章节（与主控程序共用 zipfile 直读的 EPUB 解析器）
+            from modules.epub_extractor import iter_epub_documents, parse_chapter
             
-            book = epub.read_epub(self.epub_path)
             chapters = {}
             
-            for idx, item in enumerate(book.get_items_of_type(ebooklib.ITEM_DOCUMENT)):
-                if item.get_name().endswith('.xhtml') or item.get_name().endswith('.html'):
-                    soup = BeautifulSoup(item.get_content(), 'html.parser')
-                    text = soup.get_text()
-                    if len(text.strip()) > 100:  # 过滤短内容
-                        chapters[f"Chapter_{idx:03d}"] = text.strip()
+            for idx, raw in enumerate(iter_epub_documents(self.epub_path)):
+                text = parse_chapter(raw)
+                if len(text) > 100:  # 过滤短内容
+                    chapters[f"Chapter_{idx:03d}"] = text
             
             self.log_progress(f"📖 提取到 {len(chapters)} 个有效章节")
             
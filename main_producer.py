@@ -6,28 +6,37 @@ CineCast 主控程序
 """
 
 import argparse
+import collections
+import concurrent.futures
+import functools
 import gc
+import hashlib
+import itertools
 import os
 import re
 import sys
 import json
 import logging
+import mmap
+import queue
+import threading
 import time
-import requests
-from bs4 import BeautifulSoup
-import ebooklib
-from ebooklib import epub
+import zipfile
+from openai import DefaultHttpxClient
 from pathlib import Path
+from typing import Iterator, Tuple
 
 # 添加项目根目录到Python路径
 project_root = Path(__file__).parent
 sys.path.insert(0, str(project_root))
 
 from modules.asset_manager import AssetManager
-from modules.llm_director import LLMScriptDirector, atomic_json_write
+from modules.llm_director import LLMScriptDirector, atomic_json_write, fsync_dir, read_json
 from modules.mlx_tts_engine import MLXRenderEngine, group_indices_by_voice_type
-from modules.cinematic_packager import CinematicPackager
-from logging.handlers import RotatingFileHandler
+from modules.cinematic_packager import CinematicPackager, prefetch_wavs
+from modules import tts_daemon
+from modules.epub_extractor import epub_document_names, parse_chapter as parse_epub_chapter
+from logging.handlers import MemoryHandler, RotatingFileHandler
 
 # 配置日志 - 使用轮转处理器防止日志文件无限增长
 logger = logging.getLogger(__name__)
@@ -50,9 +59,45 @@ file_handler.setLevel(logging.INFO)
 file_formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
 file_handler.setFormatter(file_formatter)
 
+
+class _BufferedLogHandler(MemoryHandler):
+    """批量落盘的文件日志：缓冲满、出现 WARNING 及以上或距上次落盘超过 flush_interval 秒时才写文件
+
+    把渲染循环中成串的 INFO 日志合并为一次写入；后台守护线程每隔 flush_interval 秒落盘一次，
+    即使之后再没有新日志，WebUI 轮询的日志尾部也最多滞后约一秒。
+    """
+
+    def __init__(self, target, capacity=256, flush_interval=1.0):
+        super().__init__(capacity, flushLevel=logging.WARNING, target=target)
+        self.flush_interval = flush_interval
+        self._last_flush = time.monotonic()
+        self._closed = threading.Event()
+        if flush_interval > 0:  # 间隔为 0 时每条记录都直接落盘，无需后台线程
+            threading.Thread(
+                target=self._flush_periodically, daemon=True, name="cinecast-log-flush"
+            ).start()
+
+    def _flush_periodically(self):
+        while not self._closed.wait(self.flush_interval):
+            if self.buffer:
+                self.flush()
+
+    def shouldFlush(self, record):
+        return (super().shouldFlush(record)
+                or time.monotonic() - self._last_flush >= self.flush_interval)
+
+    def flush(self):
+        super().flush()
+        self._last_flush = time.monotonic()
+
+    def close(self):
+        self._closed.set()
+        super().close()
+
+
 # 添加处理器
 logger.addHandler(console_handler)
-logger.addHandler(file_handler)
+logger.addHandler(_BufferedLogHandler(file_handler))
 
 # 渲染超时阈值（秒）。
 # 冷启动阈值：引擎刚初始化时，MLX 需要 JIT 编译 Metal 着色器，首次推理耗时较长。
@@ -60,6 +105,42 @@ ENGINE_COLD_START_THRESHOLD_SECONDS = 120.0
 # 热运行阈值：引擎热身完成后，正常渲染超过此值视为大模型幻觉/内存碎片化，触发引擎热重启。
 ENGINE_WARM_THRESHOLD_SECONDS = 45.0
 
+# 阶段三章节级混音清单文件名（位于 output_dir）
+MIX_MANIFEST_NAME = ".mix_manifest.json"
+
+# 阶段一剧本内容清单文件名（位于 script_dir）：剧本文件 -> 章节原文 SHA-256
+SCRIPT_MANIFEST_NAME = ".manifest.json"
+
+# 阶段二渲染清单文件名（位于 cache_dir）：剧本文件 -> 剧本内容与音色配置的 SHA-256
+RENDER_MANIFEST_NAME = ".render_manifest.json"
+
+# EPUB 文档数达到该值才启用进程池解析（子进程启动成本高于小书的串行解析耗时）
+EPUB_PARALLEL_MIN_ITEMS = 8
+
+# TXT 章节达到该字节数才经 mmap 读取（小文件直接 read 更省系统调用）
+TEXT_MMAP_MIN_BYTES = 64 * 1024
+
+
+def _read_text_file(path) -> str:
+    """读取 UTF-8 章节文本，行为与 Path.read_text 一致（非法编码同样抛出 UnicodeDecodeError）
+
+    大文件直接从只读映射解码为 str，省去先整块读入 bytes 副本再解码的那一份内存峰值；
+    含 \r 的文件需要换行符转换，仍交给文本模式读取。
+    """
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size >= TEXT_MMAP_MIN_BYTES:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                if mm.find(b'\r') < 0:
+                    return str(mm, 'utf-8')
+    return Path(path).read_text(encoding='utf-8')
+
+
+def _resolved_future(value) -> concurrent.futures.Future:
+    """返回已完成、结果为 value 的 Future"""
+    future = concurrent.futures.Future()
+    future.set_result(value)
+    return future
+
 class CineCastProducer:
     def __init__(self, config=None):
         """
@@ -75,20 +156,103 @@ class CineCastProducer:
         os.makedirs(self.script_dir, exist_ok=True)
         os.makedirs(self.cache_dir, exist_ok=True)
 
-    def _create_tts_engine(self):
-        """创建 MLX TTS 引擎，支持 1.7B Model Pool 配置
-        
-        Returns:
-            MLXRenderEngine: 配置好的 TTS 引擎实例
+    def _get_http_client(self) -> DefaultHttpxClient:
+        """LLM 服务共享的 keep-alive 连接池（懒加载）
+
+        连通性检查与每个 LLMScriptDirector 的 OpenAI 客户端复用同一组长连接，
+        上百次章节请求不再各自重复 TCP + TLS 握手。
+        """
+        client = getattr(self, "_http", None)
+        if client is None:
+            # 使用 OpenAI SDK 自带的 httpx 客户端类型，保证与所装 SDK 版本兼容
+            client = DefaultHttpxClient(timeout=120.0)
+            self._http = client
+        return client
+
+    def _close_http_client(self) -> None:
+        """关闭共享连接池（阶段一结束后不再访问 LLM）；之后再调用 _get_http_client 会重新创建"""
+        client = getattr(self, "_http", None)
+        if client is not None:
+            self._http = None
+            client.close()
+
+    @property
+    def director(self) -> LLMScriptDirector:
+        """主 LLM 剧本导演；共享连接池被 _close_http_client 关闭后，换绑到新建的连接池
+
+        只替换 OpenAI 客户端，导演的角色音色库等会话状态保持不变。
         """
+        director = getattr(self, "_director", None)
+        if director is not None and self._director_http is not getattr(self, "_http", None):
+            director.client = director.client.with_options(http_client=self._get_http_client())
+            self._director_http = self._http
+        return director
+
+    @director.setter
+    def director(self, director: LLMScriptDirector) -> None:
+        self._director = director
+        self._director_http = getattr(self, "_http", None)
+
+    def _tts_engine_config(self) -> dict:
+        """从全局配置中挑出 MLXRenderEngine 需要的键（本地引擎与守护进程共用）"""
         engine_config = {}
         for key in ("model_path_base", "model_path_design",
                     "model_path_custom", "model_path_fallback",
-                    "default_narrator_voice"):
+                    "default_narrator_voice", "tts_precision"):
             val = self.config.get(key)
             if val:
                 engine_config[key] = val
-        return MLXRenderEngine(self.config["model_path"], config=engine_config)
+        return engine_config
+
+    def _create_tts_engine(self):
+        """创建 MLX TTS 引擎，支持 1.7B Model Pool 配置
+
+        配置了 tts_daemon_socket 且守护进程存活、其模型路径与引擎配置与当前一致时，
+        返回连接常驻模型的客户端，省去模型冷加载；否则在当前进程加载本地引擎。
+        
+        Returns:
+            MLXRenderEngine | RemoteRenderEngine: 配置好的 TTS 引擎实例
+        """
+        socket_path = self.config.get("tts_daemon_socket")
+        engine_config = self._tts_engine_config()
+        if socket_path:
+            expected = tts_daemon.config_hash(self.config["model_path"], engine_config, self.cache_dir)
+            if tts_daemon.ping(socket_path, expected_hash=expected):
+                logger.info(f"🛰️ 连接常驻 TTS 守护进程: {socket_path}")
+                return tts_daemon.RemoteRenderEngine(socket_path)
+            if tts_daemon.ping(socket_path):
+                logger.warning("⚠️ 常驻 TTS 守护进程的模型配置与当前不一致，改为本地加载模型")
+        engine = MLXRenderEngine(self.config["model_path"], config=engine_config)
+        # 生产线上读取干音前都会经过 wait_for_writes()/destroy()，逐句渲染也可与下一句前向重叠写盘
+        engine.background_writes = True
+        return engine
+
+    def ensure_tts_daemon(self) -> bool:
+        """确保常驻 TTS 守护进程在运行（--daemon），成功后阶段二改走 socket 客户端"""
+        socket_path = self.config.get("tts_daemon_socket") or tts_daemon.DEFAULT_SOCKET_PATH
+        if not tts_daemon.launch(socket_path, self.config["model_path"], self._tts_engine_config(),
+                                 self.cache_dir):
+            logger.warning("⚠️ TTS 守护进程不可用，阶段二回退为本地加载模型")
+            return False
+        self.config["tts_daemon_socket"] = socket_path
+        return True
+
+    def _restart_tts_engine(self, engine):
+        """看门狗自愈：释放卡死的引擎并重新创建
+
+        守护进程客户端的 destroy() 只断开连接，重连会回到同一个卡死的进程，
+        因此先关闭（必要时强制结束）守护进程再重新拉起；拉起失败时 _create_tts_engine 回退本地引擎。
+        """
+        if isinstance(engine, tts_daemon.RemoteRenderEngine):
+            engine.close()
+            logger.info(f"🛰️ 正在重启 TTS 守护进程: {engine.socket_path}")
+            tts_daemon.stop(engine.socket_path)
+            self.ensure_tts_daemon()
+        elif hasattr(engine, 'destroy'):
+            engine.destroy()
+        del engine
+        gc.collect()
+        return self._create_tts_engine()
 
     def _get_default_config(self):
         """获取默认配置"""
@@ -110,7 +274,13 @@ class CineCastProducer:
             "global_cast": {},  # 🌟 外脑全局角色设定集（Character Bible）
             "custom_recaps": {},  # 🌟 外脑前情提要字典 {Chapter_NNN: recap_text}
             "enable_auto_recap": True,  # 🌟 是否启用本地LLM自动生成摘要
+            "llm_concurrency": 1,  # 🌟 阶段一同时解析的章节数（>1 时各章滑动窗口上下文独立，1 保持逐章串行）
+            "llm_prompt_cache": False,  # 🌟 为剧本解析的公共 System Prompt 前缀启用 DashScope 显式缓存（cache_control）
             "default_narrator_voice": "aiden",  # 🌟 默认旁白基底音色 (Qwen3-TTS Preset)
+            "tts_precision": None,  # 🌟 TTS 权重精度: "bf16" / "int8" / "int4" / "fp32"，None 保持模型自带精度
+            "tts_batch_size": 8,  # 🌟 同音色切片批量渲染的批大小（1 表示逐句渲染）
+            "overlap_script_and_tts": True,  # 🌟 阶段一写完一章剧本即交给阶段二渲染（流水线重叠）
+            "tts_daemon_socket": None,  # 🌟 常驻 TTS 守护进程的 Unix socket（None 表示每次在进程内加载模型）
         }
     
     def _initialize_components(self):
@@ -128,6 +298,8 @@ class CineCastProducer:
                 model_name=self.config.get("llm_model_name"),
                 base_url=self.config.get("llm_base_url"),
                 global_cast=self.config.get("global_cast", {}),
+                http_client=self._get_http_client(),
+                prompt_cache=bool(self.config.get("llm_prompt_cache")),
             )
             logger.info("✅ LLM剧本导演初始化完成")
             
@@ -141,7 +313,7 @@ class CineCastProducer:
             _path_keys = {"model_path_base", "model_path_design",
                           "model_path_custom", "model_path_fallback"}
             engine_config = {}
-            for key in (*_path_keys, "default_narrator_voice"):
+            for key in (*_path_keys, "default_narrator_voice", "tts_precision"):
                 val = self.config.get(key)
                 if val and key in _path_keys and not os.path.isabs(val):
                     val = os.path.join(project_root.parent, val)
@@ -228,19 +400,60 @@ class CineCastProducer:
 
         return recaps
 
-    def _extract_epub_chapters(self, epub_path: str) -> dict:
-        """🌟 从 EPUB 提取干净的章节文本字典 {章节名: 文本内容}"""
+    def _extract_epub_chapters(self, epub_path: str) -> Iterator[Tuple[str, str]]:
+        """🌟 从 EPUB 逐章产出干净的章节文本 (章节名, 文本内容)
+
+        生成器：调用方一次只持有一章的解码文本，整本书的字符串不会同时驻留内存。
+        直接用 zipfile 读取 OPF manifest 中的 XHTML 文档，不再经由 ebooklib
+        构建整本书的导航、元数据与全部资源对象。
+        """
         logger.info(f"📖 正在解析 EPUB 文件: {epub_path}")
-        book = epub.read_epub(epub_path)
-        chapters = {}
-        for idx, item in enumerate(book.get_items_of_type(ebooklib.ITEM_DOCUMENT)):
-            soup = BeautifulSoup(item.get_content(), 'html.parser')
-            text = soup.get_text(separator='\n')
-            clean_text = '\n'.join([line.strip() for line in text.split('\n') if line.strip()])
-            if len(clean_text) > 20: # 过滤极短废页（降低阈值以保留简短章节）
-                title = f"Chapter_{idx:03d}"
-                chapters[title] = clean_text
-        return chapters
+        with zipfile.ZipFile(epub_path) as z:
+            names = epub_document_names(z)
+            raws = (z.read(name) for name in names)
+            if len(names) >= EPUB_PARALLEL_MIN_ITEMS:
+                texts = self._parse_epub_items_parallel(raws, min(len(names), os.cpu_count() or 1))
+            else:
+                texts = (parse_epub_chapter(raw) for raw in raws)
+            try:
+                for idx, clean_text in enumerate(texts):
+                    if len(clean_text) > 20: # 过滤极短废页（降低阈值以保留简短章节）
+                        title = f"Chapter_{idx:03d}"
+                        yield title, clean_text
+            finally:
+                texts.close()
+
+    @staticmethod
+    def _parse_epub_items_parallel(raws: Iterator[bytes], workers: int) -> Iterator[str]:
+        """HTML 解析是纯 CPU 负载，交给进程池并行；按文档顺序逐个产出结果。
+
+        只保持 workers*2 个在途任务的滑动窗口，避免已读取/解析但尚未被消费的章节堆积在内存中。
+        """
+        ex = concurrent.futures.ProcessPoolExecutor(max_workers=workers)
+        pending = collections.deque()
+        remaining = iter(raws)
+        try:
+            for raw in itertools.islice(remaining, workers * 2):
+                pending.append(ex.submit(parse_epub_chapter, raw))
+            while pending:
+                text = pending.popleft().result()
+                raw = next(remaining, None)
+                if raw is not None:
+                    pending.append(ex.submit(parse_epub_chapter, raw))
+                yield text
+        finally:
+            # 调用方提前停止迭代（如试听只取首章）时，丢弃尚未开始的解析任务
+            ex.shutdown(wait=False, cancel_futures=True)
+
+    @staticmethod
+    def _iter_text_chapters(input_dir: str, text_files: list) -> Iterator[Tuple[str, str]]:
+        """按文件名顺序逐个读取 TXT 目录中的章节，读一章交一章。
+
+        文件在 yield 之前已关闭，生成器挂起期间不占用文件句柄。
+        """
+        for file_name in text_files:
+            content = _read_text_file(os.path.join(input_dir, file_name))
+            yield os.path.splitext(file_name)[0], content
     
     def check_api_connectivity(self):
         """前置检查：验证云端 API 连通性，优先使用用户配置的 LLM 参数"""
@@ -252,7 +465,7 @@ class CineCastProducer:
             return False
         try:
             api_endpoint = f"{base_url.rstrip('/')}/chat/completions"
-            response = requests.post(
+            response = self._get_http_client().post(
                 api_endpoint,
                 headers={
                     "Content-Type": "application/json",
@@ -327,16 +540,90 @@ class CineCastProducer:
                 return i
         return 0
 
+    @classmethod
+    def _inject_recap(cls, micro_script: list, chapter_name: str, recap_text: str) -> None:
+        """Insert the recap intro/body pair into *micro_script* in place.
+
+        Both units are spliced in with a single slice assignment at the index
+        returned by ``_find_recap_insert_index`` (so title / subtitle entries
+        stay first), shifting the tail of the list once instead of twice.
+        """
+        intro_unit = {
+            "chunk_id": f"{chapter_name}_recap_intro",
+            "type": "recap",
+            "speaker": "talkover",
+            "content": "前情提要：",
+            "pause_ms": 500
+        }
+        recap_unit = {
+            "chunk_id": f"{chapter_name}_recap_body",
+            "type": "recap",
+            "speaker": "talkover",
+            "content": recap_text,
+            "pause_ms": 1500
+        }
+        # 安全插入法：扫描第一个 narration/dialogue 位置，保持标题结构完整
+        insert_idx = cls._find_recap_insert_index(micro_script)
+        micro_script[insert_idx:insert_idx] = [intro_unit, recap_unit]
+
+    @staticmethod
+    def _chapter_content_digest(content: str, llm_mode: bool) -> str:
+        """章节原文指纹：规则旁白与 LLM 剧本的产出不同，解析模式一并计入"""
+        h = hashlib.sha256(b"llm\0" if llm_mode else b"pure\0")
+        h.update(content.encode("utf-8"))
+        return h.hexdigest()
+
+    def _load_script_manifest(self) -> dict:
+        """读取剧本内容清单 {剧本文件名: 原文指纹}，不存在或损坏时返回空清单"""
+        try:
+            chapters = read_json(os.path.join(self.script_dir, SCRIPT_MANIFEST_NAME)).get("chapters")
+            if isinstance(chapters, dict):
+                return chapters
+        except (OSError, ValueError, AttributeError):
+            pass
+        return {}
+
+    def _discard_cached_wavs(self, chunk_ids: list) -> None:
+        """删除作废的干音缓存，并登记给阶段二（流水线模式下它只在启动时扫描过一次缓存目录）"""
+        stale = getattr(self, "_stale_wavs", None)
+        if stale is None:
+            stale = self._stale_wavs = set()
+        for chunk_id in chunk_ids:
+            name = f"{chunk_id}.wav"
+            stale.add(name)
+            try:
+                os.remove(os.path.join(self.cache_dir, name))
+            except FileNotFoundError:
+                pass
+
+    def _reuse_script(self, source_file: str, chapter_name: str) -> list:
+        """复用原文完全相同的另一章剧本：去掉其前情提要，chunk_id 改挂到本章名下"""
+        old_prefix = source_file[:-len("_micro.json")] + "_"
+        new_prefix = f"{chapter_name}_"
+        reused = []
+        for item in self._load_script(source_file):
+            if item.get("type") == "recap":
+                continue  # 前情提要依赖上一章，由本章重新判定注入
+            item = dict(item)
+            chunk_id = str(item.get("chunk_id", ""))
+            if chunk_id.startswith(old_prefix):
+                item["chunk_id"] = new_prefix + chunk_id[len(old_prefix):]
+            reused.append(item)
+        return reused
+
     # ==========================================
     # 🎬 阶段一：剧本化与微切片 (Script & Micro-chunking)
     # ==========================================
-    def phase_1_generate_scripts(self, input_source, max_chapters=None, is_preview=False):
+    def phase_1_generate_scripts(self, input_source, max_chapters=None, is_preview=False,
+                                 on_script_ready=None):
         """阶段一：编剧期 (Qwen API) - 生成包含chunk_id和停顿时间的微切片剧本
 
         Args:
             input_source: EPUB文件路径或TXT目录路径
             max_chapters: 最多处理的章节数（None表示全部，试听模式传1）
             is_preview: 是否为试听模式（强制注入摘要、截断前10句）
+            on_script_ready: 可选回调，每章剧本就绪（新写入或已存在）后以剧本文件名调用，
+                供阶段二流水线消费
         """
         logger.info("\n" + "="*50 + "\n🎬 [阶段一] 编剧期 (Qwen API)\n" + "="*50)
         
@@ -349,16 +636,18 @@ class CineCastProducer:
 
         # 支持EPUB和TXT两种输入格式
         if input_source.endswith('.epub'):
-            chapters = self._extract_epub_chapters(input_source)
-            if not chapters:
+            chapter_iter = self._extract_epub_chapters(input_source)
+            first_chapter = next(chapter_iter, None)
+            if first_chapter is None:
                 logger.error("❌ EPUB 解析失败或无有效文本！")
                 return False
+            chapter_iter = itertools.chain([first_chapter], chapter_iter)
 
         # 🌟 修复：新增支持 WebUI 上传单文件 TXT 模式
         elif os.path.isfile(input_source) and input_source.endswith(('.txt', '.md')):
             try:
-                with open(input_source, 'r', encoding='utf-8') as f:
-                    chapters = {os.path.splitext(os.path.basename(input_source))[0]: f.read()}
+                content = _read_text_file(input_source)
+                chapter_iter = iter([(os.path.splitext(os.path.basename(input_source))[0], content)])
             except UnicodeDecodeError:
                 logger.error("❌ 文本读取失败：请确保你的 TXT 文件是标准的 UTF-8 编码！")
                 return False
@@ -368,26 +657,23 @@ class CineCastProducer:
 
         else:
             # 处理TXT目录
-            text_files = sorted([f for f in os.listdir(input_source) if f.endswith(('.txt', '.md'))])
+            with os.scandir(input_source) as it:
+                text_files = sorted(e.name for e in it
+                                    if e.name.endswith(('.txt', '.md')) and e.is_file())
             if not text_files:
                 logger.error(f"❌ 目录 {input_source} 为空，无法生成剧本！")
                 return False
-            chapters = {}
-            for file_name in text_files:
-                with open(os.path.join(input_source, file_name), 'r', encoding='utf-8') as f:
-                    chapters[os.path.splitext(file_name)[0]] = f.read()
+            chapter_iter = self._iter_text_chapters(input_source, text_files)
 
         # 🌟 试听模式优化：只处理前 max_chapters 个章节，避免全书解析
         if max_chapters is not None:
-            chapter_items = list(chapters.items())[:max_chapters]
-            chapters = dict(chapter_items)
+            chapter_iter = itertools.islice(chapter_iter, max_chapters)
             logger.info(f"🎧 试听模式：仅处理前 {max_chapters} 个章节")
         
         # 🌟 试听模式核心拦截：只取第一章，且只保留前1000字
         if is_preview:
-            first_chap_key = list(chapters.keys())[0]
-            first_chap_content = chapters[first_chap_key][:1000]
-            chapters = {first_chap_key: first_chap_content}
+            first_chap_key, first_chap_content = next(iter(chapter_iter))
+            chapter_iter = iter([(first_chap_key, first_chap_content[:1000])])
             logger.info(f"🎧 试听防卡死：已切断全书遍历，仅处理首章前1000字")
 
         # 🌟 项目级角色库物理隔离：根据输入文件名动态生成 cast_db_path
@@ -400,9 +686,16 @@ class CineCastProducer:
             base_url=self.config.get("llm_base_url"),
             global_cast=self.config.get("global_cast", {}),
             cast_db_path=cast_db_path,
+            http_client=self._get_http_client(),
+            prompt_cache=bool(self.config.get("llm_prompt_cache")),
+            # 上面的 check_api_connectivity 已验证过 API（纯净模式不访问 LLM），不再重复探测
+            verify_connection=False,
         )
-        prev_chapter_content = None  # 用于存储上一章内容
+        # 🌟 前情提要来源：上一个成功生成剧本的章节原文。用 Future 表示，并发模式下前一章尚未完成时，
+        # 需要自动摘要的章节在工作线程中等待其结果，失败章节不会成为摘要来源
+        recap_source = _resolved_future(None)
         failed_chapters = []
+        written_files = set()  # 本阶段写入的剧本与清单，循环结束后统一 fsync
 
         # 🌟 解析用户提供的前情提要（如果有）
         user_recaps = {}
@@ -415,160 +708,222 @@ class CineCastProducer:
         # 🌟 获取外脑提供的前情提要字典 (按章节名索引, 如 "Chapter_002")
         custom_recaps = self.config.get("custom_recaps", {})
 
-        story_chapter_index = 0  # 🌟 正文章节计数器，只对正文累加，确保与用户提供的第N章精确对齐
-        prev_chapter_name = None  # 🌟 用于小说集边界检测
-        for chapter_name, content in chapters.items():
-
-            # 🌟 先判定是否为正文（用于正文计数器累加）
-            is_main_text = True
-            non_main_keywords = ["版权", "目录", "出版", "ISBN", "序言", "致谢", "前言", "引言", "楔子", "Project Gutenberg"]
-            if len(content) < 500 or any(keyword in content[:200] for keyword in non_main_keywords):
-                is_main_text = False
-
-            # 辅助防御：如果物理文件名是 000 或 001，且开头没有明确的"第一章"标志，强制视为非正文
-            if re.search(r'(?i)chapter_00[01]\b', chapter_name) and not re.search(r'第[一1]章', content[:100]):
-                is_main_text = False
-
-            # 🌟 只有正文才累加计数器，确保与外部传入的第N章精确对齐！
-            if is_main_text:
-                story_chapter_index += 1
-
-            # 🌟 小说集 (Novella Collection) 故事边界检测与上下文重置
-            if self._is_new_story_start(chapter_name, content, prev_chapter_name):
-                director.reset_context()
-                prev_chapter_content = None  # 重置前情提要上下文，防止跨书摘要污染
-
-            prev_chapter_name = chapter_name
-            script_path = os.path.join(self.script_dir, f"{chapter_name}_micro.json")
-            if os.path.exists(script_path) and not is_preview:
-                logger.info(f"⏭️ 微切片剧本已存在，跳过: {chapter_name}")
-                # 保留已有章节的文本给下一章用
-                prev_chapter_content = content
-                continue
-                
-            logger.info(f"✍️ 正在调用 Qwen-Flash 解析剧本: {chapter_name} (字数: {len(content)})")
+        # 🌟 一次目录扫描代替逐章 os.path.exists 系统调用
+        with os.scandir(self.script_dir) as it:
+            existing_scripts = {e.name for e in it if e.is_file()}
+        # 🌟 内容清单：同名章节原文被修改时重新生成；原文相同的章节直接复用已有剧本，免去 LLM 调用
+        script_manifest = self._load_script_manifest()
+        manifest_path = os.path.join(self.script_dir, SCRIPT_MANIFEST_NAME)
+
+        # 🌟 章节级并发：LLM 调用放进线程池，剧本校验/落盘/清单/回调仍在主线程按章节顺序完成
+        llm_concurrency = max(1, int(self.config.get("llm_concurrency") or 1))
+        llm_pool = None
+        if llm_concurrency > 1 and not pure_mode and not is_preview:
+            llm_pool = concurrent.futures.ThreadPoolExecutor(
+                max_workers=llm_concurrency, thread_name_prefix="cinecast-llm")
+            logger.info(f"🚀 阶段一并发解析：同时处理 {llm_concurrency} 个章节")
+        in_flight = collections.deque()
+
+        def draft_script(chapter_director, chapter_name, content, is_main_text, reuse_source,
+                         prev_source, story_index):
+            """生成本章剧本与前情提要文本，所有 LLM 调用集中于此（并发模式下在线程池中执行）
+
+            prev_source 是 recap_source.result，仅在需要自动生成摘要时才取上一章原文。
+            """
+            if reuse_source is not None:
+                logger.info(f"♻️ 章节原文与 {reuse_source} 完全一致，复用剧本: {chapter_name}")
+                micro_script = self._reuse_script(reuse_source, chapter_name)
+            # 🌟 核心双轨制分流：纯净模式 或 非正文内容，直接走纯净旁白模式（免 LLM）
+            elif pure_mode or not is_main_text:
+                logger.info(f"⚡ {'纯净旁白模式' if pure_mode else '检测到附属文本(序言/版权)'}，启用免LLM规则解析: {chapter_name}")
+                micro_script = chapter_director.generate_pure_narrator_script(content, chapter_prefix=chapter_name)
+            else:
+                logger.info(f"✍️ 正在调用 Qwen-Flash 解析剧本: {chapter_name} (字数: {len(content)})")
+                # 🌟 Qwen-Flash 整章直出，设为 10000 既高效又绝对防止 32K 输出溢出
+                micro_script = chapter_director.parse_and_micro_chunk(
+                    content, chapter_prefix=chapter_name,
+                    max_length=10000  # 🌟 解除 4000 封印，对齐底层引擎的最佳甜点位
+                )
+
+            # 🌟 核心逻辑：智能前情提要判断（纯净模式下跳过）
+            recap_text = None
+            if micro_script and not pure_mode:
+                # 🌟 1. 强制最高优先级：只要用户/外脑提供了前情提要，无视章节长度，直接使用！
+                if chapter_name in custom_recaps:
+                    recap_text = custom_recaps[chapter_name]
+                    logger.info(f"📋 强制使用外脑提供的前情提要: {chapter_name}")
+                elif story_index in user_recaps:
+                    recap_text = user_recaps[story_index]
+                    logger.info(f"📋 强制使用用户提供的前情提要 (匹配正文第 {story_index} 章): {chapter_name}")
+
+                # 🌟 2. 如果用户没提供，再去判断是否是正文，以及是否需要大模型自动生成
+                elif self.config.get("enable_recap", True):
+                    if not is_main_text:
+                        logger.info(f"⏭️ 判定 {chapter_name} 为非正文/短章节，跳过生成前情摘要。")
+
+                    prev_content = prev_source() if is_main_text and self.config.get("enable_auto_recap", True) else None
+                    if prev_content is not None:
+                        if len(prev_content) >= 800:
+                            logger.info(f"🔄 正在为 {chapter_name} 生成前情摘要 (Map-Reduce 引擎)...")
+                            recap_text = chapter_director.generate_chapter_recap(prev_content)
+            return micro_script, recap_text
+
+        def finish_script(chapter_name, script_file, script_path, digest, stale_chunk_ids, draft) -> bool:
+            """校验并落盘一章剧本；draft() 返回 (剧本, 前情提要)。剧本生成成功即返回 True"""
+            drafted = False
             try:
-                # 🌟 核心双轨制分流：纯净模式 或 非正文内容，直接走纯净旁白模式（免 LLM）
-                if pure_mode or not is_main_text:
-                    logger.info(f"⚡ {'纯净旁白模式' if pure_mode else '检测到附属文本(序言/版权)'}，启用免LLM规则解析: {chapter_name}")
-                    micro_script = director.generate_pure_narrator_script(content, chapter_prefix=chapter_name)
-                else:
-                    # 🌟 Qwen-Flash 整章直出，设为 10000 既高效又绝对防止 32K 输出溢出
-                    micro_script = director.parse_and_micro_chunk(
-                        content, chapter_prefix=chapter_name,
-                        max_length=10000  # 🌟 解除 4000 封印，对齐底层引擎的最佳甜点位
-                    )
-                
+                micro_script, recap_text = draft()
+
                 # 验证生成的剧本数据结构
                 if not micro_script:
                     logger.error(f"❌ {chapter_name} 生成的微切片剧本为空，跳过该章节")
                     failed_chapters.append(chapter_name)
-                    continue
-                
-                # 🌟 核心逻辑：智能前情提要判断（纯净模式下跳过）
+                    return drafted
+
+                # 🌟 3. 执行提要注入
                 recap_injected = False
-                if not pure_mode:
-                    recap_text = None
-
-                    # 🌟 1. 强制最高优先级：只要用户/外脑提供了前情提要，无视章节长度，直接使用！
-                    if chapter_name in custom_recaps:
-                        recap_text = custom_recaps[chapter_name]
-                        logger.info(f"📋 强制使用外脑提供的前情提要: {chapter_name}")
-                    elif story_chapter_index in user_recaps:
-                        recap_text = user_recaps[story_chapter_index]
-                        logger.info(f"📋 强制使用用户提供的前情提要 (匹配正文第 {story_chapter_index} 章): {chapter_name}")
-                    
-                    # 🌟 2. 如果用户没提供，再去判断是否是正文，以及是否需要大模型自动生成
-                    elif self.config.get("enable_recap", True):
-                        if not is_main_text:
-                            logger.info(f"⏭️ 判定 {chapter_name} 为非正文/短章节，跳过生成前情摘要。")
-
-                        if is_main_text and self.config.get("enable_auto_recap", True) and prev_chapter_content is not None:
-                            if len(prev_chapter_content) >= 800:
-                                logger.info(f"🔄 正在为 {chapter_name} 生成前情摘要 (Map-Reduce 引擎)...")
-                                recap_text = director.generate_chapter_recap(prev_chapter_content)
-
-                    # 🌟 3. 执行提要注入
-                    if recap_text:
-                        intro_unit = {
-                            "chunk_id": f"{chapter_name}_recap_intro",
-                            "type": "recap",
-                            "speaker": "talkover",
-                            "content": "前情提要：",
-                            "pause_ms": 500
-                        }
-                        recap_unit = {
-                            "chunk_id": f"{chapter_name}_recap_body",
-                            "type": "recap",
-                            "speaker": "talkover",
-                            "content": recap_text,
-                            "pause_ms": 1500
-                        }
-                        # 安全插入法：扫描第一个 narration/dialogue 位置，保持标题结构完整
-                        insert_idx = self._find_recap_insert_index(micro_script)
-                        micro_script.insert(insert_idx, intro_unit)
-                        micro_script.insert(insert_idx + 1, recap_unit)
-                        recap_injected = True
+                if recap_text:
+                    self._inject_recap(micro_script, chapter_name, recap_text)
+                    recap_injected = True
 
                 # 🌟 试听强制注入逻辑（核心）
                 # 如果是试听模式，且原本这章没摘要（比如第一章），但用户传了外脑字典，我们就强行借用一条来试听！
                 if is_preview and not recap_injected and custom_recaps:
                     borrowed_recap = next(iter(custom_recaps.values()))
                     logger.info(f"🎧 试听连通性测试：强制借用一条前情提要进行 Talkover 音色验证！")
-                    intro_unit = {
-                        "chunk_id": f"{chapter_name}_recap_intro",
-                        "type": "recap",
-                        "speaker": "talkover",
-                        "content": "前情提要：",
-                        "pause_ms": 500
-                    }
-                    recap_unit = {
-                        "chunk_id": f"{chapter_name}_recap_body",
-                        "type": "recap",
-                        "speaker": "talkover",
-                        "content": borrowed_recap,
-                        "pause_ms": 1500
-                    }
-                    # 🌟 安全插入法：扫描第一个 narration/dialogue 位置，保持标题结构完整
-                    insert_idx = self._find_recap_insert_index(micro_script)
-                    micro_script.insert(insert_idx, intro_unit)
-                    micro_script.insert(insert_idx + 1, recap_unit)
-                
-                # 保存当前章的原始文本，供下一章使用
-                prev_chapter_content = content
-                
+                    self._inject_recap(micro_script, chapter_name, borrowed_recap)
+
+                drafted = True
+
                 # 🌟 试听模式极速截断：只保留前 10 句话（包含刚注入的提要）
                 if is_preview:
                     micro_script = micro_script[:10]
-                
+
                 # 验证每个片段都有必需的字段
-                valid = True
                 for i, item in enumerate(micro_script):
                     required_fields = ['chunk_id', 'type', 'speaker', 'content']
                     missing_fields = [field for field in required_fields if field not in item]
                     if missing_fields:
                         logger.error(f"❌ {chapter_name} 第{i+1}个片段缺少字段: {missing_fields}")
                         logger.error(f"   片段内容: {item}")
-                        valid = False
-                        break
+                        logger.error(f"❌ 章节 {chapter_name} 数据校验失败，跳过该章")
+                        failed_chapters.append(chapter_name)
+                        return drafted
 
-                if not valid:
-                    logger.error(f"❌ 章节 {chapter_name} 数据校验失败，跳过该章")
-                    failed_chapters.append(chapter_name)
-                    continue
-                
                 # 🌟 原子化写入：防止中断导致 JSON 损坏
                 atomic_json_write(script_path, micro_script)
+                written_files.add(script_file)
                 logger.info(f"✅ 生成微切片剧本: {script_path} ({len(micro_script)}个片段)")
+                if stale_chunk_ids:
+                    self._discard_cached_wavs(stale_chunk_ids)
+                if not is_preview:
+                    existing_scripts.add(script_file)
+                    script_manifest[script_file] = digest
+                    atomic_json_write(manifest_path, {"chapters": script_manifest})
+                    written_files.add(SCRIPT_MANIFEST_NAME)
+                if on_script_ready is not None:
+                    on_script_ready(script_file)
             except Exception as e:
                 logger.error(f"❌ 章节 {chapter_name} 解析严重失败，跳过该章: {e}")
                 import traceback
                 logger.error(f"详细错误信息:\n{traceback.format_exc()}")
                 failed_chapters.append(chapter_name)
-                continue
-                
+            return drafted
+
+        def settle_script(finish_args, content, source, prev_source):
+            """按章节顺序完成一章剧本，并确定下一章的前情提要来源：成功则为本章原文，否则沿用上一来源"""
+            source.set_result(content if finish_script(*finish_args) else prev_source.result())
+
+        story_chapter_index = 0  # 🌟 正文章节计数器，只对正文累加，确保与用户提供的第N章精确对齐
+        prev_chapter_name = None  # 🌟 用于小说集边界检测
+        try:
+            for chapter_name, content in chapter_iter:
+
+                # 🌟 先判定是否为正文（用于正文计数器累加）
+                is_main_text = True
+                non_main_keywords = ["版权", "目录", "出版", "ISBN", "序言", "致谢", "前言", "引言", "楔子", "Project Gutenberg"]
+                if len(content) < 500 or any(keyword in content[:200] for keyword in non_main_keywords):
+                    is_main_text = False
+
+                # 辅助防御：如果物理文件名是 000 或 001，且开头没有明确的"第一章"标志，强制视为非正文
+                if re.search(r'(?i)chapter_00[01]\b', chapter_name) and not re.search(r'第[一1]章', content[:100]):
+                    is_main_text = False
+
+                # 🌟 只有正文才累加计数器，确保与外部传入的第N章精确对齐！
+                if is_main_text:
+                    story_chapter_index += 1
+
+                # 🌟 小说集 (Novella Collection) 故事边界检测与上下文重置
+                if self._is_new_story_start(chapter_name, content, prev_chapter_name):
+                    director.reset_context()
+                    recap_source = _resolved_future(None)  # 重置前情提要上下文，防止跨书摘要污染
+
+                prev_chapter_name = chapter_name
+                script_file = f"{chapter_name}_micro.json"
+                script_path = os.path.join(self.script_dir, script_file)
+                digest = self._chapter_content_digest(content, not pure_mode and is_main_text)
+                # 清单中没有记录的旧剧本沿用"存在即跳过"
+                if (script_file in existing_scripts and not is_preview
+                        and script_manifest.get(script_file, digest) == digest):
+                    logger.info(f"⏭️ 微切片剧本已存在，跳过: {chapter_name}")
+                    # 保留已有章节的文本给下一章用
+                    recap_source = _resolved_future(content)
+                    if on_script_ready is not None:
+                        # 并发模式下先交付排在前面的章节，保持阶段二按章节顺序消费
+                        while in_flight:
+                            settle_script(*in_flight.popleft())
+                        on_script_ready(script_file)
+                    continue
+
+                # 原文已修改的同名章节：新剧本沿用同一批 chunk_id，旧干音必须随之作废
+                stale_chunk_ids = []
+                if script_file in existing_scripts and not is_preview:
+                    logger.info(f"📝 章节原文已修改，重新生成剧本: {chapter_name}")
+                    try:
+                        stale_chunk_ids = [item["chunk_id"] for item in self._load_script(script_file)]
+                    except (OSError, ValueError, KeyError, TypeError):
+                        pass
+
+                reuse_source = None
+                if not is_preview:
+                    reuse_source = next((f for f, d in script_manifest.items()
+                                         if d == digest and f != script_file and f in existing_scripts), None)
+
+                if llm_pool is None:
+                    draft = functools.partial(draft_script, director, chapter_name, content, is_main_text,
+                                              reuse_source, recap_source.result, story_chapter_index)
+                    if finish_script(chapter_name, script_file, script_path, digest, stale_chunk_ids, draft):
+                        # 保存当前章的原始文本，供下一章使用
+                        recap_source = _resolved_future(content)
+                    continue
+
+                # 并发模式：每章使用独立滑动窗口的导演分身；本章的摘要来源在上一章完成后才确定
+                future = llm_pool.submit(draft_script, director.fork(), chapter_name, content, is_main_text,
+                                         reuse_source, recap_source.result, story_chapter_index)
+                chapter_source = concurrent.futures.Future()
+                in_flight.append(((chapter_name, script_file, script_path, digest, stale_chunk_ids, future.result),
+                                  content, chapter_source, recap_source))
+                recap_source = chapter_source
+                while len(in_flight) > llm_concurrency:
+                    settle_script(*in_flight.popleft())
+
+            while in_flight:
+                settle_script(*in_flight.popleft())
+        finally:
+            if llm_pool is not None:
+                # 异常中止时唤醒仍在等待前情提要来源的工作线程
+                for _, _, source, _ in in_flight:
+                    source.cancel()
+                llm_pool.shutdown(wait=False, cancel_futures=True)
+            # 阶段二/三只跑本地模型与混音，提前释放空闲的 keep-alive 长连接
+            self._close_http_client()
+
         # 阶段一完成（Qwen API 无需释放本地内存）
 
+        # 🌟 逐章写入只做原子 rename，不逐个 fsync；整个阶段结束后一次性落盘（目录只同步一次）
+        if written_files:
+            fsync_dir(self.script_dir, sorted(written_files))
+
         if failed_chapters:
             logger.warning(f"⚠️ 以下章节处理失败: {', '.join(failed_chapters)}")
 
@@ -633,13 +988,13 @@ class CineCastProducer:
                 self.phase_1_generate_scripts(input_source, is_preview=True)
 
                 # 找到第一个生成的剧本
-                script_files = sorted([f for f in os.listdir(self.script_dir) if f.endswith('_micro.json')])
+                with os.scandir(self.script_dir) as it:
+                    script_files = sorted(e.name for e in it if e.name.endswith('_micro.json'))
                 if not script_files:
                     raise Exception(f"未找到剧本，请检查阶段一是否成功 (script_dir={self.script_dir})")
 
                 first_script_path = os.path.join(self.script_dir, script_files[0])
-                with open(first_script_path, 'r', encoding='utf-8') as f:
-                    micro_script = json.load(f)
+                micro_script = read_json(first_script_path)
 
                 # 🌟 核心截断：只取前 10 句！
                 preview_script = micro_script[:10]
@@ -669,16 +1024,6 @@ class CineCastProducer:
 
     def _render_script_chunks(self, micro_script: list):
         """渲染指定的微切片列表为干音 WAV 文件（供试听模式直接调用）"""
-        from modules.mlx_tts_engine import MLXRenderEngine, group_indices_by_voice_type
-
-        # 构建引擎配置（支持 1.7B Model Pool）
-        engine_config = {}
-        for key in ("model_path_base", "model_path_design",
-                    "model_path_custom", "model_path_fallback"):
-            val = self.config.get(key)
-            if val:
-                engine_config[key] = val
-
         engine = self._create_tts_engine()
 
         voice_groups = group_indices_by_voice_type(micro_script)
@@ -715,130 +1060,271 @@ class CineCastProducer:
     # ==========================================
     # 🎙️ 阶段二：纯净干音渲染 (Dry Voice Rendering)
     # ==========================================
-    def phase_2_render_dry_audio(self):
+    def phase_2_render_dry_audio(self, script_queue=None):
         """阶段二：录音期 (MLX TTS) - 纯净干音渲染，只产生WAV文件
         
         Uses a "group-by-voice" strategy: chunks sharing the same voice type
         are rendered consecutively to minimise MLX embedding switches.
+
+        Args:
+            script_queue: 可选，流水线模式下的剧本文件名队列（以 None 结束）；
+                不传时按文件名顺序渲染 script_dir 下的全部剧本。
         """
         logger.info("\n" + "="*50 + "\n🎙️ [阶段二] 录音期 (MLX TTS)\n" + "="*50)
 
-        # 构建引擎配置（支持 1.7B Model Pool）
-        engine_config = {}
-        for key in ("model_path_base", "model_path_design",
-                    "model_path_custom", "model_path_fallback"):
-            val = self.config.get(key)
-            if val:
-                engine_config[key] = val
-
-        engine = self._create_tts_engine()
+        # 🌟 引擎延迟到拿到第一份剧本时才加载：流水线模式下不会在阶段一尚未产出时空占内存，
+        # 且 MLX 的加载与推理都发生在同一个（消费者）线程里
+        engine = None
 
         # 🔥 预热：在渲染开始前预加载模型，利用 M4 统一内存带宽优势
         warmup_modes = ["preset"]
-        if engine_config.get("model_path_base"):
+        if self.config.get("model_path_base"):
             warmup_modes.append("clone")
-        engine.warmup(warmup_modes)
         
         # 全局冷启动标记，引擎刚初始化时必定是冷启动
         is_cold_start = True
         
-        script_files = sorted([f for f in os.listdir(self.script_dir)
-                               if f.endswith('_micro.json') and not f.startswith('_preview_')])
+        if script_queue is None:
+            script_files = self._list_script_files()
+        else:
+            script_files = iter(script_queue.get, None)
+        # 🌟 一次目录扫描建立干音缓存集合，断点续传判断不再逐片段 stat
+        with os.scandir(self.cache_dir) as it:
+            cached_wavs = {e.name for e in it if e.name.endswith('.wav')}
+        render_manifest_path = os.path.join(self.cache_dir, RENDER_MANIFEST_NAME)
+        render_manifest = self._load_mix_manifest(render_manifest_path)["chapters"]
+        manifest_dirty = False
+        batch_size = max(1, int(self.config.get("tts_batch_size", 8)))
+        # 热循环中反复使用的属性/函数绑定为局部变量（engine 会被看门狗重建，不做绑定）
+        cache_dir = self.cache_dir
+        join = os.path.join
+        get_voice = self.assets.get_voice_for_role
         total_chunks = 0
         rendered_chunks = 0
         
+        # 🌟 跨章节凑批：同一音色在各章不足一批的尾部切片先挂起，由后续章节补齐整批，
+        # 全部剧本处理完后再渲染剩余部分；小配角散落在多章的台词也能走批量前向
+        carry = {}  # 音色配置指纹 -> (voice_cfg, [待渲染切片])
+
+        def render_timed(items, voice_cfg, save_paths):
+            """渲染一组切片并套用看门狗；超时则销毁脏音频、重启引擎并返回 False"""
+            nonlocal engine, is_cold_start
+            start_time = time.time()
+
+            try:
+                if len(items) == 1:
+                    outcomes = [engine.render_dry_chunk(items[0]["content"], voice_cfg, save_paths[0])]
+                else:
+                    outcomes = engine.render_dry_batch(
+                        [item["content"] for item in items], voice_cfg, save_paths
+                    )
+                for item, success in zip(items, outcomes):
+                    if not success:
+                        logger.error(
+                            f"🔇 渲染返回失败: chunk_id={item.get('chunk_id')}, "
+                            f"speaker={item.get('speaker')}, "
+                            f"content='{item['content'][:50]}...'"
+                        )
+            except Exception as e:
+                import traceback
+                logger.error(
+                    f"❌ 渲染异常: chunk_id={','.join(str(item.get('chunk_id')) for item in items)}, "
+                    f"speaker={items[0].get('speaker')}, "
+                    f"content='{items[0]['content'][:50]}...', "
+                    f"error={e}"
+                )
+                logger.error(f"📋 异常堆栈:\n{traceback.format_exc()}")
+
+            elapsed_time = time.time() - start_time
+
+            # 动态看门狗阈值（冷启动120秒，热运行45秒）；真正的批量前向按切片数放宽
+            timeout_threshold = ENGINE_COLD_START_THRESHOLD_SECONDS if is_cold_start else ENGINE_WARM_THRESHOLD_SECONDS
+            timeout_threshold *= len(items)
+
+            if elapsed_time > timeout_threshold:
+                logger.warning(
+                    f"🚨 严重警告: 切片 {items[0].get('chunk_id')} 等 {len(items)} 个片段渲染耗时 "
+                    f"{elapsed_time:.1f} 秒！(当前阈值: {timeout_threshold}s)"
+                )
+                # 🔥 销毁超时产生的脏音频，防止污染混音（先等后台写入落盘，避免删除后被重新写出）
+                if hasattr(engine, 'wait_for_writes'):
+                    engine.wait_for_writes()
+                for save_path in save_paths:
+                    if os.path.exists(save_path):
+                        os.remove(save_path)
+                        logger.info(f"🗑️ 已销毁超时产生的脏音频: {save_path}")
+                logger.info("🔄 正在触发引擎自愈重置协议...")
+                # destroy() 已显式释放模型显存，新引擎加载时不会与旧权重叠加
+                engine = self._restart_tts_engine(engine)
+                logger.info("✅ 引擎热重启完成，恢复生产！")
+                # 重启后的下一个片段又将面临 JIT 编译，重置为冷启动状态
+                is_cold_start = True
+                return False
+            # 渲染在阈值内平稳度过，引擎热身完毕，切换为严苛状态
+            is_cold_start = False
+            return True
+
+        def render_batch(batch, voice_cfg):
+            nonlocal rendered_chunks
+            save_paths = [join(cache_dir, f"{item['chunk_id']}.wav") for item in batch]
+
+            # 只有真正走 batch_generate 时才按整批计时；无法批量的音色逐句渲染、逐句看门狗
+            batched = False
+            if len(batch) > 1 and hasattr(engine, "can_batch"):
+                try:
+                    batched = engine.can_batch(voice_cfg)
+                except Exception as e:
+                    logger.warning(f"⚠️ 批量能力检查失败 ({e})，逐句渲染")
+            if batched and render_timed(batch, voice_cfg, save_paths):
+                singles = []
+            else:
+                # 整批超时的切片同样在重启后的引擎上逐句重渲
+                singles = range(len(batch))
+            for pos in singles:
+                # 超时的切片在引擎重启后重新渲染一次，仍超时才放弃
+                for _attempt in range(2):
+                    if render_timed([batch[pos]], voice_cfg, [save_paths[pos]]):
+                        break
+                else:
+                    logger.error(f"❌ 切片 {batch[pos].get('chunk_id')} 引擎重启后仍然超时，本次运行跳过")
+
+            rendered_chunks += len(batch)
+            if rendered_chunks // 50 > (rendered_chunks - len(batch)) // 50:
+                logger.info("   🎵 进度: %d/%d 片段已渲染", rendered_chunks, total_chunks)
+
         for file in script_files:
-            with open(os.path.join(self.script_dir, file), 'r', encoding='utf-8') as f:
-                micro_script = json.load(f)
+            micro_script = self._load_script(file)
             total_chunks += len(micro_script)
+            stale_wavs = getattr(self, "_stale_wavs", None)
+            if stale_wavs:
+                cached_wavs -= stale_wavs.copy()  # copy() 为单次 C 调用，阶段一线程同时追加也安全
+
+            if engine is None:
+                engine = self._create_tts_engine()
+                engine.warmup(warmup_modes)
             
             logger.info(f"🎙️ 正在渲染干音: {file} ({len(micro_script)}个片段)")
+            # 干音文件名列按剧本顺序一次生成，作废判断与断点续传按下标取用
+            wav_names = [f"{item['chunk_id']}.wav" for item in micro_script]
             
             # 🌟 Group-by-voice 优化：按角色分组批量渲染，减少 MLX 音色切换开销
-            voice_groups = group_indices_by_voice_type(micro_script)
-            for voice_key, indices in voice_groups.items():
-                logger.info(f"   🎤 渲染音色组: {voice_key} ({len(indices)}个片段)")
-                # 🌟 修复：每个音色组只解析一次 voice_cfg，确保组内所有微切片
-                # 使用完全相同的音色配置，杜绝音色在微切片之间切换
+            # 🌟 修复：每个音色组只解析一次 voice_cfg，确保组内所有微切片
+            # 使用完全相同的音色配置，杜绝音色在微切片之间切换
+            voice_groups = []
+            for voice_key, indices in group_indices_by_voice_type(micro_script).items():
                 first_item = micro_script[indices[0]]
-                group_voice_cfg = self.assets.get_voice_for_role(
+                voice_groups.append((voice_key, indices, get_voice(
                     first_item["type"],
                     first_item.get("speaker"),
                     first_item.get("gender")
-                )
-                for idx in indices:
-                    item = micro_script[idx]
-                    save_path = os.path.join(self.cache_dir, f"{item['chunk_id']}.wav")
-                    
-                    # 断点续传：缓存命中直接跳过，不参与看门狗计时
-                    if os.path.exists(save_path):
-                        rendered_chunks += 1
-                        if rendered_chunks > 0 and rendered_chunks % 50 == 0:
-                            logger.info(f"   🎵 进度: {rendered_chunks}/{total_chunks} 片段已渲染(跳过)")
-                        continue
-
-                    start_time = time.time()
-
-                    try:
-                        success = engine.render_dry_chunk(item["content"], group_voice_cfg, save_path)
-                        if not success:
-                            logger.error(
-                                f"🔇 渲染返回失败: chunk_id={item.get('chunk_id')}, "
-                                f"speaker={item.get('speaker')}, "
-                                f"content='{item['content'][:50]}...'"
-                            )
-                    except Exception as e:
-                        import traceback
-                        logger.error(
-                            f"❌ 渲染异常: chunk_id={item.get('chunk_id')}, "
-                            f"speaker={item.get('speaker')}, "
-                            f"content='{item['content'][:50]}...', "
-                            f"error={e}"
-                        )
-                        logger.error(f"📋 异常堆栈:\n{traceback.format_exc()}")
-                        success = False
-
-                    elapsed_time = time.time() - start_time
-                    rendered_chunks += 1
-
-                    # 动态看门狗阈值（冷启动120秒，热运行45秒）
-                    timeout_threshold = ENGINE_COLD_START_THRESHOLD_SECONDS if is_cold_start else ENGINE_WARM_THRESHOLD_SECONDS
-
-                    if elapsed_time > timeout_threshold:
-                        logger.warning(
-                            f"🚨 严重警告: 切片 {item.get('chunk_id')} 渲染耗时 "
-                            f"{elapsed_time:.1f} 秒！(当前阈值: {timeout_threshold}s)"
-                        )
-                        # 🔥 销毁超时产生的脏音频，防止污染混音
-                        if os.path.exists(save_path):
-                            os.remove(save_path)
-                            logger.info(f"🗑️ 已销毁超时产生的脏音频: {save_path}")
-                        logger.info("🔄 正在触发引擎自愈重置协议...")
-                        if hasattr(engine, 'destroy'):
-                            engine.destroy()
-                        del engine
-                        gc.collect()
-                        logger.info("✨ 内存已清空，正在重新加载 MLX TTS 引擎...")
-                        engine = self._create_tts_engine()
-                        logger.info("✅ 引擎热重启完成，恢复生产！")
-                        # 重启后的下一个片段又将面临 JIT 编译，重置为冷启动状态
-                        is_cold_start = True
-                        # 跳过当前失败片段的进度计数，重新渲染
-                        rendered_chunks -= 1
-                        continue
-                    else:
-                        # 渲染在阈值内平稳度过，引擎热身完毕，切换为严苛状态
-                        is_cold_start = False
-                    
-                    if rendered_chunks > 0 and rendered_chunks % 50 == 0:
-                        logger.info(f"   🎵 进度: {rendered_chunks}/{total_chunks} 片段已渲染")
+                )))
+
+            # 🌟 渲染清单：剧本被手工修改或角色音色配置变化时，本章已有干音作废重渲；
+            # 清单没有记录的旧缓存沿用"存在即跳过"
+            digest = self._render_digest(micro_script, voice_groups)
+            previous = render_manifest.get(file)
+            if previous != digest:
+                render_manifest[file] = digest
+                manifest_dirty = True
+                if previous is not None:
+                    logger.info(f"🔁 剧本或音色配置已变化，本章干音重新渲染: {file}")
+                    stale = cached_wavs.intersection(wav_names)
+                    for name in stale:
+                        try:
+                            os.remove(join(cache_dir, name))
+                        except FileNotFoundError:
+                            pass
+                    cached_wavs -= stale
+                    # 立即落盘：中途中断后，按新配置重渲的干音不会在下次运行时被再次作废
+                    atomic_json_write(render_manifest_path, {"chapters": render_manifest})
+                    manifest_dirty = False
+
+            for voice_key, indices, group_voice_cfg in voice_groups:
+                logger.info(f"   🎤 渲染音色组: {voice_key} ({len(indices)}个片段)")
+                if hasattr(engine, 'prewarm_voice'):
+                    engine.prewarm_voice(group_voice_cfg)
+                cfg_key = json.dumps(group_voice_cfg, sort_keys=True, ensure_ascii=False, default=str)
+                queued = carry.setdefault(cfg_key, (group_voice_cfg, []))[1]
+                # 断点续传：缓存命中直接跳过，不参与看门狗计时
+                pending = [idx for idx in indices if wav_names[idx] not in cached_wavs]
+                skipped = len(indices) - len(pending)
+                if skipped:
+                    rendered_chunks += skipped
+                    if rendered_chunks // 50 > (rendered_chunks - skipped) // 50:
+                        logger.info("   🎵 进度: %d/%d 片段已渲染(跳过)", rendered_chunks, total_chunks)
+                queued.extend(micro_script[idx] for idx in pending)
+
+                # 🌟 同音色切片按 tts_batch_size 分批，一次前向渲染整批；不足一批的留给后续章节
+                while len(queued) >= batch_size:
+                    batch = queued[:batch_size]
+                    del queued[:batch_size]
+                    render_batch(batch, group_voice_cfg)
+
+        # 收尾：渲染各音色凑不满一批的剩余切片（单句批次走原有逐句路径）
+        for voice_cfg, queued in carry.values():
+            for batch_start in range(0, len(queued), batch_size):
+                render_batch(queued[batch_start:batch_start + batch_size], voice_cfg)
+        if manifest_dirty:
+            atomic_json_write(render_manifest_path, {"chapters": render_manifest})
         
         # 释放 MLX 模型显存
-        if hasattr(engine, 'destroy'):
+        if engine is not None and hasattr(engine, 'destroy'):
             engine.destroy()
         del engine
         logger.info(f"✅ 阶段二完成 ({rendered_chunks}/{total_chunks} 片段)，MLX 已从内存中安全撤离！")
         
+    def _start_asset_prewarm(self):
+        """🌟 后台预解码环境音与过渡音，返回守护线程（纯净模式或无素材管理器时返回 None）
+
+        阶段一等待云端 API、阶段二占用 MLX，两者都不碰 pydub；趁此期间把阶段三要用的素材解码进
+        _load_normalized_audio 缓存，混音开始时直接命中。未完成时 get_* 走同步加载，不会互相等待。
+        """
+        assets = getattr(self, "assets", None)
+        if assets is None or self.config.get("pure_narrator_mode", False):
+            return None
+        themes = (self.config.get("ambient_theme", "default"),)
+        worker = threading.Thread(target=assets.prewarm_audio, args=(themes,),
+                                  name="cinecast-asset-prewarm", daemon=True)
+        worker.start()
+        return worker
+
+    def run_script_and_render(self, input_source) -> bool:
+        """执行阶段一与阶段二，返回阶段一是否成功
+
+        开启 overlap_script_and_tts 时两阶段流水线重叠：每写完一章剧本就放入队列，
+        由后台线程中的 MLX 引擎立即渲染，编剧 API 同时继续生成下一章。
+        阶段一走云端 API、不占用本地模型内存，因此与 MLX 渲染并行不会造成内存叠加。
+        """
+        self._start_asset_prewarm()
+        if not self.config.get("overlap_script_and_tts", True):
+            if not self.phase_1_generate_scripts(input_source):
+                return False
+            # 阶段一的导演实例 / OpenAI 客户端内部有引用环，加载 MLX 模型前先回收，避免内存峰值叠加
+            gc.collect()
+            self.phase_2_render_dry_audio()
+            return True
+
+        script_queue = queue.Queue()
+        worker_errors = []
+
+        def _tts_worker():
+            try:
+                self.phase_2_render_dry_audio(script_queue=script_queue)
+            except Exception as e:
+                logger.error(f"❌ 流水线渲染线程异常退出: {e}")
+                worker_errors.append(e)
+
+        worker = threading.Thread(target=_tts_worker, name="cinecast-tts", daemon=True)
+        worker.start()
+        try:
+            ok = self.phase_1_generate_scripts(input_source, on_script_ready=script_queue.put)
+        finally:
+            script_queue.put(None)
+            worker.join()
+        if worker_errors:
+            raise worker_errors[0]
+        return ok
+
     # ==========================================
     # 🎛️ 阶段三：电影级混音发版 (Cinematic Post-Processing)
     # ==========================================
@@ -847,11 +1333,12 @@ class CineCastProducer:
         logger.info("\n" + "="*50 + "\n🎛️ [阶段三] 混音发版期 (Pydub)\n" + "="*50)
 
         # 🌟 前置检查：确认缓存目录存在有效音频片段
+        # 单次 scandir 同时得到干音文件名与 stat，供全量跳过、章节指纹与混音台共用
+        wav_stats = {}
         if os.path.isdir(self.cache_dir):
-            wav_files = [f for f in os.listdir(self.cache_dir) if f.endswith('.wav')]
-        else:
-            wav_files = []
-        if not wav_files:
+            with os.scandir(self.cache_dir) as it:
+                wav_stats = {e.name: e.stat() for e in it if e.name.endswith('.wav')}
+        if not wav_stats:
             logger.warning("⚠️ 未发现有效音频片段，请检查剧本解析阶段（阶段一）和干音渲染阶段（阶段二）是否成功。跳过混音。")
             return
 
@@ -859,8 +1346,7 @@ class CineCastProducer:
         output_dir = self.config["output_dir"]
         existing_volumes = sorted([f for f in os.listdir(output_dir)
                                    if f.startswith("Audiobook_Part_") and f.endswith(".mp3")])
-        script_files = sorted([f for f in os.listdir(self.script_dir)
-                               if f.endswith('_micro.json') and not f.startswith('_preview_')])
+        script_files = self._list_script_files()
         if existing_volumes and script_files:
             latest_volume_mtime = max(
                 os.path.getmtime(os.path.join(output_dir, f)) for f in existing_volumes
@@ -868,12 +1354,17 @@ class CineCastProducer:
             latest_script_mtime = max(
                 os.path.getmtime(os.path.join(self.script_dir, f)) for f in script_files
             )
-            if latest_volume_mtime >= latest_script_mtime:
+            # 干音被局部重渲染时同样视为有更新
+            latest_wav_mtime = max(st.st_mtime for st in wav_stats.values())
+            if latest_volume_mtime >= max(latest_script_mtime, latest_wav_mtime):
                 logger.info(f"⏭️ 检测到 {len(existing_volumes)} 个分卷已存在且剧本无更新，跳过整个混音阶段")
                 return
 
         target_min = self.config.get("target_duration_min", 30)
-        packager = CinematicPackager(self.config["output_dir"], target_duration_min=target_min)
+        # 🌟 分卷压制（母带处理 + MP3 编码）交给后台进程池，主进程继续组装后续章节
+        export_workers = max(1, (os.cpu_count() or 2) // 2)
+        packager = CinematicPackager(self.config["output_dir"], target_duration_min=target_min,
+                                     export_workers=export_workers)
 
         # 🌟 核心拦截：纯净模式下，强行将音效设为 None
         if self.config.get("pure_narrator_mode", False):
@@ -884,14 +1375,176 @@ class CineCastProducer:
             ambient_bgm = self.assets.get_ambient_sound(self.config["ambient_theme"])
             chime_sound = self.assets.get_transition_chime()
         
-        for file in script_files:
-            with open(os.path.join(self.script_dir, file), 'r', encoding='utf-8') as f:
-                micro_script = json.load(f)
-            # 🌟 Pydub 开始组装，此时已经没有大模型在抢占内存了
-            packager.process_from_cache(micro_script, self.cache_dir, self.assets, ambient_bgm, chime_sound)
+        # 🌟 章节级混音清单：记录每章输入指纹与其产出的分卷区间，未变化的章节直接跳过 pydub 加载
+        scripts = self._load_all_scripts(script_files)
+        manifest_path = os.path.join(output_dir, MIX_MANIFEST_NAME)
+        manifest = self._load_mix_manifest(manifest_path)
+        settings = {
+            "ambient_theme": self.config.get("ambient_theme"),
+            "pure_narrator_mode": self.config.get("pure_narrator_mode", False),
+            "target_duration_min": target_min,
+        }
+        fingerprints = [self._chapter_mix_fingerprint(file, micro_script, wav_stats)
+                        for file, micro_script in scripts]
+        resume_pos, resume_index = self._find_mix_resume_point(
+            manifest, settings, script_files, fingerprints, output_dir
+        )
+        if resume_pos > 0:
+            logger.info(f"⏭️ 混音清单命中：前 {resume_pos} 个章节输入无变化，直接从第 {resume_index} 卷续混")
+            packager.file_index = resume_index
+        if manifest["chapters"] and resume_pos < len(scripts):
+            # 清单管理的旧分卷已失效，删除后重新压制（export_volume 不会覆盖已存在的分卷）；
+            # 只删除清单中记录过的分卷序号，不碰用户自行放入输出目录的同名文件
+            managed = {i for entry in manifest["chapters"].values()
+                       for i in range(entry["start_index"], entry["end_index"])}
+            for f in existing_volumes:
+                match = re.fullmatch(r'Audiobook_Part_(\d+)\.mp3', f)
+                if match and int(match.group(1)) >= resume_index and int(match.group(1)) in managed:
+                    os.remove(os.path.join(output_dir, f))
+        chapter_entries = {file: manifest["chapters"][file] for file in script_files[:resume_pos]}
+
+        # 🌟 分卷边界与尾部合并依赖前面所有章节的累计时长，拼接必须按章节顺序进行；
+        # 混音本章时由后台线程把下一章的干音预读进页缓存，读盘与拼接并行
+        try:
+            for pos in range(resume_pos, len(scripts)):
+                file, micro_script = scripts[pos]
+                if pos + 1 < len(scripts):
+                    next_paths = [os.path.join(self.cache_dir, f"{item['chunk_id']}.wav")
+                                  for item in scripts[pos + 1][1]
+                                  if f"{item['chunk_id']}.wav" in wav_stats]
+                    threading.Thread(target=prefetch_wavs, args=(next_paths,), daemon=True,
+                                     name="cinecast-wav-prefetch").start()
+                start_index = packager.file_index
+                volume_preexisted = os.path.exists(
+                    os.path.join(output_dir, f"Audiobook_Part_{start_index:03d}.mp3")
+                )
+                # 🌟 Pydub 开始组装，此时已经没有大模型在抢占内存了
+                packager.process_from_cache(micro_script, self.cache_dir, self.assets, ambient_bgm, chime_sound,
+                                            cached_wavs=wav_stats.keys())
+                if not volume_preexisted:
+                    chapter_entries[file] = {
+                        "fingerprint": fingerprints[pos],
+                        "start_index": start_index,
+                        "end_index": packager.file_index,
+                    }
+        finally:
+            packager.close()
+            atomic_json_write(manifest_path, {"settings": settings, "chapters": chapter_entries})
         
         logger.info("🎉 三段式架构全流程完成！全书压制完毕，请前往 output 目录查收。")
 
+    def _list_script_files(self) -> list:
+        """按文件名顺序列出正式微切片剧本（排除试听剧本），单次 scandir"""
+        with os.scandir(self.script_dir) as it:
+            return sorted(e.name for e in it
+                          if e.name.endswith('_micro.json') and not e.name.startswith('_preview_'))
+
+    def _load_script(self, file: str) -> list:
+        """读取单个微切片剧本，解析结果在阶段之间复用
+
+        以 (size, mtime_ns) 校验缓存：阶段一重写过的剧本会被重新解析。
+        调用方只读使用返回的列表，不得原地修改。
+        """
+        cache = getattr(self, "_script_cache", None)
+        if cache is None:
+            cache = self._script_cache = {}
+        path = os.path.join(self.script_dir, file)
+        st = os.stat(path)
+        key = (st.st_size, st.st_mtime_ns)
+        cached = cache.get(file)
+        if cached is None or cached[0] != key:
+            cached = cache[file] = (key, read_json(path))
+        return cached[1]
+
+    def _load_all_scripts(self, script_files: list = None) -> list:
+        """返回 [(剧本文件名, 微切片列表)]，阶段二已解析过的剧本在阶段三直接复用"""
+        if script_files is None:
+            script_files = self._list_script_files()
+        return [(file, self._load_script(file)) for file in script_files]
+
+    @staticmethod
+    def _render_digest(micro_script: list, voice_groups: list) -> str:
+        """本章干音的渲染指纹：各音色组的 voice_cfg 与组内切片的 chunk_id / 文本"""
+        h = hashlib.sha256()
+        for _, indices, voice_cfg in voice_groups:
+            h.update(json.dumps(voice_cfg, sort_keys=True, ensure_ascii=False, default=str).encode("utf-8"))
+            for idx in indices:
+                item = micro_script[idx]
+                h.update(f"\0{item['chunk_id']}\0{item['content']}".encode("utf-8"))
+            h.update(b"\1")
+        return h.hexdigest()
+
+    @staticmethod
+    def _load_mix_manifest(manifest_path: str) -> dict:
+        """读取章节级清单（混音清单与阶段二渲染清单同格式），不存在或损坏时返回空清单"""
+        try:
+            manifest = read_json(manifest_path)
+            if isinstance(manifest.get("chapters"), dict):
+                return manifest
+        except (OSError, ValueError, AttributeError):
+            pass
+        return {"settings": None, "chapters": {}}
+
+    def _chapter_mix_fingerprint(self, script_file: str, micro_script: list,
+                                 wav_stats: dict = None) -> dict:
+        """章节混音输入指纹：剧本文件与每个干音的 (size, mtime_ns)，只 stat 不解码
+
+        传入 wav_stats（缓存目录的 scandir 结果）时直接查表，不再逐片段 stat。
+        """
+        def _stat(path):
+            try:
+                st = os.stat(path)
+                return [st.st_size, st.st_mtime_ns]
+            except OSError:
+                return None
+
+        def _wav_stat(chunk_id):
+            if wav_stats is None:
+                return _stat(os.path.join(self.cache_dir, f"{chunk_id}.wav"))
+            st = wav_stats.get(f"{chunk_id}.wav")
+            return [st.st_size, st.st_mtime_ns] if st else None
+
+        return {
+            "script": _stat(os.path.join(self.script_dir, script_file)),
+            "chunks": {item["chunk_id"]: _wav_stat(item["chunk_id"]) for item in micro_script},
+        }
+
+    @staticmethod
+    def _find_mix_resume_point(manifest: dict, settings: dict, script_files: list,
+                               fingerprints: list, output_dir: str):
+        """计算可直接跳过的章节前缀，返回 (续混的章节位置, 续混的分卷序号)
+
+        分卷序号与尾部合并都依赖前面所有章节，因此只能跳过连续有效的前缀；
+        若第一个需要重混的章节曾把尾部合并进上一章的分卷，该分卷也必须回退重建。
+        """
+        entries = manifest["chapters"]
+        if manifest.get("settings") != settings:
+            return 0, 1
+
+        resume_pos, next_index = 0, 1
+        for file, fingerprint in zip(script_files, fingerprints):
+            entry = entries.get(file)
+            if (not entry or entry.get("fingerprint") != fingerprint
+                    or entry.get("start_index") != next_index):
+                break
+            volumes = range(entry["start_index"], entry["end_index"])
+            if not all(os.path.exists(os.path.join(output_dir, f"Audiobook_Part_{i:03d}.mp3"))
+                       for i in volumes):
+                break
+            next_index = entry["end_index"]
+            resume_pos += 1
+
+        while 0 < resume_pos < len(script_files):
+            entry = entries.get(script_files[resume_pos])
+            if not entry or entry.get("start_index") != entry.get("end_index"):
+                break
+            # 该章节上次没有独立成卷，尾部被合并进了前一章的分卷
+            resume_pos -= 1
+            next_index = entries[script_files[resume_pos]]["start_index"]
+        if resume_pos == 0:
+            next_index = 1
+        return resume_pos, next_index
+
     def phase_4_quality_control(self, target_dir=None):
         """阶段四：质检期 (Audio Shield) - 自动扫描并处理爆音
 
@@ -918,10 +1571,13 @@ def main():
     parser = argparse.ArgumentParser(description="CineCast 电影级有声书生产线")
     parser.add_argument("input", nargs="?", default="./input_chapters", help="输入文件(EPUB)或目录(TXT)")
     parser.add_argument("--pure-narrator", action="store_true", help="启用纯净旁白模式(单音色/无背景音/无摘要/免LLM)")
+    parser.add_argument("--daemon", action="store_true", help="使用常驻 TTS 守护进程(模型跨运行保持加载，未运行时自动拉起)")
     args = parser.parse_args()
 
     producer = CineCastProducer()
     producer.config["pure_narrator_mode"] = args.pure_narrator  # 🌟 将命令行参数写入全局配置
+    if args.daemon:
+        producer.ensure_tts_daemon()
     input_source = args.input
     
     if input_source.endswith('.epub') and os.path.exists(input_source):
@@ -945,9 +1601,8 @@ def main():
         logger.info(f"📝 使用TXT目录模式: {input_source}")
     
     try:
-        # 严格的三段式串行处理，彻底切断内存重叠
-        if producer.phase_1_generate_scripts(input_source):
-            producer.phase_2_render_dry_audio()
+        # 阶段一（云端 API）与阶段二（MLX）流水线重叠，阶段三在两者全部结束后才开始
+        if producer.run_script_and_render(input_source):
 
             # 🛡️ 新增：阶段二后质检（干音质检）
             logger.info("🛡️ 进入干音缓存质检阶段...")
@@ -998,8 +1653,8 @@ def production_pipeline(script_file: str, roles_dir: str = "./voices",
         role_manager=role_manager,
     )
 
-    # 4. 处理章节
-    audio = orchestrator.process_chapter(script, lang=lang)
+    # 4. 处理章节（直接输出 16-bit PCM，与写出的 WAV 同格式）
+    audio = orchestrator.process_chapter(script, lang=lang, dtype="int16")
 
     # 5. 保存输出
     if len(audio) > 0:
@@ -14,7 +14,7 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent))
 
 from modules.llm_director import LLMScriptDirector
-from modules.asset_manager import AssetManager
+from modules.asset_manager import AssetManager, get_asset_manager
 from modules.mlx_tts_engine import MLXRenderEngine
 from modules.cinematic_packager import CinematicPackager
 
@@ -27,7 +27,8 @@ def test_audio_normalization():
     logger.info("🔍 测试音频归一化功能...")
     
     try:
-        assets = AssetManager()
+        assets = get_asset_manager()
+        assets.prewarm_audio()
         
         # 测试环境音归一化
         ambient = assets.get_ambient_sound()
@@ -63,6 +64,23 @@ def test_audio_normalization():
         logger.error(f"❌ 音频归一化测试失败: {e}")
         return False
 
+def test_voice_assignment_deterministic():
+    """测试角色音色分配的确定性（两个独立实例为同一角色分配同一音色）"""
+    logger.info("🔍 测试角色音色分配确定性...")
+
+    try:
+        first = AssetManager().get_voice_for_role("dialogue", "张三", "male")
+        second = AssetManager().get_voice_for_role("dialogue", "张三", "male")
+        if first.get("audio") != second.get("audio"):
+            logger.error(f"❌ 同一角色在两个实例中分配到不同音色: {first} / {second}")
+            return False
+        logger.info(f"✅ 角色音色分配确定: {first.get('audio')}")
+        return True
+
+    except Exception as e:
+        logger.error(f"❌ 角色音色分配测试失败: {e}")
+        return False
+
 def test_two_stage_pipeline():
     """测试两阶段流水线架构"""
     logger.info("🔍 测试两阶段流水线架构...")
@@ -142,6 +160,7 @@ def main():
     
     tests = [
         ("音频归一化测试", test_audio_normalization),
+        ("音色分配确定性测试", test_voice_assignment_deterministic),
         ("两阶段流水线测试", test_two_stage_pipeline),
         ("内存效率测试", test_memory_efficiency)
     ]
@@ -4,11 +4,13 @@ CineCast 资产与选角管理器
 负责处理音色、声场、音效的加载与智能分配
 """
 
+import concurrent.futures
+import functools
 import hashlib
 import os
 import json
-import random
 import re
+from collections import OrderedDict
 from pydub import AudioSegment
 import logging
 
@@ -17,13 +19,116 @@ logger = logging.getLogger(__name__)
 # Pre-compiled pattern for matching mN/fN voice role names (e.g., m1, f2, m3)
 _ROLE_NAME_PATTERN = re.compile(r'^(m|f)(\d+)$', re.IGNORECASE)
 
+# 自动分配音色的角色最多记忆数量（LRU 淘汰，淘汰后按确定性哈希重新分配到同一音色）
+ROLE_VOICE_MEMO_SIZE = 4096
+
+# 不区分说话人、直接使用固定音色的片段类型
+_NON_DIALOGUE_ROLES = frozenset(("title", "subtitle", "narration", "recap"))
+
+# 可作为参考音色的音频扩展名（小写，按 os.path.splitext 的结果匹配）
+_VOICE_AUDIO_EXTS = frozenset((".wav", ".mp3", ".flac"))
+
+# 默认音色模板（audio 为相对 asset_dir 的路径；音色池用 tuple，实例化时转成 list）
+_DEFAULT_VOICES = {
+    "narrator": {"audio": "voices/narrator.wav", "text": "沉稳旁白", "speed": 1.0},
+    # 1.4.1 章节题目：严肃一字一顿，速度调至 0.8
+    "title": {"audio": "voices/narrator.wav", "text": "沉稳旁白", "speed": 0.8},
+    # 1.4.2 小标题：严肃但比正文慢，速度调至 0.9
+    "subtitle": {"audio": "voices/narrator.wav", "text": "沉稳旁白", "speed": 0.9},
+    "male_pool": (
+        {"audio": "voices/m1.wav", "text": "男声1", "speed": 1.0},
+        {"audio": "voices/m2.wav", "text": "男声2", "speed": 1.05},  # 年轻男声加快
+    ),
+    "female_pool": (
+        {"audio": "voices/f1.wav", "text": "女声1", "speed": 1.0},
+        {"audio": "voices/f2.wav", "text": "女声2", "speed": 1.0},
+    ),
+    # "narration" 显式映射到 narrator 音色，避免 dict.get() 隐式回退
+    "narration": {"audio": "voices/narrator.wav", "text": "沉稳旁白", "speed": 1.0},
+}
+
+# audio_assets_config.json 中 voice_reference 各项的 acoustic_description 覆盖到哪些音色：
+# (配置键, [音色键 或 (音色池键, 下标)])
+_VOICE_REFERENCE_TARGETS = (
+    ("narrator", ("narrator", "narration", "title", "subtitle")),
+    ("male_default", (("male_pool", 0),)),
+    ("young_male", (("male_pool", 1),)),
+    ("female_default", (("female_pool", 0),)),
+)
+
+# asset_dir -> 已解析的 audio_assets_config.json 路径（未找到不缓存，之后新建的配置文件仍能被发现）
+_CONFIG_PATH_CACHE = {}
+
+
+@functools.lru_cache(maxsize=16)
+def _load_normalized_audio(path: str, mtime_ns: int, target_sr: int) -> AudioSegment:
+    """解码并归一化音效文件（按路径 + 修改时间缓存）
+
+    环境音 / 过渡音每次混音都会被请求，但文件几乎不变；AudioSegment 不可变，
+    可以安全地在多次调用间共享。用户替换文件后 mtime 改变，自动重新解码。
+    刻意使用有界强引用 LRU 而非 WeakValueDictionary：调用方通常用完即弃，
+    弱引用缓存在两章之间就会被回收，等于没有缓存。TTS 参考音色的解码缓存见
+    MLXRenderEngine._ref_audio。
+    """
+    audio = AudioSegment.from_file(path)
+    return audio.set_frame_rate(target_sr).set_channels(1)
+
+
+@functools.lru_cache(maxsize=4)
+def _read_voice_config(path: str, mtime_ns: int):
+    """解析 audio_assets_config.json，只保留选角需要的两个子树（按路径 + 修改时间缓存）
+
+    返回 (voice_reference, target_sample_rate)；其余配置在解析后立即丢弃，不随缓存常驻。
+    每次构造 AssetManager 都会读取该文件，同一进程内只解析一次。
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        config = json.load(f)
+    return config.get("voice_reference", {}), config.get("audio_processing", {}).get("target_sample_rate")
+
+
+def _mtime_ns(path: str):
+    """单次 stat 同时完成存在性检查与缓存键获取；文件不存在时返回 None"""
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def _existing_candidates(candidates):
+    """按优先级产出实际存在的候选 (路径, mtime_ns)（候选需位于同一目录）
+
+    首选文件存在时只 stat 一次；首选缺失时用一次 scandir 列出目录，
+    只对列表中出现的候选再 stat 取修改时间，代替逐个扩展名探测。
+    不在 __init__ 里建目录索引：WebUI 会在运行中把素材写入 assets/ambient、assets/transitions，
+    而命中路径本来就要 stat 取 mtime 以便替换文件后重新解码，索引省不掉这一次系统调用。
+    """
+    first = candidates[0]
+    mtime_ns = _mtime_ns(first)
+    if mtime_ns is not None:
+        yield first, mtime_ns
+    try:
+        with os.scandir(os.path.dirname(first)) as it:
+            names = {e.name for e in it}
+    except OSError:
+        return
+    for path in candidates[1:]:
+        if os.path.basename(path) in names:
+            mtime_ns = _mtime_ns(path)
+            if mtime_ns is not None:
+                yield path, mtime_ns
+
+
 class AssetManager:
+    # assets/voices 目录文件名索引（首次选角时懒加载，refresh_voice_index 重建）
+    _voice_index = None
+
     def __init__(self, asset_dir="./assets"):
         self.asset_dir = asset_dir
         self.target_sr = 24000  # Qwen3-TTS 1.7B 高保真采样率
         self._initialize_default_voices()
         self._load_voice_config()
         self.role_voice_map = {}  # 记忆已分配角色的音色
+        self._auto_roles = OrderedDict()  # 自动分配的角色（LRU 顺序）-> 分配的音色
         self.clone_voice_features = {}  # 克隆音色特征存储
         self._scan_clone_voices()  # 扫描克隆音色目录
         
@@ -32,59 +137,19 @@ class AssetManager:
         return audio.set_frame_rate(self.target_sr).set_channels(1)
     
     def _initialize_default_voices(self):
-        """初始化默认音色配置"""
+        """初始化默认音色配置（由 _DEFAULT_VOICES 模板拼接 asset_dir，每个实例拿到独立的可改副本）"""
+        asset_dir = self.asset_dir
+
+        def materialize(voice):
+            return {**voice, "audio": f"{asset_dir}/{voice['audio']}"}
+
         self.voices = {
-            "narrator": {
-                "audio": f"{self.asset_dir}/voices/narrator.wav", 
-                "text": "沉稳旁白", 
-                "speed": 1.0
-            },
-            # 1.4.1 章节题目：严肃一字一顿，速度调至 0.8
-            "title": {
-                "audio": f"{self.asset_dir}/voices/narrator.wav", 
-                "text": "沉稳旁白", 
-                "speed": 0.8
-            },
-            # 1.4.2 小标题：严肃但比正文慢，速度调至 0.9
-            "subtitle": {
-                "audio": f"{self.asset_dir}/voices/narrator.wav", 
-                "text": "沉稳旁白", 
-                "speed": 0.9
-            },
-            "male_pool": [
-                {
-                    "audio": f"{self.asset_dir}/voices/m1.wav", 
-                    "text": "男声1", 
-                    "speed": 1.0
-                },
-                {
-                    "audio": f"{self.asset_dir}/voices/m2.wav", 
-                    "text": "男声2", 
-                    "speed": 1.05  # 年轻男声加快
-                }
-            ],
-            "female_pool": [
-                {
-                    "audio": f"{self.asset_dir}/voices/f1.wav", 
-                    "text": "女声1", 
-                    "speed": 1.0
-                },
-                {
-                    "audio": f"{self.asset_dir}/voices/f2.wav", 
-                    "text": "女声2", 
-                    "speed": 1.0
-                }
-            ],
-            # "narration" 显式映射到 narrator 音色，避免 dict.get() 隐式回退
-            "narration": {
-                "audio": f"{self.asset_dir}/voices/narrator.wav",
-                "text": "沉稳旁白",
-                "speed": 1.0
-            },
-            # 新增：前情摘要专属音色 (可稍微加速，带出回顾的紧凑感)
-            # 🌟 修复: 检查 talkover.wav 是否存在，不存在则自动降级为 narrator
-            "recap": self._build_recap_voice(),
+            key: [materialize(v) for v in value] if isinstance(value, tuple) else materialize(value)
+            for key, value in _DEFAULT_VOICES.items()
         }
+        # 新增：前情摘要专属音色 (可稍微加速，带出回顾的紧凑感)
+        # 🌟 修复: 检查 talkover.wav 是否存在，不存在则自动降级为 narrator
+        self.voices["recap"] = self._build_recap_voice()
 
     def _build_recap_voice(self):
         """构建 recap 音色配置，若 talkover.wav 不存在则降级为 narrator"""
@@ -105,51 +170,43 @@ class AssetManager:
 
     def _load_voice_config(self):
         """从 audio_assets_config.json 加载音色配置，覆盖硬编码的默认值"""
-        config_path = os.path.join(os.path.dirname(self.asset_dir), "audio_assets_config.json")
-        if not os.path.exists(config_path):
+        # 🌟 已解析过的路径直接复用，只 stat 一次取修改时间；文件消失时才重新探测两个位置
+        config_path = _CONFIG_PATH_CACHE.get(self.asset_dir)
+        mtime_ns = _mtime_ns(config_path) if config_path else None
+        if mtime_ns is None:
+            config_path = os.path.join(os.path.dirname(self.asset_dir), "audio_assets_config.json")
+            mtime_ns = _mtime_ns(config_path)
+        if mtime_ns is None:
             # 也尝试项目根目录
             config_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "audio_assets_config.json")
-        if not os.path.exists(config_path):
+            mtime_ns = _mtime_ns(config_path)
+        if mtime_ns is None:
+            _CONFIG_PATH_CACHE.pop(self.asset_dir, None)
             logger.info("未找到 audio_assets_config.json，使用默认音色配置")
             return
+        _CONFIG_PATH_CACHE[self.asset_dir] = config_path
 
         try:
-            with open(config_path, 'r', encoding='utf-8') as f:
-                config = json.load(f)
-
-            voice_ref = config.get("voice_reference", {})
+            voice_ref, target_sr = _read_voice_config(config_path, mtime_ns)
             if not voice_ref:
                 return
 
             # 用配置文件中的 acoustic_description 覆盖默认 text 字段
-            if "narrator" in voice_ref:
-                narrator_desc = voice_ref["narrator"].get(
-                    "acoustic_description", self.voices["narrator"]["text"]
-                )
-                self.voices["narrator"]["text"] = narrator_desc
-                self.voices["narration"]["text"] = narrator_desc
-                self.voices["title"]["text"] = narrator_desc
-                self.voices["subtitle"]["text"] = narrator_desc
-
-            if "male_default" in voice_ref and self.voices["male_pool"]:
-                self.voices["male_pool"][0]["text"] = voice_ref["male_default"].get(
-                    "acoustic_description", self.voices["male_pool"][0]["text"]
-                )
-
-            if "young_male" in voice_ref and len(self.voices["male_pool"]) > 1:
-                self.voices["male_pool"][1]["text"] = voice_ref["young_male"].get(
-                    "acoustic_description", self.voices["male_pool"][1]["text"]
-                )
-
-            if "female_default" in voice_ref and self.voices["female_pool"]:
-                self.voices["female_pool"][0]["text"] = voice_ref["female_default"].get(
-                    "acoustic_description", self.voices["female_pool"][0]["text"]
-                )
+            for ref_key, targets in _VOICE_REFERENCE_TARGETS:
+                desc = voice_ref.get(ref_key, {}).get("acoustic_description")
+                if not desc:
+                    continue
+                for target in targets:
+                    if isinstance(target, tuple):
+                        pool_key, index = target
+                        if index < len(self.voices[pool_key]):
+                            self.voices[pool_key][index]["text"] = desc
+                    else:
+                        self.voices[target]["text"] = desc
 
             # 加载采样率配置
-            audio_proc = config.get("audio_processing", {})
-            if "target_sample_rate" in audio_proc:
-                self.target_sr = audio_proc["target_sample_rate"]
+            if target_sr is not None:
+                self.target_sr = target_sr
 
             logger.info("✅ 已从 audio_assets_config.json 加载音色配置")
         except Exception as e:
@@ -161,8 +218,8 @@ class AssetManager:
         if not os.path.exists(clones_dir):
             return
         for file in os.listdir(clones_dir):
-            if file.lower().endswith(('.wav', '.mp3', '.flac')):
-                name = os.path.splitext(file)[0]
+            name, ext = os.path.splitext(file)
+            if ext.lower() in _VOICE_AUDIO_EXTS:
                 clone_path = os.path.join(clones_dir, file)
                 self.role_voice_map[name] = {
                     "mode": "clone",
@@ -227,6 +284,41 @@ class AssetManager:
         # 回退：使用默认 get_voice_for_role 分配
         return self.get_voice_for_role("dialogue", speaker_name)
     
+    def refresh_voice_index(self) -> frozenset:
+        """重新扫描 assets/voices，一次 scandir 取代逐角色的 os.path.exists 探测"""
+        voices_dir = os.path.join(self.asset_dir, "voices")
+        try:
+            with os.scandir(voices_dir) as it:
+                self._voice_index = frozenset(e.name for e in it if e.is_file())
+        except OSError:
+            self._voice_index = frozenset()
+        return self._voice_index
+
+    def _voice_file_exists(self, path) -> bool:
+        """音色文件存在性：assets/voices 下的文件查索引，其他位置（用户自定义路径）仍走 stat"""
+        voices_dir = os.path.join(self.asset_dir, "voices")
+        if os.path.dirname(path) != voices_dir:
+            return os.path.exists(path)
+        index = self._voice_index
+        if index is None:
+            index = self.refresh_voice_index()
+        return os.path.basename(path) in index
+
+    def _remember_role(self, speaker_name, voice):
+        """记忆自动分配的角色音色，超过 ROLE_VOICE_MEMO_SIZE 个时淘汰最久未出场的角色
+
+        LLM 误拆出的龙套名会让角色表在长篇批量任务中无限增长；被淘汰的角色再次出场时
+        按同一确定性哈希重新分配，音色不变。克隆/设计等显式绑定不参与淘汰。
+        """
+        self.role_voice_map[speaker_name] = voice
+        auto = self._auto_roles
+        auto[speaker_name] = voice
+        auto.move_to_end(speaker_name)
+        if len(auto) > ROLE_VOICE_MEMO_SIZE:
+            evicted, evicted_voice = auto.popitem(last=False)
+            if self.role_voice_map.get(evicted) is evicted_voice:
+                del self.role_voice_map[evicted]
+
     def get_voice_for_role(self, role_type, speaker_name=None, gender="male"):
         """
         智能选角逻辑
@@ -235,6 +327,11 @@ class AssetManager:
             role_type: 角色类型 (title, subtitle, narration, dialogue)
             speaker_name: 说话人姓名 (用于对话角色记忆)
             gender: 性别 (male, female)
+
+        Returns:
+            dict: 与 self.voices / role_voice_map 共享的音色配置（同一角色每次返回同一对象），
+            调用方只读；需要调整时请先 dict(voice) 复制，否则会改动所有共用该音色的角色。
+            （不包成 MappingProxyType：音色配置需要 json 序列化后发给 TTS 守护进程）
         """
         # 🌟 修复：gender 为 None 时使用默认值 "male"，防止 item.get("gender")
         # 返回 None 覆盖函数签名中的默认值导致错误的音色池选择
@@ -242,93 +339,130 @@ class AssetManager:
             gender = "male"
 
         # 处理非对话角色
-        if role_type in ["title", "subtitle", "narration", "recap"]:
-            return self.voices.get(role_type, self.voices["narrator"])
+        if role_type in _NON_DIALOGUE_ROLES:
+            voices = self.voices
+            return voices.get(role_type) or voices["narrator"]
             
-        # 对话角色音色记忆（含专属音色匹配）
-        if speaker_name and speaker_name not in self.role_voice_map:
-            # 🌟 角色专属音色匹配：如果 assets/voices/ 下有与角色同名的 .wav 文件，直接绑定
-            custom_voice_path = os.path.join(self.asset_dir, "voices", f"{speaker_name}.wav")
-            if os.path.exists(custom_voice_path):
-                self.role_voice_map[speaker_name] = {
-                    "audio": custom_voice_path,
-                    "text": f"角色专属音色 {speaker_name}",
-                    "speed": 1.0
-                }
-                logger.info(f"✅ 角色 [{speaker_name}] 已绑定专属音色: {custom_voice_path}")
-            else:
-                # 🌟 修复：除非明确是 female，否则未知角色一律默认用男声池
-                is_female = str(gender).lower() in ["female", "f", "女", "女性"]
-                pool = self.voices["female_pool"] if is_female else self.voices["male_pool"]
-                if not pool:
-                    self.role_voice_map[speaker_name] = self.voices["narrator"]
-                else:
-                    # 使用确定性哈希分配，确保同名角色跨进程仍获得同一音色
-                    digest = int(hashlib.md5(speaker_name.encode()).hexdigest(), 16)
-                    idx = digest % len(pool)
-                    candidate_voice = pool[idx]
-                    
-                    # 🌟 核心修复：防止底层 C 库由于音频文件不存在而引发静默闪退！
-                    if not os.path.exists(candidate_voice["audio"]):
-                        logger.warning(f"⚠️ 角色 [{speaker_name}] 匹配的默认音色 {candidate_voice['audio']} 不存在！强制降级为 narrator 旁白音色。")
-                        self.role_voice_map[speaker_name] = self.voices["narrator"]
-                    else:
-                        self.role_voice_map[speaker_name] = candidate_voice
-            
-        if speaker_name:
-            return self.role_voice_map.get(speaker_name, self.voices["narrator"])
-        else:
+        if not speaker_name:
             # 如果没有说话人信息，使用 narrator 音色而非随机选择，防止每个微切片
             # 都随机到不同音色导致音色在微切片之间切换
             return self.voices["narrator"]
+
+        # 🌟 对话角色音色记忆：已知角色一次 dict.get 命中直接返回
+        voice = self.role_voice_map.get(speaker_name)
+        if voice is not None:
+            if speaker_name in self._auto_roles:
+                self._auto_roles.move_to_end(speaker_name)
+            return voice
+
+        # 🌟 角色专属音色匹配：如果 assets/voices/ 下有与角色同名的 .wav 文件，直接绑定
+        custom_voice_path = os.path.join(self.asset_dir, "voices", f"{speaker_name}.wav")
+        if self._voice_file_exists(custom_voice_path):
+            voice = {
+                "audio": custom_voice_path,
+                "text": f"角色专属音色 {speaker_name}",
+                "speed": 1.0
+            }
+            logger.info(f"✅ 角色 [{speaker_name}] 已绑定专属音色: {custom_voice_path}")
+        else:
+            # 🌟 修复：除非明确是 female，否则未知角色一律默认用男声池
+            is_female = str(gender).lower() in ["female", "f", "女", "女性"]
+            pool = self.voices["female_pool"] if is_female else self.voices["male_pool"]
+            if not pool:
+                voice = self.voices["narrator"]
+            else:
+                # 使用确定性哈希分配，确保同名角色跨进程仍获得同一音色；
+                # 保持 md5 分桶不变，否则已有项目的角色音色会整体换人（并触发干音重渲），
+                # 直接取 digest 字节转整数，省去十六进制字符串往返
+                digest = int.from_bytes(hashlib.md5(speaker_name.encode()).digest(), "big")
+                voice = pool[digest % len(pool)]
+
+                # 🌟 核心修复：防止底层 C 库由于音频文件不存在而引发静默闪退！
+                if not self._voice_file_exists(voice["audio"]):
+                    logger.warning(f"⚠️ 角色 [{speaker_name}] 匹配的默认音色 {voice['audio']} 不存在！强制降级为 narrator 旁白音色。")
+                    voice = self.voices["narrator"]
+        self._remember_role(speaker_name, voice)
+        return voice
     
+    def _ambient_candidates(self, theme):
+        """环境音候选路径（允许用户上传任意支持的格式）"""
+        ambient_dir = f"{self.asset_dir}/ambient"
+        return [f"{ambient_dir}/{theme}{ext}" for ext in ('.wav', '.mp3', '.m4a', '.flac')]
+
+    def _chime_candidates(self):
+        """过渡音候选路径（按优先级）"""
+        transitions_dir = f"{self.asset_dir}/transitions"
+        return [os.path.join(transitions_dir, filename)
+                for filename in ('soft_chime.wav', 'soft_chime.mp3', 'chime.wav', 'transition.wav')]
+
     def get_ambient_sound(self, theme="default") -> AudioSegment:
         """🌟 防采样率爆炸：支持用户动态上传环境音并强制归一化"""
         # 寻找 assets/ambient 下所有可用的音频
-        ambient_dir = f"{self.asset_dir}/ambient"
-        # 允许用户上传任意支持的格式
-        for ext in ['.wav', '.mp3', '.m4a', '.flac']:
-            path = f"{ambient_dir}/{theme}{ext}"
-            if os.path.exists(path):
-                try:
-                    logger.info(f"✅ 加载环境音: {path}")
-                    audio = AudioSegment.from_file(path)
-                    return self._normalize_audio(audio)
-                except Exception as e:
-                    logger.warning(f"无法加载环境音 {path}: {e}")
-                    continue
+        for path, mtime_ns in _existing_candidates(self._ambient_candidates(theme)):
+            try:
+                logger.info(f"✅ 加载环境音: {path}")
+                return _load_normalized_audio(path, mtime_ns, self.target_sr)
+            except Exception as e:
+                logger.warning(f"无法加载环境音 {path}: {e}")
         logger.info(f"未找到环境音 {theme}，使用静音回退")
         return AudioSegment.silent(duration=100)
     
     def get_transition_chime(self) -> AudioSegment:
         """🌟 防采样率爆炸：获取防惊跳柔和过渡音并强制归一化"""
-        transitions_dir = f"{self.asset_dir}/transitions"
-        # 支持多种音频格式
-        for filename in ['soft_chime.wav', 'soft_chime.mp3', 'chime.wav', 'transition.wav']:
-            path = os.path.join(transitions_dir, filename)
-            if os.path.exists(path):
-                try:
-                    logger.info(f"✅ 加载过渡音: {path}")
-                    audio = AudioSegment.from_file(path)
-                    return self._normalize_audio(audio)
-                except Exception as e:
-                    logger.warning(f"无法加载过渡音 {path}: {e}")
-                    continue
+        for path, mtime_ns in _existing_candidates(self._chime_candidates()):
+            try:
+                logger.info(f"✅ 加载过渡音: {path}")
+                return _load_normalized_audio(path, mtime_ns, self.target_sr)
+            except Exception as e:
+                logger.warning(f"无法加载过渡音 {path}: {e}")
         logger.info("未找到过渡音，使用默认静音")
         return AudioSegment.silent(duration=500)  # 默认半秒空白
-    
+
+    def prewarm_audio(self, themes=("default",)) -> int:
+        """一次性并行解码环境音与过渡音，填充 _load_normalized_audio 缓存
+
+        非 WAV 素材每个都要启动一次 ffmpeg 子进程，冷启动时串行解码会叠加进程启动与重采样耗时；
+        这里对每组候选取第一个存在的文件并发解码（ffmpeg 子进程与 audioop 重采样期间释放 GIL）。
+        解码失败只记录日志，之后的 get_* 调用仍按原逻辑逐个候选回退。
+        阶段一、二期间由 CineCastProducer._start_asset_prewarm 在守护线程中调用；
+        asyncio 调用方用 asyncio.to_thread(assets.prewarm_audio, themes) 即可，无需另建异步接口。
+
+        Returns:
+            成功预热的文件数
+        """
+        groups = [self._ambient_candidates(theme) for theme in themes] + [self._chime_candidates()]
+        targets = []
+        for candidates in groups:
+            target = next(_existing_candidates(candidates), None)
+            if target is not None:
+                targets.append(target)
+        if not targets:
+            return 0
+
+        def load(target):
+            path, mtime_ns = target
+            try:
+                _load_normalized_audio(path, mtime_ns, self.target_sr)
+                return True
+            except Exception as e:
+                logger.debug(f"预热音效失败，使用时再加载: {path}: {e}")
+                return False
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=len(targets)) as pool:
+            return sum(pool.map(load, targets))
+
     def scan_voice_assets(self):
         """扫描可用的音色文件"""
         voices_dir = f"{self.asset_dir}/voices"
-        if not os.path.exists(voices_dir):
+        try:
+            with os.scandir(voices_dir) as it:
+                voice_files = [e.path for e in it
+                               if os.path.splitext(e.name)[1].lower() in _VOICE_AUDIO_EXTS
+                               and e.is_file()]
+        except FileNotFoundError:
             logger.warning(f"音色目录不存在: {voices_dir}")
             return []
         
-        voice_files = []
-        for file in os.listdir(voices_dir):
-            if file.lower().endswith(('.wav', '.mp3', '.flac')):
-                voice_files.append(os.path.join(voices_dir, file))
-        
         logger.info(f"发现 {len(voice_files)} 个音色文件")
         return voice_files
     
@@ -348,6 +482,7 @@ class AssetManager:
             self.voices["male_pool"].append(voice_config)
         else:
             self.voices["female_pool"].append(voice_config)
+        self._voice_index = None
         
         logger.info(f"添加自定义音色: {name}")
         return True
@@ -365,6 +500,7 @@ class AssetManager:
         """
         if not role_voices:
             return
+        self._voice_index = None  # 上传的音色可能刚写入 assets/voices
 
         for role_name, file_path in role_voices.items():
             if file_path is None or not os.path.exists(file_path):
@@ -453,6 +589,17 @@ class AssetManager:
             logger.error(f"❌ 保存克隆音色失败 {voice_name}: {e}")
             raise
 
+
+@functools.lru_cache(maxsize=None)
+def get_asset_manager(asset_dir="./assets") -> AssetManager:
+    """按 asset_dir 复用同一个 AssetManager（供只读查询的验证/诊断脚本使用）
+
+    AssetManager 会记忆角色音色分配（role_voice_map）并可被自定义音色修改，
+    生产线每本书仍应各自构造实例，避免不同书籍之间串音色。
+    """
+    return AssetManager(asset_dir)
+
+
 if __name__ == "__main__":
     # 测试代码
     logging.basicConfig(level=logging.INFO)
@@ -471,4 +618,5 @@ if __name__ == "__main__":
     
     # 测试过渡音
     chime = manager.get_transition_chime()
-    print(f"过渡音时长: {len(chime)}ms")
\ No newline at end of file
+    print(f"过渡音时长: {len(chime)}ms")
+
@@ -8,10 +8,15 @@ CineCast 有声书编排器 (Audiobook Orchestrator)
 import gc
 import logging
 import re
-from typing import List, Dict, Tuple, Optional
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 
 import numpy as np
 
+try:
+    import mlx.core as mx  # 仅 Apple Silicon 可用；模块级导入一次，clear_memory 不再每次走 import 机制
+except ImportError:
+    mx = None
+
 from modules.rhythm_manager import RhythmManager
 from modules.role_manager import RoleManager
 
@@ -31,6 +36,9 @@ LANGUAGE_MAP = {
     "Portuguese": "pt", "葡萄牙文": "pt", "pt": "pt",
 }
 
+# 剧本行 "角色名：内容" / "角色名: 内容"（模块级预编译，逐行解析时不再查 re 缓存）
+_SCRIPT_LINE_PATTERN = re.compile(r'^([^：:]{1,20})[：:]\s*(.+)')
+
 
 def parse_script_line(line: str) -> Tuple[Optional[str], str]:
     """解析"角色名：文本内容"格式的剧本行。
@@ -47,9 +55,13 @@ def parse_script_line(line: str) -> Tuple[Optional[str], str]:
     line = line.strip()
     if not line:
         return None, ""
+    return _parse_stripped_line(line)
 
+
+def _parse_stripped_line(line: str) -> Tuple[Optional[str], str]:
+    """parse_script_line 的主体（调用方已去除首尾空白且保证非空）"""
     # 匹配 "角色名：内容" 或 "角色名: 内容"
-    match = re.match(r'^([^：:]{1,20})[：:]\s*(.+)', line)
+    match = _SCRIPT_LINE_PATTERN.match(line)
     if match:
         role_name = match.group(1).strip()
         content = match.group(2).strip()
@@ -58,6 +70,31 @@ def parse_script_line(line: str) -> Tuple[Optional[str], str]:
     return None, line
 
 
+def iter_script(text: str) -> Iterator[Tuple[Optional[str], str]]:
+    """🌟 逐行惰性解析剧本文本（空行跳过，每行只 strip 一次）
+
+    process_chapter 只顺序遍历一遍剧本，直接传入本生成器即可，
+    不必先构造整章的 (角色名, 文本内容) 列表。
+
+    Args:
+        text: 完整剧本文本
+
+    Yields:
+        (角色名, 文本内容) 元组
+    """
+    for line in text.split("\n"):
+        line = line.strip()
+        if line:
+            yield _parse_stripped_line(line)
+
+
+def _to_pcm16(audio: np.ndarray) -> np.ndarray:
+    """单个片段量化为 int16（浮点按 [-1, 1] 满幅缩放并饱和，四舍五入取整；整数原样返回）"""
+    if audio.dtype.kind != "f":
+        return audio.astype(np.int16, copy=False)
+    return np.rint(np.clip(audio, -1.0, 1.0) * 32767).astype(np.int16)
+
+
 def parse_script(text: str) -> List[Tuple[Optional[str], str]]:
     """解析多行剧本文本。
 
@@ -65,14 +102,9 @@ def parse_script(text: str) -> List[Tuple[Optional[str], str]]:
         text: 完整剧本文本
 
     Returns:
-        列表，每个元素为 (角色名, 文本内容) 元组
+        列表，每个元素为 (角色名, 文本内容) 元组（需要计数或多次遍历时使用，否则用 iter_script）
     """
-    results = []
-    for line in text.strip().split("\n"):
-        line = line.strip()
-        if line:
-            results.append(parse_script_line(line))
-    return results
+    return list(iter_script(text))
 
 
 class AudiobookOrchestrator:
@@ -97,19 +129,22 @@ class AudiobookOrchestrator:
         self.rhythm = RhythmManager(rhythm_config)
         self.sample_rate = sample_rate
 
-    def process_chapter(self, script: List[Tuple[str, str]],
+    def process_chapter(self, script: Iterable[Tuple[Optional[str], str]],
                         role_names: Optional[List[str]] = None,
                         lang: str = "Chinese",
                         batch_size: int = 1,
-                        paragraph_pause: float = 0.5) -> np.ndarray:
+                        paragraph_pause: float = 0.5,
+                        dtype=np.float32) -> np.ndarray:
         """处理单个章节的多角色剧本。
 
         Args:
-            script: 剧本列表 [("角色名", "文本内容"), ...]
+            script: 剧本 [("角色名", "文本内容"), ...]，任意可迭代对象（只遍历一遍）
             role_names: 需要加载的角色名列表（为 None 时自动扫描）
             lang: 语言名称
-            batch_size: 批处理大小（Mac mini 建议 1-2）
+            batch_size: 批处理大小（Mac mini 建议 1-2）；大于 1 时相邻同角色片段批量推理
             paragraph_pause: 段落间停顿时长（秒）
+            dtype: 输出样本类型；np.int16 时各片段在写入输出时直接量化为 16-bit PCM，
+                整章缓冲只占 float32 的一半，写 WAV 时也不再整体转换
 
         Returns:
             合并后的音频 numpy 数组
@@ -118,13 +153,14 @@ class AudiobookOrchestrator:
         role_bank = self.rm.load_role_bank(role_names)
         lang_code = LANGUAGE_MAP.get(lang, "zh")
 
-        final_audio_segments = []
+        # 2. 韵律处理：先收集全部待合成片段，时间线只记录片段下标与其后的停顿帧数
+        tasks = []     # [(角色, 片段文本)]
+        timeline = []  # [(tasks 下标或 None, 之后的停顿帧数)]
 
         for role, text in script:
             if not text.strip():
                 continue
 
-            # 2. 韵律处理
             segments = self.rhythm.process_text_with_metadata(text)
 
             for seg in segments:
@@ -134,31 +170,76 @@ class AudiobookOrchestrator:
                 if not seg_text.strip():
                     continue
 
-                # 3. 推理生成音频
-                audio_segment = self._generate_for_role(
-                    seg_text, role, role_bank, lang_code
-                )
-                if audio_segment is not None:
-                    final_audio_segments.append(audio_segment)
-
-                # 4. 注入片段内停顿
-                if seg_pause > 0:
-                    silence = self.rhythm.create_silence_frames(
-                        seg_pause, self.sample_rate
-                    )
-                    final_audio_segments.append(silence)
-
-            # 5. 注入段落停顿（角色发言之间）
-            silence = self.rhythm.create_silence_frames(
-                paragraph_pause, self.sample_rate
-            )
-            final_audio_segments.append(silence)
-
-        # 6. 合并所有片段
-        if not final_audio_segments:
-            return np.array([], dtype=np.float32)
-
-        return np.concatenate(final_audio_segments)
+                # 片段内停顿
+                timeline.append((len(tasks), self._pause_frames(seg_pause) if seg_pause > 0 else 0))
+                tasks.append((role, seg_text))
+
+            # 段落停顿（角色发言之间）
+            timeline.append((None, self._pause_frames(paragraph_pause)))
+
+        # 3. 推理生成音频（同角色相邻片段按 batch_size 批量提交）
+        audios = self._generate_tasks(tasks, role_bank, lang_code, batch_size)
+
+        # 4. 按原顺序写入一次性分配的输出：停顿不再逐个生成零数组（由 np.zeros 的零页表示），
+        #    每段写入后立即释放，长章节尾部片段不再与完整输出长期并存
+        total = sum(pause for _, pause in timeline)
+        total += sum(len(audio) for audio in audios if audio is not None)
+        pcm16 = np.dtype(dtype) == np.int16
+        if not pcm16:
+            dtype = np.result_type(dtype, *(audio.dtype for audio in audios if audio is not None))
+        output = np.zeros(total, dtype=dtype)
+        pos = 0
+        for idx, pause in timeline:
+            if idx is not None and audios[idx] is not None:
+                audio = audios[idx]
+                output[pos:pos + len(audio)] = _to_pcm16(audio) if pcm16 else audio
+                pos += len(audio)
+                audios[idx] = None
+            pos += pause
+        return output
+
+    def _pause_frames(self, duration: float) -> int:
+        """停顿时长对应的帧数（与 RhythmManager.create_silence_frames 的取整一致）"""
+        return int(duration * self.sample_rate)
+
+    def _generate_tasks(self, tasks: List[Tuple[Optional[str], str]], role_bank: Dict,
+                        lang_code: str, batch_size: int) -> List[Optional[np.ndarray]]:
+        """为全部片段生成音频，返回与 tasks 一一对应的结果。
+
+        batch_size > 1 且引擎提供 generate_batch 时，相邻的同角色片段每 batch_size 个
+        合并为一次批量推理；否则逐句调用 _generate_for_role。
+        """
+        if batch_size <= 1 or not hasattr(self.engine, "generate_batch"):
+            return [self._generate_for_role(text, role, role_bank, lang_code)
+                    for role, text in tasks]
+
+        audios: List[Optional[np.ndarray]] = []
+        start = 0
+        while start < len(tasks):
+            role = tasks[start][0]
+            end = start + 1
+            while end < len(tasks) and end - start < batch_size and tasks[end][0] == role:
+                end += 1
+            texts = [text for _, text in tasks[start:end]]
+            audios.extend(self._generate_batch_for_role(texts, role, role_bank, lang_code))
+            start = end
+        return audios
+
+    def _generate_batch_for_role(self, texts: List[str], role: Optional[str],
+                                 role_bank: Dict, lang_code: str) -> List[Optional[np.ndarray]]:
+        """同一角色的多个片段走一次引擎批量推理，失败时回退逐句生成。"""
+        if len(texts) == 1:
+            return [self._generate_for_role(texts[0], role, role_bank, lang_code)]
+
+        feature = role_bank.get(role) if role else None
+        try:
+            audios = list(self.engine.generate_batch(texts, feature, language=lang_code))
+            if len(audios) == len(texts):
+                return audios
+            logger.warning(f"⚠️ 角色 [{role}] 批量结果数量不符，回退逐句生成")
+        except Exception as e:
+            logger.warning(f"⚠️ 角色 [{role}] 批量生成失败 ({e})，回退逐句生成")
+        return [self._generate_for_role(text, role, role_bank, lang_code) for text in texts]
 
     def _generate_for_role(self, text: str, role: Optional[str],
                            role_bank: Dict, lang_code: str) -> Optional[np.ndarray]:
@@ -204,7 +285,8 @@ class AudiobookOrchestrator:
 
     def process_chapter_from_text(self, text: str,
                                   lang: str = "Chinese",
-                                  paragraph_pause: float = 0.5) -> np.ndarray:
+                                  paragraph_pause: float = 0.5,
+                                  dtype=np.float32) -> np.ndarray:
         """从原始文本解析剧本并处理章节。
 
         自动解析"角色名：文本内容"格式。
@@ -213,13 +295,13 @@ class AudiobookOrchestrator:
             text: 原始剧本文本
             lang: 语言名称
             paragraph_pause: 段落间停顿时长
+            dtype: 输出样本类型（见 process_chapter）
 
         Returns:
             合并后的音频 numpy 数组
         """
-        script = parse_script(text)
-        return self.process_chapter(script, lang=lang,
-                                    paragraph_pause=paragraph_pause)
+        return self.process_chapter(iter_script(text), lang=lang,
+                                    paragraph_pause=paragraph_pause, dtype=dtype)
 
     def clear_memory(self):
         """清理内存缓存。
@@ -227,9 +309,9 @@ class AudiobookOrchestrator:
         在章节处理间隙调用，防止统一内存持续膨胀。
         """
         gc.collect()
-        try:
-            import mlx.core as mx
-            mx.metal.clear_cache()
-        except (ImportError, AttributeError):
-            pass
+        if mx is not None:
+            try:
+                mx.metal.clear_cache()
+            except AttributeError:
+                pass
         logger.info("🧹 内存缓存已清理")
@@ -5,10 +5,18 @@ CineCast 混音与发行打包器
 流水线第三阶段：从干音缓存组装成电影级有声书
 """
 
+import concurrent.futures
+import functools
+import mmap
 import os
 import logging
+import struct
+import subprocess
 import zipfile
+import numpy as np
 from pydub import AudioSegment
+from pydub.exceptions import CouldntEncodeError
+from pydub.utils import db_to_float
 from typing import Optional, List, Dict
 from tqdm import tqdm
 
@@ -18,18 +26,297 @@ logger = logging.getLogger(__name__)
 CROSS_SPEAKER_PAUSE_MS = 500   # 不同角色之间的停顿
 SAME_SPEAKER_PAUSE_MS = 250    # 同一角色连续说话的停顿
 
+# 原始 PCM 位宽 -> ffmpeg 输入格式
+_PCM_FORMATS = {1: "u8", 2: "s16le", 3: "s24le", 4: "s32le"}
+
+# 环境音混音每块处理的采样数（int32 中间结果约 4MB，避免整卷 int32 副本）
+AMBIENT_MIX_BLOCK = 1 << 20
+
+# pydub fade_in / fade_out 的起止增益（-120dB）
+_FADE_FLOOR = db_to_float(-120)
+
+
+def _add_looped_pcm16(main: bytes, bed: bytes) -> bytes:
+    """🌟 将 bed 循环铺满 main 并逐样本饱和相加（16-bit PCM，与 audioop.add 的截断语义一致）
+
+    按 AMBIENT_MIX_BLOCK 分块在 NumPy 中向量化相加，不拼接整卷长度的循环副本。
+    """
+    main_arr = np.frombuffer(main, dtype=np.int16)
+    bed_arr = np.frombuffer(bed, dtype=np.int16)
+    if not len(main_arr) or not len(bed_arr):
+        return main
+    period = len(bed_arr)
+    # 预铺一块 + 一个周期长度的环境音，任意块起点都能按相位偏移直接切片；
+    # 短分卷只铺到自身长度（环境音本身够长时不再复制）
+    tiled = np.tile(bed_arr, min(len(main_arr), AMBIENT_MIX_BLOCK) // period + 2)
+    out = np.empty_like(main_arr)
+    for start in range(0, len(main_arr), AMBIENT_MIX_BLOCK):
+        block = main_arr[start:start + AMBIENT_MIX_BLOCK].astype(np.int32)
+        phase = start % period
+        block += tiled[phase:phase + len(block)]
+        np.clip(block, -32768, 32767, out=block)
+        out[start:start + len(block)] = block
+    return out.tobytes()
+
+
+def _mix_ambient(main_audio: AudioSegment, ambient: AudioSegment) -> AudioSegment:
+    """混入沉浸式声场（模块级实现，供主进程与导出子进程共用）"""
+    if len(ambient) < 500:
+        logger.debug("环境音过短，跳过混音")
+        return main_audio  # 无有效环境音
+
+    try:
+        # 将环境音量降低25dB，避免喧宾夺主。增益只作用于循环前的单份环境音（几秒到几十秒），
+        # audioop.mul 已是 C 实现的逐样本乘法并向下取整；改成定点近似反而会改变输出字节
+        ambient = ambient - 25
+
+        # 对齐采样率/声道/位宽（与 overlay 内部一致）
+        main_audio, ambient = AudioSegment._sync(main_audio, ambient)
+        if main_audio.sample_width != 2:
+            mixed_audio = main_audio.overlay(ambient, loop=True)
+        else:
+            mixed_audio = AudioSegment(
+                data=_add_looped_pcm16(main_audio.raw_data, ambient.raw_data),
+                sample_width=2, frame_rate=main_audio.frame_rate, channels=main_audio.channels,
+            )
+        logger.debug("✅ 环境音混音完成")
+        return mixed_audio
+
+    except Exception as e:
+        logger.error(f"❌ 环境音混音失败: {e}")
+        return main_audio
+
+
+def _ms_bounds(start_ms: int, count: int, frame_rate: int) -> np.ndarray:
+    """毫秒位置 -> 帧下标（与 pydub 的 _parse_position 取整方式一致）"""
+    return (np.arange(start_ms, start_ms + count + 1) * (frame_rate / 1000.0)).astype(np.int64)
+
+
+def _apply_ms_ramp(frames: np.ndarray, bounds: np.ndarray, from_power: float, to_power: float):
+    """按毫秒阶梯增益原地缩放 frames[bounds[0]:bounds[-1]]（复刻 pydub fade 的粗粒度分支与 audioop.mul 向下取整）"""
+    duration = len(bounds) - 1
+    volumes = from_power + (to_power - from_power) / duration * np.arange(duration)
+    lo, hi = bounds[0], min(bounds[-1], len(frames))
+    if hi <= lo:
+        return
+    gain = np.repeat(volumes, np.diff(bounds))[:hi - lo]
+    region = frames[lo:hi]
+    region[...] = np.floor(region * gain[:, None])
+
+
+def _apply_envelope(audio: AudioSegment, chime: Optional[AudioSegment],
+                    fade_in_ms: int, fade_out_ms: int) -> AudioSegment:
+    """🌟 主干淡入 → 前置过渡音 → 整体淡出，一次分配完成
+
+    等价于 fade_in → chime + audio → fade_out 三步 pydub 操作（逐字节一致，包括 pydub
+    按毫秒取整截断/补零尾帧的行为），但只拷贝一遍整卷数据，增益只作用在首尾淡变区间。
+    位宽不是 16-bit、过渡音格式与主干不同或淡变短于 100ms（pydub 改为逐帧渐变）时退回 pydub。
+    """
+    use_chime = chime is not None and len(chime) > 500
+    fade_in = min(fade_in_ms, len(audio))
+    same_format = not use_chime or (
+        chime.sample_width, chime.frame_rate, chime.channels
+    ) == (audio.sample_width, audio.frame_rate, audio.channels)
+    if audio.sample_width == 2 and same_format and fade_in > 100:
+        rate, channels = audio.frame_rate, audio.channels
+        main = np.frombuffer(audio.raw_data, dtype=np.int16).reshape(-1, channels)
+        head = np.frombuffer(chime.raw_data, dtype=np.int16).reshape(-1, channels) if use_chime \
+            else main[:0]
+        # fade_in 后主干按其毫秒时长取整为 int(len*rate/1000) 帧（多截少补零），拼接后的时长同理
+        main_frames = int(len(audio) * (rate / 1000.0))
+        joined_ms = round(1000 * (float(len(head) + main_frames) / rate))
+        fade_out = min(fade_out_ms, joined_ms)
+        if fade_out > 100:
+            out = np.zeros((int(joined_ms * (rate / 1000.0)), channels), dtype=np.int16)
+            out[:len(head)] = head[:len(out)]
+            body = out[len(head):]
+            copied = min(len(main), main_frames, len(body))
+            body[:copied] = main[:copied]
+            _apply_ms_ramp(body, _ms_bounds(0, fade_in, rate), _FADE_FLOOR, 1.0)
+            _apply_ms_ramp(out, _ms_bounds(joined_ms - fade_out, fade_out, rate), 1.0, _FADE_FLOOR)
+            return AudioSegment(data=out.tobytes(), sample_width=2, frame_rate=rate, channels=channels)
+
+    final_audio = audio.fade_in(fade_in)
+    if use_chime:
+        final_audio = chime + final_audio
+    return final_audio.fade_out(min(fade_out_ms, len(final_audio)))
+
+
+def _equal_power_crossfade(prev: AudioSegment, tail: AudioSegment, crossfade_ms: int) -> AudioSegment:
+    """🌟 等功率交叉淡化拼接：重叠区 prev·cos + tail·sin，一次分配写出整段
+
+    pydub 的 append(crossfade=...) 是线性幅度渐变（不相关信号在中点响度下降约 3dB），
+    且会把前卷切片、叠加、再经 BytesIO 拼接多次复制整卷。非 16-bit 时退回 pydub。
+    """
+    prev, tail = AudioSegment._sync(prev, tail)
+    if prev.sample_width != 2:
+        return prev.append(tail, crossfade=crossfade_ms)
+
+    channels = prev.channels
+    head = np.frombuffer(prev.raw_data, dtype=np.int16).reshape(-1, channels)
+    rest = np.frombuffer(tail.raw_data, dtype=np.int16).reshape(-1, channels)
+    n = min(int(crossfade_ms * prev.frame_rate / 1000), len(head), len(rest))
+
+    out = np.empty((len(head) + len(rest) - n, channels), dtype=np.int16)
+    out[:len(head) - n] = head[:len(head) - n]
+    t = np.linspace(0, np.pi / 2, n, dtype=np.float32)[:, None]
+    overlap = head[len(head) - n:] * np.cos(t) + rest[:n] * np.sin(t)
+    out[len(head) - n:len(head)] = np.clip(np.rint(overlap), -32768, 32767)
+    out[len(head):] = rest[n:]
+    return AudioSegment(data=out.tobytes(), sample_width=2, frame_rate=prev.frame_rate, channels=channels)
+
+
+def _export_mp3(audio: AudioSegment, save_path: str, bitrate: str = "128k",
+                parameters: Optional[List[str]] = None):
+    """🌟 把原始 PCM 经 stdin 管道直接送入 ffmpeg 编码为 MP3
+
+    pydub 的 export 会先把整卷写成临时 WAV、再让 ffmpeg 输出到第二个临时文件并拷回目标，
+    30 分钟分卷要多搬运两遍字节；这里只写一次最终文件。先写 .part 再原子替换，
+    避免中断留下的半截 MP3 被断点续传误判为已完成的分卷。
+    """
+    pcm_format = _PCM_FORMATS.get(audio.sample_width)
+    if pcm_format is None:
+        audio.export(save_path, format="mp3", bitrate=bitrate, parameters=parameters)
+        return
+
+    part_path = f"{save_path}.part"
+    command = [
+        AudioSegment.converter, "-y",
+        "-f", pcm_format, "-ar", str(audio.frame_rate), "-ac", str(audio.channels), "-i", "pipe:0",
+        "-b:a", bitrate, *(parameters or []),
+        "-f", "mp3", part_path,
+    ]
+    proc = subprocess.Popen(command, stdin=subprocess.PIPE,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    _, err = proc.communicate(audio.raw_data)
+    if proc.returncode != 0:
+        if os.path.exists(part_path):
+            os.remove(part_path)
+        raise CouldntEncodeError(
+            f"ffmpeg 编码失败 (returncode={proc.returncode}): {err.decode(errors='ignore')[-500:]}"
+        )
+    os.replace(part_path, save_path)
+
+
+def _master_and_export(audio: AudioSegment, save_path: str,
+                       ambient: Optional[AudioSegment], chime: Optional[AudioSegment],
+                       fade_in_ms: int, fade_out_ms: int) -> str:
+    """整卷母带处理（环境音、淡入淡出、过渡音）并压制为 MP3
+
+    只依赖参数、不依赖打包器实例状态，因此可以直接提交到子进程执行。
+
+    Returns:
+        str: 导出的文件路径
+    """
+    final_audio = audio
+
+    # 0. 混入环境音（如果有）
+    if ambient:
+        final_audio = _mix_ambient(final_audio, ambient)
+
+    # 1. 睡眠唤醒防惊跳：添加Chime，并对主干开头做淡入
+    #    有 Chime 时也保留淡入：提示音之后人声仍需从静音渐起，不能用短交叉淡化代替；
+    #    淡入只缩放开头几秒，不再是整卷 pass
+    # 2. 尾部淡出，防止突兀结束（两步合并为一次整卷拷贝）
+    final_audio = _apply_envelope(final_audio, chime, fade_in_ms, fade_out_ms)
+
+    # 导出为MP3格式（-q:a 2 为 VBR 质量等级）
+    _export_mp3(final_audio, save_path, bitrate="128k", parameters=["-q:a", "2"])
+    return save_path
+
+
+@functools.lru_cache(maxsize=32)
+def _synced_silence(duration_ms: int, frame_rate: int, channels: int, sample_width: int) -> AudioSegment:
+    """AudioSegment.silent(duration_ms) 经 _sync 提升到给定格式后的结果（只读，按格式缓存）"""
+    target = AudioSegment(data=b"", sample_width=sample_width, frame_rate=frame_rate, channels=channels)
+    return AudioSegment._sync(target, AudioSegment.silent(duration=duration_ms))[1]
+
+
+def _with_pause(segment: AudioSegment, pause_ms: int) -> tuple:
+    """🌟 segment + AudioSegment.silent(pause_ms) 的分段形式，依次追加后逐字节一致
+
+    pydub 的 silent 固定按 11025Hz 生成，逐句拼接都要经 audioop.ratecv 重采样并复制整段干音；
+    停顿时长只有少数几种，转换后的静音按格式缓存，逐句只追加引用。
+    干音格式低于静音默认格式（需要反向提升干音）时仍交给 pydub 拼接。
+    """
+    pause = _synced_silence(pause_ms, segment.frame_rate, segment.channels, segment.sample_width)
+    if (pause.frame_rate, pause.channels, pause.sample_width) != (
+            segment.frame_rate, segment.channels, segment.sample_width):
+        return (segment + AudioSegment.silent(duration=pause_ms),)
+    return segment, pause
+
+
+class _SegmentTrack:
+    """🌟 按片段列表累积的音轨：append 与 track += audio 逐字节一致，导出时才一次 b"".join
+
+    分角色音轨贯穿全书（不随分卷清空），逐句 += 的字节拷贝量会随全书长度平方增长。
+    """
+    __slots__ = ("_chunks", "_bytes")
+
+    def __init__(self, audio: AudioSegment):
+        self._chunks = [audio]
+        self._bytes = len(audio.raw_data)
+
+    def __len__(self) -> int:
+        """时长（毫秒），与 len(AudioSegment) 的取整一致"""
+        first = self._chunks[0]
+        return round(1000 * ((self._bytes // first.frame_width) / first.frame_rate))
+
+    def append(self, audio: AudioSegment):
+        first = self._chunks[0]
+        synced_first, synced = AudioSegment._sync(first, audio)
+        if synced_first is not first:
+            # 已有音轨需要提升格式（如初始静音为 pydub 默认 11025Hz）：与 pydub 一样整体转换后再拼接
+            merged = self.to_segment() + audio
+            self._chunks = [merged]
+            self._bytes = len(merged.raw_data)
+            return
+        self._chunks.append(synced)
+        self._bytes += len(synced.raw_data)
+
+    def to_segment(self) -> AudioSegment:
+        if len(self._chunks) > 1:
+            first = self._chunks[0]
+            self._chunks = [AudioSegment(
+                data=b"".join(chunk.raw_data for chunk in self._chunks),
+                sample_width=first.sample_width, frame_rate=first.frame_rate, channels=first.channels,
+            )]
+        return self._chunks[0]
+
+
+def prefetch_wavs(paths: List[str]) -> None:
+    """把即将混音的干音文件预读进系统页缓存（后台线程调用，失败静默忽略）
+
+    支持 posix_fadvise 的平台只提交 WILLNEED 预读提示，由内核异步读盘；
+    其他平台（macOS）读取文件以达到同样效果。
+    """
+    fadvise = getattr(os, "posix_fadvise", None)
+    for path in paths:
+        try:
+            with open(path, "rb", buffering=0) as f:
+                if fadvise is not None:
+                    fadvise(f.fileno(), 0, 0, os.POSIX_FADV_WILLNEED)
+                else:
+                    while f.read(1 << 20):
+                        pass
+        except OSError:
+            continue
+
 
 class CinematicPackager:
     FADE_IN_MS = 3000   # 淡入时长（毫秒）
     FADE_OUT_MS = 2000  # 淡出时长（毫秒）
 
-    def __init__(self, output_dir="output", target_duration_min=30):
+    def __init__(self, output_dir="output", target_duration_min=30, export_workers=0):
         """
         初始化电影级混音台
         
         Args:
             output_dir: 输出目录
             target_duration_min: 目标分卷时长（分钟），默认30分钟
+            export_workers: 后台压制进程数。0 表示在当前进程同步压制；
+                大于 0 时分卷的母带处理与 MP3 编码交给进程池，
+                主进程可以继续组装下一卷
         """
         self.output_dir = output_dir
         os.makedirs(output_dir, exist_ok=True)
@@ -39,16 +326,108 @@ class CinematicPackager:
         self.sample_rate = 24000                  # Qwen3-TTS 1.7B 高保真采样率
         self.crossfade_ms = 18                    # 交叉淡化补偿 (15-20ms 范围，18ms 为 1.7B 情感波动最佳平衡点)
         
-        self.buffer = AudioSegment.empty()
+        # 🌟 分卷缓冲区以片段列表累积，导出时一次 b"".join，避免逐句 buffer += 的 O(N²) 字节拷贝
+        self._chunks: List[AudioSegment] = []
+        self._chunk_bytes = 0
         self.file_index = 1
         
         # Track per-speaker audio for multi-track export
-        self._speaker_tracks: dict = {}
+        self._speaker_tracks: dict = {}  # {speaker: _SegmentTrack}
         self._labels: list = []  # [{"start_ms", "end_ms", "speaker", "text"}]
         self._timeline_ms = 0  # current position on the global timeline
+
+        # 后台压制进程池（按需创建）与尚未完成的导出任务
+        self.export_workers = export_workers
+        self._export_pool = None
+        self._pending_exports: list = []  # [(file_name, Future)]
         
         logger.info(f"🎛️ 启动后期混音台 (Pydub)，输出目录: {output_dir}")
     
+    @property
+    def buffer(self) -> AudioSegment:
+        """当前分卷缓冲区（读取时把累积的片段合并为一个 AudioSegment）"""
+        if len(self._chunks) > 1:
+            first = self._chunks[0]
+            self._chunks = [AudioSegment(
+                data=b"".join(chunk.raw_data for chunk in self._chunks),
+                sample_width=first.sample_width, frame_rate=first.frame_rate, channels=first.channels,
+            )]
+        return self._chunks[0] if self._chunks else AudioSegment.empty()
+
+    @buffer.setter
+    def buffer(self, audio: AudioSegment):
+        self._chunks = [audio] if len(audio.raw_data) else []
+        self._chunk_bytes = len(audio.raw_data)
+
+    def _append_to_buffer(self, audio: AudioSegment):
+        """追加片段到缓冲区，与 buffer += audio 结果逐字节一致"""
+        if not audio.raw_data:
+            return
+        if not self._chunks:
+            # 与 AudioSegment.empty() + audio 相同的格式提升（如 8-bit 提升为 16-bit）
+            audio = AudioSegment.empty() + audio
+        elif (audio.frame_rate, audio.channels, audio.sample_width) != (
+                self._chunks[0].frame_rate, self._chunks[0].channels, self._chunks[0].sample_width):
+            # 格式不一致时退回 pydub 拼接，由其统一采样率/声道/位宽
+            self.buffer = self.buffer + audio
+            return
+        self._chunks.append(audio)
+        self._chunk_bytes += len(audio.raw_data)
+
+    def _buffer_ms(self) -> int:
+        """缓冲区时长（毫秒），与 len(self.buffer) 相同但无需合并片段"""
+        if not self._chunks:
+            return 0
+        first = self._chunks[0]
+        frames = self._chunk_bytes // (first.sample_width * first.channels)
+        return round(1000 * frames / first.frame_rate)
+
+    @staticmethod
+    def stream_wav(path: str) -> AudioSegment:
+        """通过 mmap 读取干音缓存 WAV，直接切出 PCM 数据区构造 AudioSegment
+
+        pydub 的 from_file 会先把整个文件 read() 进内存，再切片出 data 区，
+        每个片段经历两次用户态拷贝；这里由内核按需换页，只在切片时拷贝一次。
+        非 PCM / 无法解析的文件回退到 AudioSegment.from_file。
+
+        Args:
+            path: WAV 文件路径
+
+        Returns:
+            AudioSegment: 解码后的音频
+        """
+        try:
+            with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                if mm[:4] != b"RIFF" or mm[8:12] != b"WAVE":
+                    raise ValueError("not a RIFF/WAVE file")
+                fmt = None
+                pos = 12
+                while pos + 8 <= len(mm):
+                    chunk_id, chunk_size = struct.unpack_from("<4sI", mm, pos)
+                    body = pos + 8
+                    if chunk_id == b"fmt ":
+                        fmt = struct.unpack_from("<HHIIHH", mm, body)
+                    elif chunk_id == b"data":
+                        # 仅处理 16/32-bit 整型 PCM（soundfile 默认写出 PCM_16）
+                        if fmt is None or fmt[0] not in (1, 0xFFFE) or fmt[5] not in (16, 32):
+                            raise ValueError("unsupported WAV encoding")
+                        _, channels, frame_rate, _, _, bits = fmt
+                        sample_width = bits // 8
+                        frame_width = channels * sample_width
+                        end = min(body + chunk_size, len(mm))
+                        end -= (end - body) % frame_width
+                        return AudioSegment(
+                            data=mm[body:end],
+                            sample_width=sample_width,
+                            frame_rate=frame_rate,
+                            channels=channels,
+                        )
+                    pos = body + chunk_size + (chunk_size & 1)
+                raise ValueError("missing data chunk")
+        except (OSError, ValueError, struct.error) as e:
+            logger.debug(f"mmap 读取 WAV 失败，回退 pydub 解码: {path}: {e}")
+            return AudioSegment.from_file(path, format="wav")
+
     def mix_ambient(self, main_audio: AudioSegment, ambient: AudioSegment) -> AudioSegment:
         """
         混入沉浸式声场
@@ -60,35 +439,18 @@ class CinematicPackager:
         Returns:
             AudioSegment: 混合后的音频
         """
-        if len(ambient) < 500:
-            logger.debug("环境音过短，跳过混音")
-            return main_audio  # 无有效环境音
-        
-        try:
-            # 将环境音量降低25dB，避免喧宾夺主
-            ambient = ambient - 25 
-            
-            # 循环环境音使其与主音频等长
-            loop_count = len(main_audio) // len(ambient) + 1
-            ambient_looped = ambient * loop_count
-            ambient_looped = ambient_looped[:len(main_audio)]
-            
-            # 混合音频
-            mixed_audio = main_audio.overlay(ambient_looped)
-            logger.debug("✅ 环境音混音完成")
-            return mixed_audio
-            
-        except Exception as e:
-            logger.error(f"❌ 环境音混音失败: {e}")
-            return main_audio
+        return _mix_ambient(main_audio, ambient)
     
     def process_from_cache(self, micro_script: List[Dict], cache_dir: str, assets, 
-                          ambient_bgm=None, chime=None):
+                          ambient_bgm=None, chime=None, cached_wavs=None):
         """
         流水线第三阶段：从干音缓存组装成电影级有声书
         
         Uses dynamic pauses: CROSS_SPEAKER_PAUSE_MS between different speakers,
         SAME_SPEAKER_PAUSE_MS for consecutive lines by the same speaker.
+
+        cached_wavs: 可选，缓存目录中已有的 WAV 文件名集合（调用方一次 scandir 得到），
+        提供时用集合查询代替逐片段 os.path.exists。
         """
         # 🌟 前置全量跳过：如果当前分卷已存在，直接跳过整个剧本的混音计算
         output_filename = f"Audiobook_Part_{self.file_index:03d}.mp3"
@@ -108,23 +470,19 @@ class CinematicPackager:
         
         for item in tqdm(micro_script, desc="混音组装中"):
             wav_path = os.path.join(cache_dir, f"{item['chunk_id']}.wav")
-            if not os.path.exists(wav_path):
+            if cached_wavs is not None:
+                is_cached = f"{item['chunk_id']}.wav" in cached_wavs
+            else:
+                is_cached = os.path.exists(wav_path)
+            if not is_cached:
                 logger.warning(f"⚠️ 找不到干音缓存: {wav_path}，跳过该句。")
                 continue
                 
             # 加载干音
-            segment = AudioSegment.from_file(wav_path, format="wav")
-            
-            # 应用语速与音调变化 (如标题的 0.8 倍速一字一顿)
-            voice_cfg = assets.get_voice_for_role(
-                item["type"], 
-                item.get("speaker"), 
-                item.get("gender")
-            )
-            speed_factor = voice_cfg.get("speed", 1.0)
+            segment = self.stream_wav(wav_path)
             
             # 🌟 注意：调速应在 TTS 生成时控制，不在混音阶段通过修改帧率实现
-            # 直接修改 frame_rate 会导致音调失真（变调变声），因此此处跳过速度调整
+            # 直接修改 frame_rate 会导致音调失真（变调变声），因此混音阶段不再逐句查询音色配置
             
             # 🌟 动态停顿：同角色连续对白用短停顿，跨角色切换用长停顿
             current_speaker = item.get("speaker", "narrator")
@@ -148,26 +506,26 @@ class CinematicPackager:
             })
             
             # Accumulate per-speaker track data
-            if current_speaker not in self._speaker_tracks:
+            track = self._speaker_tracks.get(current_speaker)
+            if track is None:
                 # Pad with silence up to this point
-                self._speaker_tracks[current_speaker] = AudioSegment.silent(
-                    duration=seg_start
+                track = self._speaker_tracks[current_speaker] = _SegmentTrack(
+                    AudioSegment.silent(duration=seg_start)
                 )
             else:
                 # Pad any gap since the last segment from this speaker
-                current_len = len(self._speaker_tracks[current_speaker])
+                current_len = len(track)
                 if current_len < seg_start:
-                    self._speaker_tracks[current_speaker] += AudioSegment.silent(
-                        duration=seg_start - current_len
-                    )
-            self._speaker_tracks[current_speaker] += segment
+                    track.append(AudioSegment.silent(duration=seg_start - current_len))
+            track.append(segment)
             
-            # 拼接入缓冲区
-            self.buffer += segment + AudioSegment.silent(duration=pause_ms)
+            # 拼接入缓冲区（停顿静音取自缓存，不再逐句重采样、复制干音）
+            for piece in _with_pause(segment, pause_ms):
+                self._append_to_buffer(piece)
             self._timeline_ms += len(segment) + pause_ms
             
             # 满 30 分钟则导出
-            if len(self.buffer) >= self.target_duration_ms:
+            if self._buffer_ms() >= self.target_duration_ms:
                 self.export_volume(ambient=ambient_bgm, chime=chime)
                 
         # 结尾兜底
@@ -183,10 +541,10 @@ class CinematicPackager:
         if ambient:
             audio = self.mix_ambient(audio, ambient)
         
-        self.buffer += audio
+        self._append_to_buffer(audio)
         
         # 检查是否达到目标时长
-        if len(self.buffer) >= self.target_duration_ms:
+        if self._buffer_ms() >= self.target_duration_ms:
             self.export_volume(chime=chime)
     
     def export_volume(self, ambient: Optional[AudioSegment] = None,
@@ -202,7 +560,7 @@ class CinematicPackager:
             ambient: 环境音背景（可选，仅在 process_from_cache 流程中使用）
             chime: 开头过渡音效（可选）
         """
-        if len(self.buffer) == 0:
+        if self._buffer_ms() == 0:
             logger.warning("缓冲区为空，跳过导出")
             return
         
@@ -215,32 +573,26 @@ class CinematicPackager:
             self.file_index += 1
             return
         
-        try:
-            final_audio = self.buffer
-            
-            # 0. 混入环境音（如果有）
-            if ambient:
-                final_audio = self.mix_ambient(final_audio, ambient)
-            
-            # 1. 睡眠唤醒防惊跳：添加Chime，并对主干开头做淡入
-            fade_in_ms = min(self.FADE_IN_MS, len(final_audio))
-            final_audio = final_audio.fade_in(fade_in_ms)
-            if chime and len(chime) > 500:
-                final_audio = chime + final_audio
-                
-            # 2. 尾部淡出，防止突兀结束
-            fade_out_ms = min(self.FADE_OUT_MS, len(final_audio))
-            final_audio = final_audio.fade_out(fade_out_ms)
-            
-            logger.info(f"📦 正在压制: {file_name} ({len(final_audio)/1000/60:.1f}分钟)")
-            
-            # 导出为MP3格式
-            final_audio.export(
-                save_path, 
-                format="mp3", 
-                bitrate="128k",
-                parameters=["-q:a", "2"]  # VBR质量等级
+        logger.info(f"📦 正在压制: {file_name} ({self._buffer_ms()/1000/60:.1f}分钟)")
+
+        if self.export_workers > 0:
+            # 🌟 后台压制：缓冲区交给子进程编码，主进程立即开始组装下一卷
+            if self._export_pool is None:
+                self._export_pool = concurrent.futures.ProcessPoolExecutor(
+                    max_workers=self.export_workers
+                )
+            future = self._export_pool.submit(
+                _master_and_export, self.buffer, save_path, ambient, chime,
+                self.FADE_IN_MS, self.FADE_OUT_MS
             )
+            self._pending_exports.append((file_name, future))
+            self.buffer = AudioSegment.empty()
+            self.file_index += 1
+            return
+
+        try:
+            _master_and_export(self.buffer, save_path, ambient, chime,
+                               self.FADE_IN_MS, self.FADE_OUT_MS)
             
             # 重置缓冲区
             self.buffer = AudioSegment.empty()
@@ -250,6 +602,23 @@ class CinematicPackager:
             
         except Exception as e:
             logger.error(f"❌ 导出失败: {e}")
+
+    def wait_for_exports(self):
+        """等待所有后台压制任务完成并汇报结果"""
+        pending, self._pending_exports = self._pending_exports, []
+        for file_name, future in pending:
+            try:
+                future.result()
+                logger.info(f"✅ 成功导出: {file_name}")
+            except Exception as e:
+                logger.error(f"❌ 导出失败: {file_name}: {e}")
+
+    def close(self):
+        """等待后台压制完成并关闭进程池"""
+        self.wait_for_exports()
+        if self._export_pool is not None:
+            self._export_pool.shutdown(wait=True)
+            self._export_pool = None
     
     def finalize(self, ambient: Optional[AudioSegment] = None, 
                  chime: Optional[AudioSegment] = None):
@@ -260,7 +629,7 @@ class CinematicPackager:
             ambient: 环境音背景（可选）
             chime: 过渡音效（可选）
         """
-        remaining_ms = len(self.buffer)
+        remaining_ms = self._buffer_ms()
         if remaining_ms == 0:
             logger.info("没有剩余音频需要处理")
             return
@@ -283,6 +652,9 @@ class CinematicPackager:
             ambient: 环境音背景（可选）
             chime: 过渡音效（可选）
         """
+        # 前一卷可能仍在后台压制，合并前必须等它落盘
+        self.wait_for_exports()
+
         try:
             prev_index = self.file_index - 1
             prev_file = os.path.join(self.output_dir, f"Audiobook_Part_{prev_index:03d}.mp3")
@@ -292,22 +664,29 @@ class CinematicPackager:
                 self.export_volume(chime=chime)
                 return
             
-            logger.info(f"🔗 尾部合并: {len(self.buffer)/1000/60:.1f}分钟追加到 {prev_file}")
+            logger.info(f"🔗 尾部合并: {self._buffer_ms()/1000/60:.1f}分钟追加到 {prev_file}")
             
-            # 加载前一个文件
-            prev_audio = AudioSegment.from_file(prev_file, format="mp3")
-            
-            # 处理尾部音频（如有环境音则混入）
-            tail_audio = self.buffer
-            if ambient:
-                tail_audio = self.mix_ambient(tail_audio, ambient)
+            # 🌟 前一卷 MP3 由 ffmpeg 子进程解码（等待期间释放 GIL），放到后台线程，
+            # 与主线程的尾部环境音混音重叠进行
+            with concurrent.futures.ThreadPoolExecutor(max_workers=1) as decoder:
+                prev_future = decoder.submit(AudioSegment.from_file, prev_file, format="mp3")
+
+                # 处理尾部音频（如有环境音则混入）
+                tail_audio = self.buffer
+                if ambient:
+                    tail_audio = self.mix_ambient(tail_audio, ambient)
+
+                prev_audio = prev_future.result()
             
-            # 使用交叉淡化合并，避免前卷 fade_out 与尾部音频之间产生音量断层
+            # 使用等功率交叉淡化合并，避免前卷 fade_out 与尾部音频之间产生音量断层
             crossfade_ms = min(2000, len(prev_audio), len(tail_audio))
-            merged = prev_audio.append(tail_audio, crossfade=crossfade_ms)
+            merged = _equal_power_crossfade(prev_audio, tail_audio, crossfade_ms)
             
             # 重新导出
-            merged.export(prev_file, format="mp3", bitrate="128k")
+            # 注意：不能用 concat demuxer / 字节拼接直接追加 MP3 帧。前卷末尾已烘焙 fade_out，
+            # 必须解码出 PCM 才能与尾部做交叉淡化；两段独立编码的 MP3 在接缝处还会因编码器
+            # 前导延迟与尾部填充出现数十毫秒的空隙。尾部合并每本书至多一次，整卷重编码可以接受。
+            _export_mp3(merged, prev_file, bitrate="128k")
             
             # 清空缓冲区
             self.buffer = AudioSegment.empty()
@@ -326,12 +705,13 @@ class CinematicPackager:
         Returns:
             dict: 包含缓冲区信息的字典
         """
+        buffer_ms = self._buffer_ms()
         return {
-            "buffer_length_ms": len(self.buffer),
-            "buffer_length_min": len(self.buffer) / 1000 / 60,
+            "buffer_length_ms": buffer_ms,
+            "buffer_length_min": buffer_ms / 1000 / 60,
             "current_file_index": self.file_index,
             "target_duration_min": self.target_duration_ms / 1000 / 60,
-            "remaining_until_target": (self.target_duration_ms - len(self.buffer)) / 1000 / 60
+            "remaining_until_target": (self.target_duration_ms - buffer_ms) / 1000 / 60
         }
 
     def export_audacity(self, output_path: Optional[str] = None) -> Optional[str]:
@@ -363,6 +743,8 @@ class CinematicPackager:
             with zipfile.ZipFile(output_path, "w", zipfile.ZIP_DEFLATED) as zf:
                 # Write per-speaker stem WAVs
                 for speaker, track in self._speaker_tracks.items():
+                    if isinstance(track, _SegmentTrack):
+                        track = track.to_segment()
                     safe_name = speaker.replace("/", "_").replace("\\", "_")
                     wav_name = f"{safe_name}.wav"
                     tmp_wav = os.path.join(self.output_dir, f"_tmp_{wav_name}")
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+CineCast EPUB 章节文本提取器
+负责把 EPUB 中每个 XHTML 文档转换为干净的纯文本。
+
+本模块刻意保持轻量（不依赖 MLX / LLM 相关模块），
+以便作为进程池的 worker 被子进程快速导入。
+"""
+
+import html
+import posixpath
+import re
+import xml.etree.ElementTree as ET
+import zipfile
+from typing import Iterator, List
+from urllib.parse import unquote
+
+from bs4 import BeautifulSoup
+
+try:
+    import lxml  # noqa: F401  C 实现的解析后端，比纯 Python 的 html.parser 快 5-20 倍
+    _BS4_PARSER = 'lxml'
+except ImportError:
+    _BS4_PARSER = 'html.parser'
+
+# EPUB 正则快速通道：绝大多数小说章节只是 <body> 里的一串 <p>，无需完整 HTML 解析器。
+# 标题标签 (h1-h6) 一并捕获，保证"第一章"等章节标记仍出现在正文开头。
+_EPUB_BLOCK_RE = re.compile(rb'<(p|h[1-6])(?:\s[^>]*)?>(.*?)</\1\s*>', re.S | re.I)
+_EPUB_BR_RE = re.compile(rb'<br\b[^>]*>', re.I)
+_EPUB_TAG_RE = re.compile(rb'<[^>]+>')
+# 行首尾空白 + 空行一次折叠为单个换行（\s 与 str.strip 认定的空白字符一致，含全角空格）
+_LINE_COLLAPSE_RE = re.compile(r'\s*\n\s*')
+# 含表格/插图/预格式文本等复杂结构的章节回退到 BeautifulSoup 完整解析
+_EPUB_COMPLEX_RE = re.compile(rb'<(?:table|img|pre)\b', re.I)
+_EPUB_BODY_RE = re.compile(rb'<body\b[^>]*>', re.I)
+
+_EPUB_CONTAINER = 'META-INF/container.xml'
+_EPUB_DOCUMENT_TYPE = 'application/xhtml+xml'
+_EPUB_HTML_SUFFIXES = ('.xhtml', '.html', '.htm')
+
+
+def epub_document_names(z: zipfile.ZipFile) -> List[str]:
+    """列出 EPUB 中的 XHTML 文档（zip 内路径），顺序与 ebooklib 的 ITEM_DOCUMENT 一致
+
+    只读 container.xml 与 OPF manifest，不构建导航、元数据和其他资源对象。
+    OPF 缺失或损坏时退回按文件名排序的 .xhtml/.html 条目。
+    """
+    names = set(z.namelist())
+    try:
+        container = ET.fromstring(z.read(_EPUB_CONTAINER))
+        rootfile = next(el for el in container.iter() if el.tag.endswith('rootfile'))
+        opf_path = rootfile.get('full-path')
+        opf = ET.fromstring(z.read(opf_path))
+    except (KeyError, StopIteration, ET.ParseError, TypeError):
+        return sorted(n for n in names if n.lower().endswith(_EPUB_HTML_SUFFIXES))
+
+    opf_dir = posixpath.dirname(opf_path)
+    documents = []
+    for el in opf.iter():
+        if not el.tag.endswith('}item') or el.get('media-type') != _EPUB_DOCUMENT_TYPE:
+            continue
+        href = el.get('href')
+        if not href:
+            continue
+        name = posixpath.normpath(posixpath.join(opf_dir, unquote(href)))
+        if name in names:
+            documents.append(name)
+    return documents
+
+
+def iter_epub_documents(epub_path: str) -> Iterator[bytes]:
+    """按文档顺序逐个读取 EPUB 章节的原始 XHTML 字节（惰性读取，读一章交一章）"""
+    with zipfile.ZipFile(epub_path) as z:
+        for name in epub_document_names(z):
+            yield z.read(name)
+
+
+def html_to_text(raw: bytes) -> str:
+    """将章节 XHTML 转为纯文本（每个段落一行）。
+
+    快速通道：仅处理 <p>/<h1-6>、<br/> 与实体解码，纯正则完成，
+    比 BeautifulSoup 快一个数量级；下游是语音合成，少量排版信息的丢失可以接受。
+    章节包含表格/插图/<pre>、段落之外还有裸露文本（如直接写在 <div> 里的正文），
+    或找不到任何段落时，回退到 BeautifulSoup 完整解析
+    （优先使用 lxml 后端，未安装时退回 html.parser）。
+    """
+    if not _EPUB_COMPLEX_RE.search(raw):
+        blocks = _EPUB_BLOCK_RE.findall(raw)
+        if blocks and not _has_stray_text(raw):
+            return '\n'.join(
+                html.unescape(
+                    _EPUB_TAG_RE.sub(b'', _EPUB_BR_RE.sub(b'\n', body)).decode('utf-8', 'ignore')
+                ).strip()
+                for _tag, body in blocks
+            )
+    soup = BeautifulSoup(raw, _BS4_PARSER)
+    return soup.get_text(separator='\n')
+
+
+def _has_stray_text(raw: bytes) -> bool:
+    """<body> 中去掉 <p>/<h1-6> 块后是否仍有文字（快速通道会丢掉这些文字）。"""
+    body = _EPUB_BODY_RE.search(raw)
+    rest = _EPUB_BLOCK_RE.sub(b'', raw[body.end():] if body else raw)
+    return bool(html.unescape(_EPUB_TAG_RE.sub(b'', rest).decode('utf-8', 'ignore')).strip())
+
+
+def parse_chapter(raw: bytes) -> str:
+    """进程池 worker：把单个 EPUB 文档解析为去除空行、首尾空白的纯文本。
+
+    等价于逐行 strip 并丢弃空行，但在 sre 中单遍完成，不为每一行分配中间字符串。
+    """
+    return _LINE_COLLAPSE_RE.sub('\n', html_to_text(raw)).strip()
@@ -14,6 +14,7 @@ and then reassemble in the original order during Stage 3.
 
 import concurrent.futures
 import gc
+import io
 import os
 import re
 import threading  # 🚨 引入线程锁
@@ -28,13 +29,18 @@ os.environ["FIX_MISTRAL_REGEX"] = "1"
 import numpy as np
 import soundfile as sf
 import mlx.core as mx
+import mlx.nn as nn
 from mlx_audio.tts.utils import load_model
+from mlx_audio.utils import load_audio
 import logging
 from typing import List, Dict, Tuple
-from collections import defaultdict
+from collections import OrderedDict, defaultdict
 
 logger = logging.getLogger(__name__)
 
+# 参考音频解码结果 / 说话人嵌入的 LRU 缓存上限（按不同参考音频计）
+SPEAKER_CACHE_SIZE = 50
+
 
 def group_indices_by_voice_type(
     micro_script: List[Dict],
@@ -58,7 +64,23 @@ def group_indices_by_voice_type(
         groups[key].append(idx)
     return dict(groups)
 
+def write_wav(path: str, data: np.ndarray, sample_rate: int) -> None:
+    """整块写出 PCM_16 WAV 干音
+
+    先在内存里编码出完整的 RIFF 头 + PCM 数据，再以一次 write() 落盘；
+    libsndfile 直接写文件时会按内部小缓冲分多次系统调用。
+    """
+    buf = io.BytesIO()
+    sf.write(buf, np.ascontiguousarray(data), sample_rate, format='WAV', subtype='PCM_16')
+    with open(path, 'wb') as f:
+        f.write(buf.getbuffer())
+
+
 class MLXRenderEngine:
+    # render_dry_chunk 的单句结果是否也交给 I/O 线程池后台落盘（默认同步写入，供流式 API / 试音立即读取）；
+    # 开启后读取或删除输出文件前必须先 wait_for_writes() 或 destroy()
+    background_writes = False
+
     def __init__(self, model_path="./models/Qwen3-TTS-MLX-0.6B", config=None):
         """
         初始化MLX纯净干音渲染引擎 (支持 Qwen3-TTS 1.7B Model Pool)
@@ -70,14 +92,19 @@ class MLXRenderEngine:
                 - model_path_design: 1.7B VoiceDesign (设计用)
                 - model_path_custom: 1.7B CustomVoice (内置角色用)
                 - model_path_fallback: 0.6B 回退路径
+                - tts_precision: 加载后的权重精度 "bf16" / "int8" / "int4" / "fp32"，
+                  缺省保持模型自带精度（已量化的 4bit 模型不会被重复处理）
         """
         logger.info("🚀 启动 MLX 纯净干音渲染引擎...")
         self.config = config or {}
         self.default_voice = self.config.get("default_narrator_voice", "eric")
+        self.precision = self.config.get("tts_precision")
         self.current_mode = None
         self.model = None
-        # 创建专门用于磁盘写入的单线程池，避免阻塞推理
-        self.io_executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+        # 创建专门用于磁盘写入的小线程池，避免阻塞推理；
+        # libsndfile 写入时释放 GIL，两个写线程可与下一次 MLX 前向真正重叠
+        self.io_executor = concurrent.futures.ThreadPoolExecutor(max_workers=2)
+        self._pending_writes = []
         self._gpu_lock = threading.Lock()  # 🚨 引擎内部持有一把全局互斥锁
         # 严格映射本地模型，避免意外降级
         self._model_paths = {
@@ -114,9 +141,99 @@ class MLXRenderEngine:
             gc.collect()
             mx.clear_cache()
         self.model = load_model(path)
+        self._apply_precision(self.model)
+        self._install_speaker_cache(self.model)
         self.current_mode = mode
         logger.info(f"✅ 已加载模型 [{mode}]: {path}")
 
+    def _apply_precision(self, model):
+        """按 tts_precision 在首次推理前转换权重精度
+
+        TTS 解码受统一内存带宽限制，bf16 / int8 权重让每步搬运的字节数减半，
+        通常可获得接近 2× 的吞吐并释放数百 MB 统一内存；int4 再减半，
+        适合只有 fp16/bf16 权重的本地模型（发行的 4bit 模型无需再转换）。
+        """
+        precision = self.precision
+        if not precision or precision == "fp32":
+            return
+        if not isinstance(model, nn.Module):
+            return
+        if any(isinstance(m, nn.QuantizedLinear) for _, m in model.named_modules()):
+            logger.debug(f"⏭️ 模型已量化，跳过 [{precision}] 精度转换")
+            return
+        try:
+            if precision == "bf16":
+                model.set_dtype(mx.bfloat16)
+            elif precision in ("int8", "int4"):
+                nn.quantize(model, group_size=64, bits=int(precision[3:]))
+            else:
+                logger.warning(f"⚠️ 未知的 tts_precision: {precision}，保持模型自带精度")
+                return
+            logger.info(f"⚡ 模型权重已转换为 [{precision}]")
+        except Exception as e:
+            logger.warning(f"⚠️ 精度转换 [{precision}] 失败 ({e})，保持模型自带精度")
+
+    @staticmethod
+    def _install_speaker_cache(model):
+        """包装模型的 extract_speaker_embedding：同一参考音频只跑一次 mel 频谱 + 说话人编码器
+
+        Qwen3-TTS 自带的 ICL 缓存只缓存参考音频的 codec 编码，x-vector 说话人嵌入
+        仍然每句重算；同一角色在一章里往往有几十句台词，这部分计算完全重复。
+        缓存键与模型 ICL 缓存一致，使用音频的 (形状, 采样和) 指纹。
+        """
+        extract = getattr(model, "extract_speaker_embedding", None)
+        if extract is None or getattr(extract, "_cinecast_cached", False):
+            return
+        cache = OrderedDict()
+
+        def cached_extract(audio, sr=24000):
+            key = (tuple(audio.shape), float(audio.sum()), sr)
+            embedding = cache.get(key)
+            if embedding is None:
+                embedding = cache[key] = extract(audio, sr)
+                if len(cache) > SPEAKER_CACHE_SIZE:
+                    cache.popitem(last=False)
+            else:
+                cache.move_to_end(key)
+            return embedding
+
+        cached_extract._cinecast_cached = True
+        model.extract_speaker_embedding = cached_extract
+
+    def _ref_audio(self, ref):
+        """参考音频路径 -> 已解码、重采样的 mx.array（LRU 缓存，文件修改后失效）
+
+        mlx_audio 收到路径时每句都会重新读盘并重采样；传入缓存的数组则原样使用。
+        非路径或文件不存在时原样返回，由模型按原逻辑处理/报错。
+        """
+        if not isinstance(ref, str) or not ref:
+            return ref
+        try:
+            key = (ref, os.stat(ref).st_mtime_ns)
+        except OSError:
+            return ref
+        cache = self.__dict__.setdefault("_ref_audio_cache", OrderedDict())
+        audio = cache.get(key)
+        if audio is None:
+            audio = load_audio(ref, sample_rate=getattr(self.model, "sample_rate", self.sample_rate))
+            mx.eval(audio)
+            cache[key] = audio
+            if len(cache) > SPEAKER_CACHE_SIZE:
+                cache.popitem(last=False)
+        else:
+            cache.move_to_end(key)
+        return audio
+
+    def prewarm_voice(self, voice_cfg: dict):
+        """提前解码音色的参考音频（阶段二每个音色组调用一次），失败不影响后续渲染"""
+        ref = voice_cfg.get("ref_audio") or voice_cfg.get("audio")
+        if not ref:
+            return
+        try:
+            self._ref_audio(ref)
+        except Exception as e:
+            logger.debug(f"参考音频预解码失败，渲染时按路径加载: {ref}: {e}")
+
     def _load_mode(self, mode):
         """根据任务类型切换模型 (Model Pool 模式)"""
         if mode == self.current_mode:
@@ -150,14 +267,26 @@ class MLXRenderEngine:
                 except Exception as e:
                     logger.warning(f"⚠️ 预热 [{mode}] 失败: {e}")
 
+    def _submit_write(self, path, data):
+        """把编码落盘交给 I/O 线程池，与下一次前向重叠；读取或删除该文件前需 wait_for_writes()"""
+        self._pending_writes = [f for f in self._pending_writes if not f.done()]
+        self._pending_writes.append(self.io_executor.submit(
+            self._async_write_wav, path, data, self.sample_rate
+        ))
+
     def _async_write_wav(self, path, data, sr):
         """后台线程写入 WAV 文件，避免阻塞推理"""
         try:
-            sf.write(path, data, sr, format='WAV')
+            write_wav(path, data, sr)
             logger.debug(f"💾 异步写入完成: {path}")
         except Exception as e:
             logger.error(f"❌ 异步写入失败: {path}: {e}")
 
+    def wait_for_writes(self):
+        """阻塞直到所有后台 WAV 写入落盘（删除或读取这些文件之前调用）"""
+        pending, self._pending_writes = self._pending_writes, []
+        concurrent.futures.wait(pending)
+
     def destroy(self):
         """显式清理 MLX 模型资源，释放显存"""
         if hasattr(self, 'io_executor') and self.io_executor is not None:
@@ -166,6 +295,9 @@ class MLXRenderEngine:
             del self.model
             self.model = None
         self.current_mode = None
+        self.__dict__.pop("_ref_audio_cache", None)  # 缓存的参考音频同样占用 MLX 显存
+        # 模型与说话人嵌入缓存包装之间存在引用环，必须先回收，Metal 缓存池里的权重缓冲才能真正归还
+        gc.collect()
         mx.clear_cache()
         logger.info("🧹 MLX 渲染引擎资源已显式释放")
     
@@ -199,46 +331,9 @@ class MLXRenderEngine:
             return True # 🌟 断点续传核心：已存在则直接跳过！
             
         try:
-            render_text = content.strip()
-            
-            # 🌟 终极暴力清洗：消灭一切导致复读的特殊符号
-            render_text = re.sub(r'[…]+', '。', render_text)       # 中文省略号
-            render_text = re.sub(r'\.{2,}', '。', render_text)     # 英文省略号（含双点）
-            render_text = re.sub(r'[—]+', '，', render_text)       # 中文破折号
-            render_text = re.sub(r'[-]{2,}', '，', render_text)    # 英文破折号
-            render_text = re.sub(r'[~～]+', '。', render_text)     # 波浪号
-            # 清洗所有内部换行和异常空白
-            render_text = re.sub(r'\s+', ' ', render_text).strip()
-            # 智能防卡死截断：绝不生硬腰斩单词，而是寻找最近的标点
-            if len(render_text) > self.max_chars:
-                safe_text = render_text[:self.max_chars]
-                # 匹配常见中英文断句标点，从后往前找最后一个
-                last_match = None
-                for match in re.finditer(r'[。！？；.,!?;]', safe_text):
-                    last_match = match
-                if last_match:
-                    render_text = safe_text[:last_match.end()]
-                else:
-                    render_text = safe_text + "。"
-            
-            if not re.search(r'[。！？；.!?;]$', render_text):
-                render_text += "。"
-
-            # 🌟 绝杀防御：检查清理后是否只剩下标点符号（无实际文字）
-            pure_text = re.sub(r'[。，！？；、\u201c\u201d\u2018\u2019（）《》,.!?;:\'\"()\s-]', '', render_text)
-            if not pure_text:
-                # 根据残留的标点符号类型，动态决定静音时长
-                original_text = content.strip()
-                if "…" in original_text or "..." in original_text:
-                    duration = 0.6  # 省略号长停顿
-                elif "—" in original_text or "-" in original_text:
-                    duration = 0.3  # 破折号中等停顿
-                else:
-                    duration = 0.15  # 逗号等其他残留短停顿
-
-                logger.warning(f"⚠️ 切片无有效文字，生成 {duration}s 动态空白音频: {save_path}")
-                audio_data = np.zeros(int(self.sample_rate * duration), dtype=np.float32)
-                sf.write(save_path, audio_data, self.sample_rate, format='WAV')
+            render_text = self._clean_render_text(content)
+            if render_text is None:
+                self._write_pause(content, save_path)
                 return True
 
             logger.debug(f"🎵 渲染干音: {render_text[:50]}... -> {save_path}")
@@ -264,7 +359,7 @@ class MLXRenderEngine:
                     # 克隆模式：通常使用 Base 模型
                     generate_kwargs = {
                         "text": render_text,
-                        "ref_audio": voice_cfg.get("ref_audio", voice_cfg.get("audio", "")),
+                        "ref_audio": self._ref_audio(voice_cfg.get("ref_audio", voice_cfg.get("audio", ""))),
                         "ref_text": voice_cfg.get("ref_text", voice_cfg.get("text", ""))
                     }
                     # 防御性追加：以防错误地用 CustomVoice 模型跑 clone 模式
@@ -293,7 +388,7 @@ class MLXRenderEngine:
                     
                     # 如果配置里带了参考音频（基于基底音色做微调克隆）
                     if "audio" in voice_cfg and voice_cfg["audio"]:
-                        generate_kwargs["ref_audio"] = voice_cfg["audio"]
+                        generate_kwargs["ref_audio"] = self._ref_audio(voice_cfg["audio"])
                     if "text" in voice_cfg and voice_cfg["text"]:
                         generate_kwargs["ref_text"] = voice_cfg["text"]
 
@@ -303,8 +398,11 @@ class MLXRenderEngine:
             mx.eval(audio_array) # 强制执行
             audio_data = np.array(audio_array)
             
-            # 同步写入磁盘，确保流式API能够立即读取
-            sf.write(save_path, audio_data, self.sample_rate, format='WAV')
+            if self.background_writes:
+                self._submit_write(save_path, audio_data)
+            else:
+                # 同步写入磁盘，确保流式API能够立即读取
+                write_wav(save_path, audio_data, self.sample_rate)
             logger.debug(f"✅ 干音渲染完成: {save_path}")
             return True
             
@@ -324,6 +422,150 @@ class MLXRenderEngine:
             # 我们引入一个微小的开销，强制 Python 每处理完一个切片就回收废弃对象
             gc.collect()
 
+    def _clean_render_text(self, content: str):
+        """清洗并截断待渲染文本；清洗后没有实际文字时返回 None"""
+        render_text = content.strip()
+        
+        # 🌟 终极暴力清洗：消灭一切导致复读的特殊符号
+        render_text = re.sub(r'[…]+', '。', render_text)       # 中文省略号
+        render_text = re.sub(r'\.{2,}', '。', render_text)     # 英文省略号（含双点）
+        render_text = re.sub(r'[—]+', '，', render_text)       # 中文破折号
+        render_text = re.sub(r'[-]{2,}', '，', render_text)    # 英文破折号
+        render_text = re.sub(r'[~～]+', '。', render_text)     # 波浪号
+        # 清洗所有内部换行和异常空白
+        render_text = re.sub(r'\s+', ' ', render_text).strip()
+        # 智能防卡死截断：绝不生硬腰斩单词，而是寻找最近的标点
+        if len(render_text) > self.max_chars:
+            safe_text = render_text[:self.max_chars]
+            # 匹配常见中英文断句标点，从后往前找最后一个
+            last_match = None
+            for match in re.finditer(r'[。！？；.,!?;]', safe_text):
+                last_match = match
+            if last_match:
+                render_text = safe_text[:last_match.end()]
+            else:
+                render_text = safe_text + "。"
+        
+        if not re.search(r'[。！？；.!?;]$', render_text):
+            render_text += "。"
+
+        # 🌟 绝杀防御：检查清理后是否只剩下标点符号（无实际文字）
+        pure_text = re.sub(r'[。，！？；、\u201c\u201d\u2018\u2019（）《》,.!?;:\'\"()\s-]', '', render_text)
+        if not pure_text:
+            return None
+        return render_text
+
+    def _write_pause(self, content: str, save_path: str):
+        """为只含标点的切片写入动态空白音频"""
+        # 根据残留的标点符号类型，动态决定静音时长
+        original_text = content.strip()
+        if "…" in original_text or "..." in original_text:
+            duration = 0.6  # 省略号长停顿
+        elif "—" in original_text or "-" in original_text:
+            duration = 0.3  # 破折号中等停顿
+        else:
+            duration = 0.15  # 逗号等其他残留短停顿
+
+        logger.warning(f"⚠️ 切片无有效文字，生成 {duration}s 动态空白音频: {save_path}")
+        audio_data = np.zeros(int(self.sample_rate * duration), dtype=np.float32)
+        write_wav(save_path, audio_data, self.sample_rate)
+
+    @staticmethod
+    def _batchable_voice(voice_cfg: dict) -> bool:
+        """音色配置能否等价映射到 batch_generate"""
+        mode = voice_cfg.get("mode", "preset")
+        if mode == "design":
+            return True
+        if mode == "clone":
+            # 批量参考音频克隆不支持同时指定 voice
+            return "speaker" not in voice_cfg and "voice" not in voice_cfg
+        # Preset 模式附带参考音频时同样需要 voice + ref_audio 组合，只能逐句渲染
+        return not (voice_cfg.get("audio") or voice_cfg.get("text"))
+
+    def can_batch(self, voice_cfg: dict) -> bool:
+        """该音色能否走 batch_generate 真正批量前向
+
+        先切换到该音色所需的模型，再检查批量能力：不同模式的模型未必都支持 batch_generate。
+        调用方据此决定按整批还是逐句计时（不能批量时 render_dry_batch 只是逐句串行渲染）。
+        """
+        if not self._batchable_voice(voice_cfg):
+            return False
+        self._load_mode(voice_cfg.get("mode", "preset"))
+        return hasattr(self.model, "batch_generate")
+
+    def _batch_generate_kwargs(self, texts: List[str], voice_cfg: dict):
+        """把单句 generate 参数映射到 batch_generate；无法等价批量化的音色配置返回 None"""
+        if not self._batchable_voice(voice_cfg):
+            return None
+        mode = voice_cfg.get("mode", "preset")
+        if mode == "design":
+            return {"texts": texts, "instructs": [voice_cfg["instruct"]] * len(texts)}
+        if mode == "clone":
+            return {
+                "texts": texts,
+                "ref_audio": self._ref_audio(voice_cfg.get("ref_audio", voice_cfg.get("audio", ""))),
+                "ref_text": voice_cfg.get("ref_text", voice_cfg.get("text", "")),
+            }
+        target_voice = voice_cfg.get("voice", voice_cfg.get("speaker", self.default_voice))
+        return {"texts": texts, "voices": [target_voice] * len(texts)}
+
+    def render_dry_batch(self, contents: List[str], voice_cfg: dict, save_paths: List[str]) -> List[bool]:
+        """同一音色的多个切片走一次 batch_generate 批量前向，逐个写出 WAV
+
+        短句渲染时每次调用的固定开销（Metal 命令缓冲提交、音色 embedding 查表）占主导，
+        批量推理可以把它们摊薄。模型不支持批量、音色配置无法批量化或批量推理失败时，
+        回退为逐句 render_dry_chunk。
+
+        批量结果由 io_executor 在后台写盘，需要立即读取或删除这些文件时先调用 wait_for_writes()。
+
+        Returns:
+            与 save_paths 一一对应的成功标记列表
+        """
+        results = [False] * len(save_paths)
+        pending = []  # (原始位置, 清洗后的文本)
+        for pos, (content, save_path) in enumerate(zip(contents, save_paths)):
+            if os.path.exists(save_path):
+                results[pos] = True
+                continue
+            render_text = self._clean_render_text(content)
+            if render_text is None:
+                self._write_pause(content, save_path)
+                results[pos] = True
+                continue
+            pending.append((pos, render_text))
+
+        if not pending:
+            return results
+
+        if len(pending) == 1 or not self.can_batch(voice_cfg):
+            for pos, _ in pending:
+                results[pos] = self.render_dry_chunk(contents[pos], voice_cfg, save_paths[pos])
+            return results
+
+        try:
+            batch_kwargs = self._batch_generate_kwargs([text for _, text in pending], voice_cfg)
+            pieces = defaultdict(list)
+            for result in self.model.batch_generate(**batch_kwargs):
+                pieces[result.sequence_idx].append(result.audio)
+            for seq_idx, (pos, _) in enumerate(pending):
+                if not pieces.get(seq_idx):
+                    continue
+                audio_array = mx.concatenate(pieces[seq_idx]) if len(pieces[seq_idx]) > 1 else pieces[seq_idx][0]
+                mx.eval(audio_array)
+                # 🌟 MLX → numpy 在推理线程完成，编码落盘交给 I/O 线程池，与下一批前向重叠
+                self._submit_write(save_paths[pos], np.array(audio_array))
+                results[pos] = True
+            logger.debug(f"✅ 批量干音渲染完成: {len(pending)} 个切片")
+        except Exception as e:
+            logger.warning(f"⚠️ 批量渲染失败 ({e})，回退逐句渲染")
+            for pos, _ in pending:
+                if not results[pos]:
+                    results[pos] = self.render_dry_chunk(contents[pos], voice_cfg, save_paths[pos])
+        finally:
+            mx.clear_cache()
+            gc.collect()
+        return results
+
 class CinecastMLXEngine:
     """增强型 MLX 推理引擎。
 
@@ -448,6 +690,63 @@ class CinecastMLXEngine:
             logger.error(f"克隆音频生成过程中出错: {e}")
             raise
 
+    def generate_batch(self, texts: List[str], role_feature=None, language: str = "zh") -> List[np.ndarray]:
+        """同一音色的多段文本走一次 batch_generate 批量前向（供 AudiobookOrchestrator 按角色批量提交）
+
+        Args:
+            texts: 要合成的文本列表
+            role_feature: 克隆特征字典；为 None 时使用基础（预设）音色
+            language: 语言代码，作为 lang_code 传给 batch_generate
+
+        Returns:
+            与 texts 一一对应的音频数组列表。模型不支持批量、特征无法批量化（如 spk_emb）
+            或批量推理失败时，回退为逐句 generate_voice_clone / 基础模式推理。
+        """
+        engine = self._ensure_render_engine()
+
+        def run_one(text):
+            if role_feature is None:
+                return self._run_base(text)[0]
+            return self.generate(text, mode="clone", prompt_npz=role_feature, language=language)[0]
+
+        if role_feature is None:
+            voice_cfg = {"mode": "preset"}
+        else:
+            voice_cfg = {"mode": "clone"}
+            if isinstance(role_feature, dict):
+                if "ref_audio" in role_feature:
+                    voice_cfg["ref_audio"] = str(role_feature["ref_audio"])
+                if "ref_text" in role_feature:
+                    voice_cfg["ref_text"] = str(role_feature["ref_text"])
+            # spk_emb 与缺少参考音频的特征无法等价映射到 batch_generate
+            if not isinstance(role_feature, dict) or "spk_emb" in role_feature or "ref_audio" not in voice_cfg:
+                return [run_one(text) for text in texts]
+
+        if len(texts) <= 1:
+            return [run_one(text) for text in texts]
+
+        try:
+            engine._load_mode(voice_cfg["mode"])
+            batch_kwargs = engine._batch_generate_kwargs(texts, voice_cfg)
+            if batch_kwargs is None or not hasattr(engine.model, "batch_generate"):
+                return [run_one(text) for text in texts]
+            pieces = defaultdict(list)
+            for result in engine.model.batch_generate(**batch_kwargs, lang_code=language):
+                pieces[result.sequence_idx].append(result.audio)
+            if len(pieces) != len(texts):
+                raise RuntimeError(f"批量输出数量不符: {len(pieces)}/{len(texts)}")
+            audios = []
+            for seq_idx in range(len(texts)):
+                audio_array = mx.concatenate(pieces[seq_idx]) if len(pieces[seq_idx]) > 1 else pieces[seq_idx][0]
+                mx.eval(audio_array)
+                audios.append(np.array(audio_array))
+            return audios
+        except Exception as e:
+            logger.warning(f"⚠️ 批量生成失败 ({e})，回退逐句生成")
+            return [run_one(text) for text in texts]
+        finally:
+            mx.clear_cache()
+
     def _run_voice_design(self, text: str, instruct: str):
         """执行音色设计推理。"""
         engine = self._ensure_render_engine()
@@ -626,6 +925,26 @@ class CinecastMLXEngine:
 
 
 if __name__ == "__main__":
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description="CineCast MLX 干音渲染引擎")
+    parser.add_argument("--serve", metavar="SOCKET", help="以常驻守护进程运行，在指定 Unix socket 上接收渲染请求")
+    parser.add_argument("--model-path", default=None, help="默认/回退模型路径")
+    parser.add_argument("--config", default=None, help="引擎配置 (JSON)")
+    parser.add_argument("--out-dir", default=None, help="守护进程允许写入干音的目录（--serve 时必填）")
+    cli_args = parser.parse_args()
+
+    if cli_args.serve:
+        from modules.tts_daemon import serve
+
+        if not cli_args.out_dir:
+            parser.error("--serve 需要同时指定 --out-dir")
+        logging.basicConfig(level=logging.INFO)
+        serve(cli_args.serve, cli_args.model_path,
+              json.loads(cli_args.config) if cli_args.config else None, cli_args.out_dir)
+        raise SystemExit(0)
+
     # 测试代码
     logging.basicConfig(level=logging.DEBUG)
     
@@ -0,0 +1,325 @@
+#!/usr/bin/env python3
+"""
+CineCast 常驻 TTS 渲染进程
+把 MLXRenderEngine 放进一个长期存活的子进程，通过本地 Unix socket 接收渲染请求，
+模型在多次 main() 运行之间保持驻留（类似 Ollama 的 keep_alive=-1），
+重跑或断点续传时省去每次 5-30 秒的模型冷加载。
+
+协议：每行一个 JSON 请求、每行一个 JSON 响应（同一连接内严格一问一答）。
+    {"op": "chunk", "text": ..., "voice": {...}, "out": ...}      -> {"ok": true}
+    {"op": "batch", "texts": [...], "voice": {...}, "outs": [...]} -> {"ok": [true, ...]}
+    {"op": "can_batch", "voice": {...}}                           -> {"ok": true/false}
+    {"op": "warmup", "modes": [...]} / {"op": "shutdown"}
+    {"op": "ping"} -> {"ok": true, "pid": ..., "config_hash": ...}
+
+ping 回复携带模型路径与引擎配置的摘要 (config_hash)，客户端据此拒绝复用以其他模型/精度启动的守护进程。
+socket 按用户隔离且仅属主可连接（0600）；守护进程只向启动时指定的输出目录 (out_dir) 写文件。
+
+本模块客户端部分不依赖 MLX，主进程可以在不加载模型的情况下探测和连接守护进程。
+"""
+
+import hashlib
+import json
+import logging
+import os
+import signal
+import socket
+import socketserver
+import subprocess
+import sys
+import threading
+import time
+from typing import List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def _default_socket_path() -> str:
+    """按用户隔离的 socket 路径：优先 $XDG_RUNTIME_DIR（仅属主可访问），否则 /tmp 下带 uid 的文件名"""
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime_dir and os.path.isdir(runtime_dir):
+        return os.path.join(runtime_dir, "cinecast_tts.sock")
+    return f"/tmp/cinecast_tts-{os.getuid()}.sock"
+
+
+DEFAULT_SOCKET_PATH = _default_socket_path()
+
+# 引擎配置中的模型路径键：传给守护进程前统一转为绝对路径
+_MODEL_PATH_KEYS = ("model_path_base", "model_path_design", "model_path_custom", "model_path_fallback")
+
+
+def _absolute_paths(model_path: Optional[str], config: Optional[dict]):
+    """把模型路径与模型池路径转为绝对路径，守护进程与进程内加载解析到同一组模型"""
+    config = dict(config or {})
+    for key in _MODEL_PATH_KEYS:
+        if config.get(key):
+            config[key] = os.path.abspath(config[key])
+    return (os.path.abspath(model_path) if model_path else None), config
+
+
+def config_hash(model_path: Optional[str], config: Optional[dict], out_dir: str) -> str:
+    """模型路径 + 引擎配置（含 tts_precision 等）+ 输出目录的稳定摘要，用于判断守护进程能否复用
+
+    引擎未配置的模型池路径按工作目录解析，因此工作目录也计入摘要。
+    """
+    model_path, config = _absolute_paths(model_path, config)
+    payload = json.dumps({"model_path": model_path, "config": config, "cwd": os.getcwd(),
+                          "out_dir": os.path.realpath(out_dir)},
+                         sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+class _RenderHandler(socketserver.StreamRequestHandler):
+    """单个客户端连接：逐行读取请求并在共享引擎上串行执行"""
+
+    def handle(self):
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            try:
+                request = json.loads(line)
+                op = request.get("op")
+                if op == "shutdown":
+                    self._reply({"ok": True})
+                    threading.Thread(target=self.server.shutdown, daemon=True).start()
+                    return
+                if op == "ping":
+                    # 不排队等渲染锁：推理卡死时仍能拿到 pid，以便强制结束
+                    response = {"ok": True, "pid": os.getpid(), "config_hash": self.server.config_hash}
+                else:
+                    with self.server.render_lock:
+                        response = self._dispatch(op, request)
+            except Exception as e:
+                logger.error(f"❌ 守护进程处理请求失败: {e}")
+                response = {"ok": False, "error": str(e)}
+            self._reply(response)
+
+    def _dispatch(self, op, request) -> dict:
+        engine = self.server.engine
+        if op == "warmup":
+            engine.warmup(request.get("modes"))
+            return {"ok": True}
+        if op == "can_batch":
+            return {"ok": bool(engine.can_batch(request["voice"]))}
+        if op == "chunk":
+            out = self._check_out(request["out"])
+            return {"ok": bool(engine.render_dry_chunk(request["text"], request["voice"], out))}
+        if op == "batch":
+            outs = [self._check_out(path) for path in request["outs"]]
+            outcomes = engine.render_dry_batch(request["texts"], request["voice"], outs)
+            # 客户端收到响应后可能立即读取/删除这些文件，回复前必须等后台写入落盘
+            engine.wait_for_writes()
+            return {"ok": [bool(ok) for ok in outcomes]}
+        raise ValueError(f"unknown op: {op}")
+
+    def _check_out(self, path: str) -> str:
+        """拒绝写到输出目录之外的路径（含 .. 与符号链接逃逸）"""
+        real = os.path.realpath(path)
+        if os.path.commonpath([real, self.server.out_dir]) != self.server.out_dir:
+            raise PermissionError(f"输出路径不在缓存目录内: {path}")
+        return path
+
+    def _reply(self, response: dict):
+        self.wfile.write(json.dumps(response, ensure_ascii=False).encode("utf-8") + b"\n")
+        self.wfile.flush()
+
+
+class _RenderServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, socket_path, engine, out_dir, config_hash=None):
+        super().__init__(socket_path, _RenderHandler)
+        self.engine = engine
+        self.config_hash = config_hash
+        self.out_dir = os.path.realpath(out_dir)
+        # MLX 推理不是线程安全的，多个连接的请求在同一把锁下排队
+        self.render_lock = threading.Lock()
+
+    def server_bind(self):
+        # 以 0600 创建 socket 文件，其他用户无法连接
+        old_umask = os.umask(0o177)
+        try:
+            super().server_bind()
+        finally:
+            os.umask(old_umask)
+
+
+def serve(socket_path: str, model_path: Optional[str], config: Optional[dict], out_dir: str):
+    """加载引擎并在 socket_path 上常驻服务，直到收到 shutdown 请求；只接受写入 out_dir 内的请求"""
+    from modules.mlx_tts_engine import MLXRenderEngine
+
+    if os.path.exists(socket_path):
+        if ping(socket_path):
+            raise RuntimeError(f"TTS 守护进程已在运行: {socket_path}")
+        os.remove(socket_path)  # 上次异常退出遗留的 socket 文件
+
+    engine = MLXRenderEngine(model_path or "./models/Qwen3-TTS-MLX-0.6B", config=config)
+    server = _RenderServer(socket_path, engine, out_dir, config_hash(model_path, config, out_dir))
+    logger.info(f"🛰️ TTS 守护进程已就绪，模型常驻内存: {socket_path}")
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+        engine.destroy()
+        logger.info("🛰️ TTS 守护进程已退出")
+
+
+def _ping_reply(socket_path: str, timeout: float) -> Optional[dict]:
+    """向守护进程发送 ping，返回其回复；未存活时返回 None"""
+    if not os.path.exists(socket_path):
+        return None
+    try:
+        client = RemoteRenderEngine(socket_path, timeout=timeout)
+        try:
+            reply = client._call({"op": "ping"})
+        finally:
+            client.close()
+    except (OSError, ValueError):
+        return None
+    return reply if reply.get("ok") is True else None
+
+
+def ping(socket_path: str = DEFAULT_SOCKET_PATH, timeout: float = 2.0,
+         expected_hash: Optional[str] = None) -> bool:
+    """守护进程是否在 socket_path 上存活；给出 expected_hash 时还要求其配置摘要一致"""
+    reply = _ping_reply(socket_path, timeout)
+    if reply is None:
+        return False
+    return expected_hash is None or reply.get("config_hash") == expected_hash
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def stop(socket_path: str = DEFAULT_SOCKET_PATH, timeout: float = 30.0) -> bool:
+    """请求守护进程退出；推理卡死导致超时仍未退出时强制结束进程
+
+    Returns:
+        守护进程是否已不在运行
+    """
+    reply = _ping_reply(socket_path, timeout=2.0)
+    if reply is None:
+        return True
+    pid = reply.get("pid")
+    try:
+        RemoteRenderEngine(socket_path, timeout=timeout).shutdown_daemon()
+    except (OSError, ValueError):
+        pass
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if not _pid_alive(pid):
+            return True
+        time.sleep(0.2)
+    logger.warning(f"⚠️ TTS 守护进程 (pid {pid}) {timeout:.0f} 秒内未退出，强制结束")
+    try:
+        os.kill(pid, signal.SIGKILL)
+    except ProcessLookupError:
+        pass
+    return not ping(socket_path)
+
+
+def launch(socket_path: str, model_path: Optional[str], config: Optional[dict], out_dir: str,
+           timeout: float = 300.0) -> bool:
+    """确保守护进程在运行：未运行时以独立会话拉起并等待模型加载完成
+
+    已在运行但模型路径/引擎配置/输出目录不同（config_hash 不一致）的守护进程会先被关闭再重新拉起。
+    """
+    expected = config_hash(model_path, config, out_dir)
+    reply = _ping_reply(socket_path, timeout=2.0)
+    if reply is not None:
+        if reply.get("config_hash") == expected:
+            return True
+        logger.info(f"🛰️ TTS 守护进程配置已变更，正在重启: {socket_path}")
+        if not stop(socket_path):
+            logger.error("❌ 旧的 TTS 守护进程未能退出")
+            return False
+    model_path, config = _absolute_paths(model_path, config)
+    cmd = [sys.executable, "-m", "modules.mlx_tts_engine", "--serve", socket_path,
+           "--out-dir", os.path.realpath(out_dir)]
+    if model_path:
+        cmd += ["--model-path", model_path]
+    if config:
+        cmd += ["--config", json.dumps(config, ensure_ascii=False)]
+    project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [project_root, env.get("PYTHONPATH")]))
+    logger.info(f"🛰️ 正在启动 TTS 守护进程: {socket_path}")
+    # 在调用方的工作目录启动，引擎内置的相对模型路径与进程内加载解析一致；
+    # start_new_session：主程序退出后守护进程继续驻留
+    proc = subprocess.Popen(cmd, env=env, start_new_session=True,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            logger.error(f"❌ TTS 守护进程启动失败 (exit code {proc.returncode})")
+            return False
+        if ping(socket_path, expected_hash=expected):
+            return True
+        time.sleep(0.5)
+    logger.error(f"❌ TTS 守护进程 {timeout:.0f} 秒内未就绪")
+    return False
+
+
+class RemoteRenderEngine:
+    """MLXRenderEngine 的 socket 客户端，接口与阶段二使用的本地引擎一致
+
+    destroy() 只断开连接，不会卸载守护进程中的模型。
+    """
+
+    def __init__(self, socket_path: str = DEFAULT_SOCKET_PATH, timeout: Optional[float] = None):
+        self.socket_path = socket_path
+        self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._sock.settimeout(timeout)
+        self._sock.connect(socket_path)
+        self._file = self._sock.makefile("rwb")
+
+    def _call(self, request: dict) -> dict:
+        self._file.write(json.dumps(request, ensure_ascii=False).encode("utf-8") + b"\n")
+        self._file.flush()
+        line = self._file.readline()
+        if not line:
+            raise ConnectionError("TTS 守护进程已断开连接")
+        return json.loads(line)
+
+    def warmup(self, modes=None):
+        self._call({"op": "warmup", "modes": modes})
+
+    def can_batch(self, voice_cfg: dict) -> bool:
+        return self._call({"op": "can_batch", "voice": voice_cfg}).get("ok") is True
+
+    def render_dry_chunk(self, content: str, voice_cfg: dict, save_path: str) -> bool:
+        response = self._call({"op": "chunk", "text": content, "voice": voice_cfg,
+                               "out": os.path.abspath(save_path)})
+        return response.get("ok") is True
+
+    def render_dry_batch(self, contents: List[str], voice_cfg: dict, save_paths: List[str]) -> List[bool]:
+        response = self._call({"op": "batch", "texts": list(contents), "voice": voice_cfg,
+                               "outs": [os.path.abspath(p) for p in save_paths]})
+        ok = response.get("ok")
+        return ok if isinstance(ok, list) else [False] * len(save_paths)
+
+    def wait_for_writes(self):
+        """守护进程在回复前已等待写入落盘，这里无需额外操作"""
+
+    def shutdown_daemon(self):
+        """请求守护进程退出并释放模型"""
+        self._call({"op": "shutdown"})
+        self.close()
+
+    def close(self):
+        try:
+            self._file.close()
+        finally:
+            self._sock.close()
+
+    def destroy(self):
+        self.close()
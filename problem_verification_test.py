@@ -92,7 +92,6 @@ def check_epub_support():
     
     # 检查相关依赖是否安装
     try:
-        import ebooklib
         from bs4 import BeautifulSoup
         logger.info("✅ EPUB相关依赖已安装")
         epub_supported = True
@@ -104,7 +103,7 @@ def check_epub_support():
     try:
         with open('main_producer.py', 'r', encoding='utf-8') as f:
             content = f.read()
-            if 'ebooklib' in content or 'epub' in content or 'BeautifulSoup' in content:
+            if 'epub_extractor' in content or 'epub' in content:
                 logger.info("✅ 主控程序包含EPUB处理逻辑")
                 epub_logic_exists = True
             else:
@@ -4,12 +4,17 @@ Tests for CineCast architecture upgrades.
 
 Covers:
 - JSON robust repair (repair_json_array, salvage_json_entries)
-- Atomic file writes (atomic_json_write)
+- Atomic file writes (atomic_json_write) and grouped fsync (fsync_dir)
 - Narrator merging (merge_consecutive_narrators)
 - Context sliding window
 - Group-by-voice rendering indices
 - Dynamic pause logic in CinematicPackager
+- Ambient bed is loop-mixed in NumPy blocks, byte-identical to pydub overlay (incl. clipping)
+- The ambient bed is only tiled up to the volume length (no block-sized copy for short volumes)
+- The -25 dB ambient gain is applied once to the un-looped bed
+- Volume fade-in / chime prefix / fade-out are fused into one copy, byte-identical to pydub; the fade-in is kept after the chime
 - Audacity multi-track export
+- AssetManager config-file loading (parsed once, resolved path reused per asset_dir)
 """
 
 import json
@@ -158,6 +163,53 @@ class TestAtomicJsonWrite:
                 loaded = json.load(f)
             assert loaded["version"] == 2
 
+    def test_output_matches_stdlib_layout(self):
+        """orjson fast path and stdlib fallback produce equivalent readable JSON."""
+        from unittest import mock
+        import modules.llm_director as llm_director
+        data = [{"chunk_id": "c1", "content": "中文", 1: True}]
+        with tempfile.TemporaryDirectory() as tmpdir:
+            fast, slow = os.path.join(tmpdir, "fast.json"), os.path.join(tmpdir, "slow.json")
+            atomic_json_write(fast, data)
+            with mock.patch.object(llm_director, "orjson", None):
+                atomic_json_write(slow, data)
+            with open(fast, encoding="utf-8") as f1, open(slow, encoding="utf-8") as f2:
+                fast_text, slow_text = f1.read(), f2.read()
+            assert "中文" in fast_text and "中文" in slow_text
+            assert json.loads(fast_text) == json.loads(slow_text) == [{"chunk_id": "c1", "content": "中文", "1": True}]
+
+    def test_numpy_scalars_fall_back_to_stdlib(self):
+        np = pytest.importorskip("numpy")
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "test.json")
+            atomic_json_write(path, {"ratio": np.float64(0.5)})
+            with open(path, "r", encoding="utf-8") as f:
+                assert json.load(f) == {"ratio": 0.5}
+
+    def test_default_write_skips_fsync(self):
+        from unittest import mock
+        with tempfile.TemporaryDirectory() as tmpdir:
+            with mock.patch("modules.llm_director.os.fsync") as fsync:
+                atomic_json_write(os.path.join(tmpdir, "a.json"), {"a": 1})
+            fsync.assert_not_called()
+
+    def test_sync_dir_fsyncs_file_and_directory(self):
+        from unittest import mock
+        with tempfile.TemporaryDirectory() as tmpdir:
+            with mock.patch("modules.llm_director.os.fsync") as fsync:
+                atomic_json_write(os.path.join(tmpdir, "a.json"), {"a": 1}, sync_dir=True)
+            assert fsync.call_count == 2
+
+    def test_fsync_dir_groups_batch(self):
+        from unittest import mock
+        from modules.llm_director import fsync_dir
+        with tempfile.TemporaryDirectory() as tmpdir:
+            for name in ("a.json", "b.json"):
+                atomic_json_write(os.path.join(tmpdir, name), {})
+            with mock.patch("modules.llm_director.os.fsync") as fsync:
+                fsync_dir(tmpdir, ["a.json", "b.json", "missing.json"])
+            assert fsync.call_count == 3  # two files + the directory once
+
 
 # ---------------------------------------------------------------------------
 # P1-2: Narrator Merging
@@ -276,6 +328,127 @@ class TestDynamicPauses:
             assert packager._timeline_ms == 0
 
 
+class TestAmbientMix:
+    def _tone(self, ms, freq):
+        from pydub.generators import Sine
+        return Sine(freq).to_audio_segment(duration=ms).set_frame_rate(22050).set_channels(1)
+
+    def test_loop_overlay_matches_concatenated_loop(self):
+        from modules.cinematic_packager import _mix_ambient
+        main = self._tone(2000, 440)
+        ambient = self._tone(700, 220)
+        quiet = ambient - 25
+        expected = main.overlay((quiet * (len(main) // len(quiet) + 1))[:len(main)])
+        mixed = _mix_ambient(main, ambient)
+        assert len(mixed) == len(main)
+        assert mixed.raw_data == expected.raw_data
+
+    def test_mix_does_not_repeat_ambient(self):
+        from unittest import mock
+        from pydub import AudioSegment
+        from modules.cinematic_packager import _mix_ambient
+        with mock.patch.object(AudioSegment, "__mul__", side_effect=AssertionError("looped copy")):
+            _mix_ambient(self._tone(3000, 440), self._tone(600, 220))
+
+    def test_16bit_mix_skips_pydub_overlay(self):
+        from unittest import mock
+        from pydub import AudioSegment
+        from modules.cinematic_packager import _mix_ambient
+        main, ambient = self._tone(4000, 440), self._tone(900, 220)
+        expected = main.overlay(ambient - 25, loop=True).raw_data
+        with mock.patch.object(AudioSegment, "overlay", side_effect=AssertionError("overlay")):
+            assert _mix_ambient(main, ambient).raw_data == expected
+
+    def test_numpy_add_matches_audioop_saturation(self):
+        from unittest import mock
+        import modules.cinematic_packager as cp
+        main = (self._tone(1500, 440) + 20).set_channels(2)  # clipped, stereo
+        bed = (self._tone(530, 330) + 20).set_channels(2)
+        expected = main.overlay(bed, loop=True).raw_data
+        with mock.patch.object(cp, "AMBIENT_MIX_BLOCK", 1000):  # many blocks, phase != 0
+            assert cp._add_looped_pcm16(main.raw_data, bed.raw_data) == expected
+        assert cp._add_looped_pcm16(main.raw_data, bed.raw_data) == expected
+
+    def test_bed_longer_than_main_not_tiled_to_block(self):
+        from unittest import mock
+        import numpy as np
+        import modules.cinematic_packager as cp
+        main = self._tone(800, 440)
+        bed = self._tone(1200, 330)
+        with mock.patch.object(cp.np, "tile", wraps=np.tile) as tile:
+            mixed = cp._add_looped_pcm16(main.raw_data, bed.raw_data)
+        assert tile.call_args.args[1] == 2
+        assert mixed == main.overlay(bed, loop=True).raw_data
+
+    def test_gain_applied_once_to_unlooped_bed(self):
+        from unittest import mock
+        from pydub import AudioSegment
+        from modules.cinematic_packager import _mix_ambient
+        ambient = self._tone(600, 220)
+        with mock.patch.object(AudioSegment, "apply_gain", autospec=True,
+                               side_effect=AudioSegment.apply_gain) as apply_gain:
+            _mix_ambient(self._tone(5000, 440), ambient)
+        apply_gain.assert_called_once()
+        assert len(apply_gain.call_args.args[0]) == len(ambient)
+
+    def test_short_ambient_skipped(self):
+        from modules.cinematic_packager import _mix_ambient
+        main = self._tone(1000, 440)
+        assert _mix_ambient(main, self._tone(200, 220)) is main
+
+
+class TestVolumeEnvelope:
+    def _noise(self, frames, rate=22050, channels=1):
+        import numpy as np
+        from pydub import AudioSegment
+        data = np.random.default_rng(frames).integers(-32768, 32767, frames * channels, dtype=np.int16)
+        return AudioSegment(data=data.tobytes(), sample_width=2, frame_rate=rate, channels=channels)
+
+    def _reference(self, audio, chime, fade_in_ms, fade_out_ms):
+        final = audio.fade_in(min(fade_in_ms, len(audio)))
+        if chime and len(chime) > 500:
+            final = chime + final
+        return final.fade_out(min(fade_out_ms, len(final)))
+
+    @pytest.mark.parametrize("frames,chime_frames,channels", [
+        (22050 * 5 + 7, 22050 // 2 + 3, 1),   # 非整毫秒：pydub 会截断尾帧
+        (22050 * 4 + 20, 13000, 2),          # 尾部按毫秒补零、立体声
+        (22050 * 2, 0, 1),                   # 无过渡音，淡入淡出区间重叠
+        (22050 * 3, 5000, 1),                # 过渡音过短被跳过
+    ])
+    def test_matches_pydub_fades(self, frames, chime_frames, channels):
+        from modules.cinematic_packager import _apply_envelope
+        audio = self._noise(frames, channels=channels)
+        chime = self._noise(chime_frames, channels=channels) if chime_frames else None
+        expected = self._reference(audio, chime, 3000, 2000)
+        assert _apply_envelope(audio, chime, 3000, 2000).raw_data == expected.raw_data
+
+    def test_fade_in_kept_after_chime(self):
+        import numpy as np
+        from modules.cinematic_packager import _apply_envelope
+        chime = self._noise(22050)
+        mastered = _apply_envelope(self._noise(22050 * 6), chime, 3000, 2000)
+        samples = np.frombuffer(mastered.raw_data, dtype=np.int16)
+        assert mastered.raw_data[:len(chime.raw_data)] == chime.raw_data
+        head = samples[len(chime.raw_data) // 2:][:22]  # 主干第一个毫秒
+        assert np.abs(head.astype(np.int32)).max() <= 1
+
+    def test_single_full_copy(self):
+        from unittest import mock
+        from pydub import AudioSegment
+        from modules.cinematic_packager import _apply_envelope
+        with mock.patch.object(AudioSegment, "fade", side_effect=AssertionError("pydub fade")), \
+                mock.patch.object(AudioSegment, "__add__", side_effect=AssertionError("concat")):
+            _apply_envelope(self._noise(22050 * 4), self._noise(22050), 3000, 2000)
+
+    def test_mismatched_chime_falls_back(self):
+        from modules.cinematic_packager import _apply_envelope
+        audio = self._noise(22050 * 4)
+        chime = self._noise(24000, rate=24000)
+        expected = self._reference(audio, chime, 3000, 2000)
+        assert _apply_envelope(audio, chime, 3000, 2000).raw_data == expected.raw_data
+
+
 # ---------------------------------------------------------------------------
 # P2-2: Audacity Export
 # ---------------------------------------------------------------------------
@@ -658,6 +831,9 @@ class TestAssetManagerConfigLoading:
                     "male_default": {
                         "acoustic_description": "test male voice"
                     },
+                    "young_male": {
+                        "acoustic_description": "test young male voice"
+                    },
                     "female_default": {
                         "acoustic_description": "test female voice"
                     }
@@ -678,9 +854,53 @@ class TestAssetManagerConfigLoading:
 
             assert manager.voices["narrator"]["text"] == "test narrator voice"
             assert manager.voices["male_pool"][0]["text"] == "test male voice"
+            assert manager.voices["male_pool"][1]["text"] == "test young male voice"
+            assert manager.voices["title"]["text"] == "test narrator voice"
             assert manager.voices["female_pool"][0]["text"] == "test female voice"
             assert manager.target_sr == 44100
 
+    def test_config_parsed_once_until_modified(self):
+        """Repeated AssetManager construction reuses the parsed config until its mtime changes."""
+        from unittest import mock
+        import modules.asset_manager as am
+        with tempfile.TemporaryDirectory() as tmpdir:
+            config_path = os.path.join(tmpdir, "audio_assets_config.json")
+            with open(config_path, 'w') as f:
+                json.dump({"voice_reference": {"narrator": {"acoustic_description": "v1"}}}, f)
+            asset_dir = os.path.join(tmpdir, "assets")
+            os.makedirs(asset_dir, exist_ok=True)
+            with mock.patch.object(am.json, "load", wraps=json.load) as load:
+                AssetManager(asset_dir)
+                assert AssetManager(asset_dir).voices["narrator"]["text"] == "v1"
+                assert load.call_count == 1
+                with open(config_path, 'w') as f:
+                    json.dump({"voice_reference": {"narrator": {"acoustic_description": "v2"}}}, f)
+                st = os.stat(config_path)
+                os.utime(config_path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+                assert AssetManager(asset_dir).voices["narrator"]["text"] == "v2"
+                assert load.call_count == 2
+
+    def test_config_path_resolved_once(self):
+        """A resolved config location is reused; only its mtime is checked on later constructions."""
+        from unittest import mock
+        import modules.asset_manager as am
+        with tempfile.TemporaryDirectory() as tmpdir:
+            asset_dir = os.path.join(tmpdir, "assets")  # no config next to it -> project-root fallback
+            AssetManager(asset_dir)
+            with mock.patch.object(am, "_mtime_ns", wraps=am._mtime_ns) as probe:
+                AssetManager(asset_dir)
+            config_calls = [c for c in probe.call_args_list if c.args[0].endswith("audio_assets_config.json")]
+            assert len(config_calls) == 1
+            assert config_calls[0].args[0] == am._CONFIG_PATH_CACHE[asset_dir]
+
+            # a config created next to the assets later takes over once the cached file is gone
+            local = os.path.join(tmpdir, "audio_assets_config.json")
+            with open(local, 'w') as f:
+                json.dump({"voice_reference": {"narrator": {"acoustic_description": "local"}}}, f)
+            am._CONFIG_PATH_CACHE[asset_dir] = os.path.join(tmpdir, "removed.json")
+            assert AssetManager(asset_dir).voices["narrator"]["text"] == "local"
+            assert am._CONFIG_PATH_CACHE[asset_dir] == local
+
     def test_works_without_config_file(self):
         """AssetManager should work with defaults when config file is missing."""
         with tempfile.TemporaryDirectory() as tmpdir:
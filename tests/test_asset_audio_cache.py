@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+"""
+Tests for the decoded-audio cache behind AssetManager's ambient / chime lookups.
+
+Covers:
+- Repeated get_ambient_sound calls decode the file only once
+- Replacing the file (new mtime) invalidates the cached decode
+- get_transition_chime shares the same cache
+- A cached lookup costs one stat per candidate file (no separate exists check)
+- A missing preferred candidate is resolved with one scandir instead of per-candidate stats
+- Ambient / chime files uploaded after construction are found (no stale init-time index)
+- .wav assets are decoded in-process by pydub's WAV path without spawning ffmpeg
+- prewarm_audio decodes ambient + chime concurrently into the shared cache
+- get_voice_for_role touches the filesystem only on a speaker's first lookup
+- A known speaker is resolved with a single role_voice_map probe
+- Pool assignment for new speakers keeps the historical md5 bucketing
+- Pool assignment is identical across processes with different hash seeds
+- Auto-assigned speakers are LRU-bounded; explicit bindings are never evicted
+- New speakers are checked against the assets/voices index instead of per-speaker stat calls
+- get_asset_manager returns one shared instance per asset_dir
+- scan_voice_assets lists audio files only (one scandir, no sub-directories)
+"""
+
+import hashlib
+import os
+import sys
+import tempfile
+from unittest import mock
+
+import numpy as np
+import soundfile as sf
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pydub import AudioSegment
+
+import modules.asset_manager as am
+from modules.asset_manager import AssetManager
+
+
+def _write(path, seconds=0.2, sr=48000):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    sf.write(path, np.zeros(int(sr * seconds), dtype=np.float32), sr)
+
+
+class TestAudioCache:
+    def setup_method(self):
+        am._load_normalized_audio.cache_clear()
+
+    def test_ambient_decoded_once(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            _write(os.path.join(tmpdir, "ambient", "rain.wav"))
+            assets = AssetManager(tmpdir)
+            with mock.patch.object(am.AudioSegment, "from_file",
+                                   wraps=AudioSegment.from_file) as from_file:
+                first = assets.get_ambient_sound("rain")
+                second = assets.get_ambient_sound("rain")
+            assert from_file.call_count == 1
+            assert first is second
+            assert first.frame_rate == assets.target_sr
+
+    def test_replaced_file_is_reloaded(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "ambient", "rain.wav")
+            _write(path, seconds=0.2)
+            assets = AssetManager(tmpdir)
+            assert len(assets.get_ambient_sound("rain")) == 200
+            _write(path, seconds=0.5)
+            st = os.stat(path)
+            os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+            assert len(assets.get_ambient_sound("rain")) == 500
+
+    def test_chime_cached(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            _write(os.path.join(tmpdir, "transitions", "soft_chime.wav"))
+            assets = AssetManager(tmpdir)
+            with mock.patch.object(am.AudioSegment, "from_file",
+                                   wraps=AudioSegment.from_file) as from_file:
+                assets.get_transition_chime()
+                assets.get_transition_chime()
+            assert from_file.call_count == 1
+
+
+    def test_cached_lookup_single_stat(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            _write(os.path.join(tmpdir, "ambient", "rain.wav"))
+            assets = AssetManager(tmpdir)
+            assets.get_ambient_sound("rain")
+            with mock.patch.object(am.os, "stat", wraps=os.stat) as stat, \
+                    mock.patch.object(am.os.path, "exists") as exists:
+                assets.get_ambient_sound("rain")
+            exists.assert_not_called()
+            assert stat.call_count == 1
+
+
+    def test_fallback_candidate_found_with_one_scandir(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            _write(os.path.join(tmpdir, "transitions", "chime.wav"))
+            assets = AssetManager(tmpdir)
+            assets.get_transition_chime()
+            with mock.patch.object(am.os, "stat", wraps=os.stat) as stat, \
+                    mock.patch.object(am.os, "scandir", wraps=os.scandir) as scandir:
+                assert len(assets.get_transition_chime()) == 200
+                assert len(assets.get_ambient_sound("missing")) == 100
+            stat_paths = [os.path.basename(c.args[0]) for c in stat.call_args_list]
+            assert stat_paths == ["soft_chime.wav", "chime.wav", "missing.wav"]
+            assert scandir.call_count == 2
+
+    def test_assets_uploaded_after_init_are_found(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            assets = AssetManager(tmpdir)
+            assert len(assets.get_ambient_sound("rain")) == 100
+            assert len(assets.get_transition_chime()) == 500
+            _write(os.path.join(tmpdir, "ambient", "rain.flac"), seconds=0.3)
+            _write(os.path.join(tmpdir, "transitions", "transition.wav"), seconds=0.3)
+            with mock.patch.object(am.AudioSegment, "from_file",
+                                   return_value=AudioSegment.silent(duration=300)):
+                assert len(assets.get_ambient_sound("rain")) == 300
+            assert len(assets.get_transition_chime()) == 300
+
+    def test_wav_decoded_without_ffmpeg(self):
+        import pydub.audio_segment as pydub_segment
+        with tempfile.TemporaryDirectory() as tmpdir:
+            _write(os.path.join(tmpdir, "transitions", "soft_chime.wav"))
+            assets = AssetManager(tmpdir)
+            with mock.patch.object(pydub_segment.subprocess, "Popen") as popen:
+                chime = assets.get_transition_chime()
+            popen.assert_not_called()
+            assert len(chime) == 200
+
+
+    def test_prewarm_fills_cache(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            _write(os.path.join(tmpdir, "ambient", "rain.wav"))
+            _write(os.path.join(tmpdir, "transitions", "chime.wav"))
+            assets = AssetManager(tmpdir)
+            assert assets.prewarm_audio(("rain", "missing")) == 2
+            with mock.patch.object(am.AudioSegment, "from_file") as from_file:
+                assets.get_ambient_sound("rain")
+                assets.get_transition_chime()
+            from_file.assert_not_called()
+
+
+class TestRoleVoiceMemo:
+    def test_repeat_lookup_skips_filesystem(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            assets = AssetManager(tmpdir)
+            first = assets.get_voice_for_role("dialogue", "老渔夫", "male")
+            with mock.patch.object(am.os.path, "exists") as exists:
+                for _ in range(100):
+                    assert assets.get_voice_for_role("dialogue", "老渔夫", "male") is first
+                assets.get_voice_for_role("narration")
+            exists.assert_not_called()
+
+    def test_known_speaker_single_probe(self):
+        class CountingDict(dict):
+            probes = 0
+
+            def __contains__(self, key):
+                CountingDict.probes += 1
+                return super().__contains__(key)
+
+            def get(self, key, default=None):
+                CountingDict.probes += 1
+                return super().get(key, default)
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            assets = AssetManager(tmpdir)
+            assets.role_voice_map = CountingDict(assets.role_voice_map)
+            first = assets.get_voice_for_role("dialogue", "老渔夫", "male")
+            CountingDict.probes = 0
+            assert assets.get_voice_for_role("dialogue", "老渔夫", "male") is first
+            assert CountingDict.probes == 1
+
+    def test_pool_bucket_stable_across_versions(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            for name in ("m1", "m2"):
+                _write(os.path.join(tmpdir, "voices", f"{name}.wav"))
+            assets = AssetManager(tmpdir)
+            pool = assets.voices["male_pool"]
+            voice = assets.get_voice_for_role("dialogue", "老渔夫", "male")
+            expected = int(hashlib.md5("老渔夫".encode()).hexdigest(), 16) % len(pool)
+            assert voice is pool[expected]
+
+    def test_pool_bucket_stable_across_hash_seeds(self):
+        import subprocess
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        code = ("import sys; sys.path.insert(0, sys.argv[1]);"
+                "from modules.asset_manager import AssetManager;"
+                "a = AssetManager(sys.argv[2]);"
+                "print([a.voices['male_pool'].index(a.get_voice_for_role('dialogue', n, 'male'))"
+                " for n in ('老渔夫', '年轻人', 'Hero', '路人甲')])")
+        with tempfile.TemporaryDirectory() as tmpdir:
+            for name in ("m1", "m2"):
+                _write(os.path.join(tmpdir, "voices", f"{name}.wav"))
+            outputs = {
+                subprocess.run([sys.executable, "-c", code, root, tmpdir], capture_output=True, text=True,
+                               env={**os.environ, "PYTHONHASHSEED": seed}, check=True).stdout
+                for seed in ("1", "2", "3")
+            }
+        assert len(outputs) == 1
+
+    def test_new_speakers_probe_voice_index_not_filesystem(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            for name in ("m1", "m2", "老渔夫"):
+                _write(os.path.join(tmpdir, "voices", f"{name}.wav"))
+            assets = AssetManager(tmpdir)
+            assets.refresh_voice_index()
+            with mock.patch.object(am.os.path, "exists") as exists:
+                for i in range(20):
+                    assets.get_voice_for_role("dialogue", f"路人{i}", "male")
+                bound = assets.get_voice_for_role("dialogue", "老渔夫", "male")
+            exists.assert_not_called()
+            assert bound["audio"].endswith("老渔夫.wav")
+            assert assets.get_voice_for_role("dialogue", "路人0", "male") in assets.voices["male_pool"]
+
+
+    def test_auto_roles_bounded_lru(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            for name in ("m1", "m2"):
+                _write(os.path.join(tmpdir, "voices", f"{name}.wav"))
+            assets = AssetManager(tmpdir)
+            pinned = assets.build_voice_profile("老渔夫", description="沙哑的老人")
+            with mock.patch.object(am, "ROLE_VOICE_MEMO_SIZE", 3):
+                first = assets.get_voice_for_role("dialogue", "甲", "male")
+                for name in ("乙", "丙"):
+                    assets.get_voice_for_role("dialogue", name, "male")
+                assets.get_voice_for_role("dialogue", "甲", "male")  # refresh 甲
+                assets.get_voice_for_role("dialogue", "丁", "male")
+                assert "乙" not in assets.role_voice_map
+                assert "甲" in assets.role_voice_map
+                assert assets.role_voice_map["老渔夫"] is pinned
+                assert assets.get_voice_for_role("dialogue", "乙", "male")["audio"] in (
+                    v["audio"] for v in assets.voices["male_pool"])
+                assert assets.get_voice_for_role("dialogue", "甲", "male") is first
+            assert len(assets.role_voice_map) <= 4
+
+    def test_lists_audio_files_only(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            _write(os.path.join(tmpdir, "voices", "m1.wav"))
+            _write(os.path.join(tmpdir, "voices", "F2.WAV"))
+            os.makedirs(os.path.join(tmpdir, "voices", "clones.wav"))
+            open(os.path.join(tmpdir, "voices", "notes.txt"), "w").close()
+            found = AssetManager(tmpdir).scan_voice_assets()
+            assert sorted(os.path.basename(p) for p in found) == ["F2.WAV", "m1.wav"]
+
+    def test_missing_directory(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            assert AssetManager(tmpdir).scan_voice_assets() == []
+
+
+class TestSharedAssetManager:
+    def test_one_instance_per_asset_dir(self):
+        with tempfile.TemporaryDirectory() as a, tempfile.TemporaryDirectory() as b:
+            try:
+                assert am.get_asset_manager(a) is am.get_asset_manager(a)
+                assert am.get_asset_manager(b) is not am.get_asset_manager(a)
+            finally:
+                am.get_asset_manager.cache_clear()
@@ -195,7 +195,7 @@ class TestAsyncIOThreadPool:
     def test_io_executor_created(self):
         source = _read_source()
         assert "self.io_executor" in source
-        assert "ThreadPoolExecutor(max_workers=1)" in source
+        assert "ThreadPoolExecutor(max_workers=2)" in source
 
     def test_async_write_wav_method(self):
         source = _read_source()
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Tests for the regex fast path used when extracting EPUB chapter text.
+
+Covers:
+- Simple <p>/<br/> chapters are extracted without BeautifulSoup
+- HTML entities are decoded and inline tags stripped
+- Heading tags are kept so chapter markers stay at the top of the text
+- <br> tags with attributes still split lines
+- Chapters with tables/images/<pre>, bare <div> text or without paragraphs fall back to the full parser
+- The fallback uses the lxml backend when it is installed
+- The zipfile reader lists XHTML documents in OPF manifest order (sorted names without an OPF)
+- _extract_epub_chapters parses large books in a process pool, in order
+- _extract_epub_chapters streams chapters lazily with a bounded in-flight window
+- phase_1_generate_scripts pulls EPUB chapters on demand instead of parsing the whole book
+"""
+
+import os
+import sys
+import tempfile
+import zipfile
+from unittest import mock
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.epub_extractor import epub_document_names, html_to_text, iter_epub_documents, parse_chapter
+
+
+def _producer_cls():
+    try:
+        from main_producer import CineCastProducer
+    except ImportError:
+        pytest.skip("main_producer requires mlx (macOS-only)")
+    return CineCastProducer
+
+
+class TestHtmlToTextFastPath:
+    def test_paragraphs_become_lines(self):
+        raw = "<html><body><p>第一段。</p><p class='x'>第二段。</p></body></html>".encode("utf-8")
+        with mock.patch("modules.epub_extractor.BeautifulSoup") as soup:
+            text = html_to_text(raw)
+        soup.assert_not_called()
+        assert text.split("\n") == ["第一段。", "第二段。"]
+
+    def test_br_entities_and_inline_tags(self):
+        raw = "<body><p>他说&ldquo;你好&rdquo;<br/>然后<em>走了</em>&amp;</p></body>".encode("utf-8")
+        text = html_to_text(raw)
+        assert text == "他说“你好”\n然后走了&"
+
+    def test_headings_preserved(self):
+        raw = "<body><h1>第一章 风雪</h1><p>夜幕降临。</p></body>".encode("utf-8")
+        text = html_to_text(raw)
+        assert text.startswith("第一章 风雪")
+
+    def test_br_with_attributes(self):
+        raw = b'<body><p>one<br class="calibre1"/>two<BR clear="all">three</p></body>'
+        assert html_to_text(raw) == "one\ntwo\nthree"
+
+    def test_wrapper_div_keeps_fast_path(self):
+        raw = "<html><head><title>书名</title></head><body><div class='c'><p>正文。</p></div></body></html>".encode("utf-8")
+        with mock.patch("modules.epub_extractor.BeautifulSoup") as soup:
+            text = html_to_text(raw)
+        soup.assert_not_called()
+        assert text == "正文。"
+
+
+class TestHtmlToTextFallback:
+    def test_table_uses_full_parser(self):
+        raw = b"<body><p>a</p><table><tr><td>cell</td></tr></table></body>"
+        assert "cell" in html_to_text(raw)
+
+    def test_image_uses_full_parser(self):
+        raw = b"<body><p>a</p><IMG src='x.png'/><div>caption</div></body>"
+        assert "caption" in html_to_text(raw)
+
+    def test_pre_text_kept(self):
+        raw = b"<body><pre>code</pre><p>text</p></body>"
+        text = html_to_text(raw)
+        assert "code" in text and "text" in text
+
+    def test_bare_div_text_kept(self):
+        raw = "<body><p>第一段。</p><div>裸露的正文。</div></body>".encode("utf-8")
+        text = html_to_text(raw)
+        assert "第一段。" in text and "裸露的正文。" in text
+
+    def test_no_paragraphs_uses_full_parser(self):
+        raw = b"<body><div>only divs</div></body>"
+        assert "only divs" in html_to_text(raw)
+
+    def test_fallback_prefers_lxml(self):
+        pytest.importorskip("lxml")
+        import modules.epub_extractor as ee
+        assert ee._BS4_PARSER == "lxml"
+        raw = b"<body><div>only divs</div></body>"
+        with mock.patch("modules.epub_extractor.BeautifulSoup", wraps=ee.BeautifulSoup) as soup:
+            html_to_text(raw)
+        assert soup.call_args[0][1] == "lxml"
+
+
+_CONTAINER = b"""<?xml version="1.0"?>
+<container version="1.0" xmlns="urn:oasis:names:tc:opendocument:xmlns:container">
+  <rootfiles><rootfile full-path="OEBPS/content.opf" media-type="application/oebps-package+xml"/></rootfiles>
+</container>"""
+
+
+def _write_epub(path, documents, opf=True):
+    """documents: [(href, raw_bytes)] in manifest order; hrefs are relative to OEBPS/"""
+    with zipfile.ZipFile(path, "w") as z:
+        z.writestr("mimetype", "application/epub+zip")
+        if opf:
+            z.writestr("META-INF/container.xml", _CONTAINER)
+            items = "".join(
+                f'<item id="d{i}" href="{href}" media-type="application/xhtml+xml"/>'
+                for i, (href, _) in enumerate(documents)
+            )
+            items += '<item id="css" href="style.css" media-type="text/css"/>'
+            z.writestr("OEBPS/content.opf",
+                       f'<package xmlns="http://www.idpf.org/2007/opf"><manifest>{items}</manifest></package>')
+        z.writestr("OEBPS/style.css", "p {}")
+        for href, raw in documents:
+            z.writestr(f"OEBPS/{href.replace('%20', ' ')}", raw)
+
+
+class TestEpubReader:
+    def test_manifest_order_and_relative_hrefs(self, tmp_path):
+        path = str(tmp_path / "book.epub")
+        _write_epub(path, [("text/b.xhtml", b"<p>b</p>"), ("a%20one.xhtml", b"<p>a</p>")])
+        with zipfile.ZipFile(path) as z:
+            assert epub_document_names(z) == ["OEBPS/text/b.xhtml", "OEBPS/a one.xhtml"]
+        assert list(iter_epub_documents(path)) == [b"<p>b</p>", b"<p>a</p>"]
+
+    def test_missing_opf_falls_back_to_sorted_html(self, tmp_path):
+        path = str(tmp_path / "book.epub")
+        _write_epub(path, [("z.xhtml", b"z"), ("a.html", b"a")], opf=False)
+        with zipfile.ZipFile(path) as z:
+            assert epub_document_names(z) == ["OEBPS/a.html", "OEBPS/z.xhtml"]
+
+
+class TestExtractEpubChaptersPool:
+    def _extract(self, n_items):
+        cls = _producer_cls()
+        docs = [(f"c{i:02d}.xhtml", f"<body><p>第{i}章 内容足够长，不会被当作废页过滤掉。</p></body>".encode("utf-8"))
+                for i in range(n_items)]
+        docs.insert(1, ("short.xhtml", b"<body><p>short</p></body>"))
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "book.epub")
+            _write_epub(path, docs)
+            producer = cls.__new__(cls)
+            return dict(producer._extract_epub_chapters(path))
+
+    def test_serial_for_small_books(self):
+        with mock.patch("main_producer.concurrent.futures.ProcessPoolExecutor") as pool:
+            chapters = self._extract(3)
+        pool.assert_not_called()
+        assert list(chapters) == ["Chapter_000", "Chapter_002", "Chapter_003"]
+
+    def test_pool_keeps_document_order(self):
+        chapters = self._extract(12)
+        assert len(chapters) == 12
+        assert "Chapter_001" not in chapters  # short page filtered
+        assert list(chapters) == sorted(chapters)
+        assert chapters["Chapter_002"].startswith("第1章")
+
+    def test_streams_with_bounded_window(self):
+        cls = _producer_cls()
+        read = []
+
+        def raws():
+            for i in range(40):
+                read.append(i)
+                yield f"<p>第{i}章 内容足够长，不会被当作废页过滤掉。</p>".encode("utf-8")
+
+        texts = cls._parse_epub_items_parallel(raws(), 2)
+        assert next(texts).startswith("第0章")
+        assert len(read) <= 5  # workers*2 in flight + 1 refill
+        texts.close()
+
+    def test_phase1_parses_only_needed_chapters(self, monkeypatch):
+        cls = _producer_cls()
+        from modules.llm_director import LLMScriptDirector
+        docs = [(f"c{i:02d}.xhtml", f"<body><p>第{i}章 内容足够长，不会被当作废页过滤掉。</p></body>".encode("utf-8"))
+                for i in range(5)]
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "book.epub")
+            _write_epub(path, docs)
+            producer = cls.__new__(cls)
+            monkeypatch.chdir(tmpdir)
+            monkeypatch.setattr(LLMScriptDirector, "_test_api_connection", lambda self: True)
+            producer.config = {"pure_narrator_mode": True, "llm_api_key": "sk-test"}
+            producer.script_dir = os.path.join(tmpdir, "scripts")
+            producer.cache_dir = os.path.join(tmpdir, "cache")
+            os.makedirs(producer.script_dir)
+            os.makedirs(producer.cache_dir)
+            with mock.patch("main_producer.parse_epub_chapter", wraps=parse_chapter) as parse:
+                assert producer.phase_1_generate_scripts(path, max_chapters=1) is True
+            assert parse.call_count == 1
+            assert "Chapter_000_micro.json" in os.listdir(producer.script_dir)
+
+    def test_parse_chapter_strips_blank_lines(self):
+        assert parse_chapter(b"<body><div>\n  a  \n\n b</div></body>") == "a\nb"
+
+    def test_parse_chapter_collapse_matches_line_strip(self):
+        text = " 　第一章\r\n\n\t  \n 正文 一 \n\n\n　　正文二\t\n  "
+        expected = "\n".join([line.strip() for line in text.split("\n") if line.strip()])
+        with mock.patch("modules.epub_extractor.html_to_text", return_value=text):
+            assert parse_chapter(b"") == expected == "第一章\n正文 一\n正文二"
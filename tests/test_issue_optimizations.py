@@ -306,6 +306,22 @@ class TestSmartRecapInjection:
         # Old hardcoded pattern should be gone
         assert "insert_idx = 1 if len(micro_script)" not in source
 
+    def test_inject_recap_splices_pair_once(self):
+        """_inject_recap should splice intro + body after the title in one step."""
+        try:
+            from main_producer import CineCastProducer
+        except ImportError:
+            pytest.skip("main_producer requires mlx (macOS-only)")
+        script = [
+            {"type": "title", "speaker": "narrator", "content": "第二章"},
+            {"type": "narration", "speaker": "narrator", "content": "故事继续。"},
+        ]
+        CineCastProducer._inject_recap(script, "Chapter_002", "上一章的摘要")
+        assert [e["type"] for e in script] == ["title", "recap", "recap", "narration"]
+        assert script[1]["chunk_id"] == "Chapter_002_recap_intro"
+        assert script[2]["content"] == "上一章的摘要"
+        assert script[2]["pause_ms"] == 1500
+
 
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
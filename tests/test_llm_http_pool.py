@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Tests for the shared keep-alive HTTP pool used by LLM calls.
+
+Covers:
+- CineCastProducer._get_http_client is lazily created once and reused
+- check_api_connectivity goes through the shared client
+- _close_http_client releases the pool and a later call recreates it
+- The producer's director is rebound to a fresh pool after _close_http_client
+- LLMScriptDirector hands the shared client to the OpenAI SDK
+- verify_connection=False skips the director's own API probe
+"""
+
+import os
+import sys
+from unittest import mock
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+openai = pytest.importorskip("openai")
+
+
+def _producer():
+    try:
+        from main_producer import CineCastProducer
+    except ImportError:
+        pytest.skip("main_producer requires mlx (macOS-only)")
+    producer = CineCastProducer.__new__(CineCastProducer)
+    producer.config = {"llm_api_key": "sk-test", "llm_base_url": "https://api.example.com/v1/",
+                       "llm_model_name": "qwen-flash"}
+    return producer
+
+
+class TestSharedHttpClient:
+    def test_client_created_once(self):
+        producer = _producer()
+        client = producer._get_http_client()
+        try:
+            assert isinstance(client, openai.DefaultHttpxClient)
+            assert producer._get_http_client() is client
+        finally:
+            client.close()
+
+    def test_close_and_recreate(self):
+        producer = _producer()
+        client = producer._get_http_client()
+        producer._close_http_client()
+        assert client.is_closed
+        fresh = producer._get_http_client()
+        try:
+            assert fresh is not client and not fresh.is_closed
+        finally:
+            producer._close_http_client()
+        producer._close_http_client()  # idempotent
+
+    def test_director_rebound_after_close(self):
+        from modules.llm_director import LLMScriptDirector
+        producer = _producer()
+        with mock.patch.object(LLMScriptDirector, "_test_api_connection", return_value=True):
+            producer.director = LLMScriptDirector(api_key="sk-test", http_client=producer._get_http_client(),
+                                                  cast_db_path=os.devnull)
+        director = producer.director
+        producer._close_http_client()
+        try:
+            assert producer.director is director
+            assert not director.client._client.is_closed
+            assert director.client._client is producer._get_http_client()
+        finally:
+            producer._close_http_client()
+
+    def test_connectivity_check_uses_shared_client(self):
+        producer = _producer()
+        producer._http = mock.Mock()
+        producer._http.post.return_value = mock.Mock(status_code=200)
+        assert producer.check_api_connectivity() is True
+        url = producer._http.post.call_args.args[0]
+        assert url == "https://api.example.com/v1/chat/completions"
+
+
+class TestDirectorHttpClient:
+    def test_director_uses_injected_client(self):
+        from modules.llm_director import LLMScriptDirector
+        client = openai.DefaultHttpxClient()
+        try:
+            with mock.patch.object(LLMScriptDirector, "_test_api_connection", return_value=True):
+                director = LLMScriptDirector(api_key="sk-test", http_client=client,
+                                             cast_db_path=os.devnull)
+            assert director.client._client is client
+        finally:
+            client.close()
+
+    def test_connection_probe_can_be_skipped(self):
+        from modules.llm_director import LLMScriptDirector
+        with mock.patch.object(LLMScriptDirector, "_test_api_connection") as probe:
+            LLMScriptDirector(api_key="sk-test", cast_db_path=os.devnull, verify_connection=False)
+            probe.assert_not_called()
+            LLMScriptDirector(api_key="sk-test", cast_db_path=os.devnull)
+            probe.assert_called_once()
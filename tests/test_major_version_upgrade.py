@@ -23,6 +23,7 @@ from modules.audiobook_orchestrator import (
     AudiobookOrchestrator,
     parse_script_line,
     parse_script,
+    iter_script,
     LANGUAGE_MAP,
 )
 
@@ -317,6 +318,14 @@ class TestScriptParser:
         assert result[1] == ("年轻人", "我不信。")
         assert result[2] == (None, "夜幕降临了。")
 
+    def test_iter_script_is_lazy_and_matches_list(self):
+        import types
+        script_text = "\n  老渔夫：你相信命运吗？  \n\n年轻人: 我不信。\n夜幕降临了。\n"
+        lines = iter_script(script_text)
+        assert isinstance(lines, types.GeneratorType)
+        assert list(lines) == parse_script(script_text)
+        assert parse_script(script_text)[0] == ("老渔夫", "你相信命运吗？")
+
     def test_long_role_name_ignored(self):
         """Role names longer than 20 chars are treated as narration."""
         role, text = parse_script_line("这是一个非常非常非常非常非常非常长的角色名字: 内容")
@@ -369,6 +378,128 @@ class TestAudiobookOrchestrator:
         orch = AudiobookOrchestrator()
         orch.clear_memory()  # Should not raise
 
+    def test_clear_memory_uses_module_level_mlx(self):
+        from unittest import mock
+        import modules.audiobook_orchestrator as ao
+        fake_mx = mock.Mock()
+        with mock.patch.object(ao, "mx", fake_mx), \
+                mock.patch("builtins.__import__", side_effect=AssertionError("import in clear_memory")):
+            AudiobookOrchestrator.clear_memory(mock.Mock())
+        fake_mx.metal.clear_cache.assert_called_once_with()
+
+
+class _FakeBatchEngine:
+    """Returns a deterministic per-text waveform and records how it was called."""
+
+    def __init__(self, fail_batch=False):
+        self.batches = []
+        self.singles = []
+        self.languages = []
+        self.fail_batch = fail_batch
+
+    @staticmethod
+    def _audio(text):
+        return np.full(len(text), float(len(text)), dtype=np.float32)
+
+    def generate_voice_clone(self, text, feature):
+        self.singles.append(text)
+        return self._audio(text), 24000
+
+    def generate(self, text, mode="base", **kwargs):
+        self.singles.append(text)
+        return self._audio(text), 24000
+
+    def generate_batch(self, texts, feature=None, language="zh"):
+        if self.fail_batch:
+            raise RuntimeError("no batch")
+        self.batches.append((list(texts), feature))
+        self.languages.append(language)
+        return [self._audio(t) for t in texts]
+
+
+class TestOrchestratorBatching:
+    SCRIPT = [("老渔夫", "你相信命运吗？我不信。风很大。"), ("旁白", "夜幕降临，港口安静。"),
+              ("老渔夫", "回家吧。")]
+
+    def _orch(self, engine):
+        from unittest import mock
+        orch = AudiobookOrchestrator(engine=engine)
+        orch.rm = mock.Mock()
+        orch.rm.load_role_bank.return_value = {"老渔夫": {"ref_audio": "old.wav", "ref_text": "x"}}
+        return orch
+
+    def test_batched_output_matches_serial(self):
+        serial_engine, batch_engine = _FakeBatchEngine(), _FakeBatchEngine()
+        serial = self._orch(serial_engine).process_chapter(self.SCRIPT, batch_size=1)
+        batched = self._orch(batch_engine).process_chapter(self.SCRIPT, batch_size=2)
+        np.testing.assert_array_equal(serial, batched)
+        assert serial_engine.batches == []
+        assert all(len(texts) <= 2 for texts, _ in batch_engine.batches)
+        # adjacent lines of one role share a call and carry that role's feature
+        first_texts, first_feature = batch_engine.batches[0]
+        assert len(first_texts) == 2 and first_feature["ref_audio"] == "old.wav"
+        assert all(feature is None for texts, feature in batch_engine.batches
+                   if texts[0].startswith("夜幕"))
+
+    def test_batch_receives_lang_code(self):
+        engine = _FakeBatchEngine()
+        self._orch(engine).process_chapter(self.SCRIPT, lang="English", batch_size=2)
+        assert engine.batches and engine.languages == ["en"] * len(engine.batches)
+
+    def test_output_layout_matches_concatenation(self):
+        from unittest import mock
+        orch = self._orch(_FakeBatchEngine())
+        pieces = []
+        for _, text in self.SCRIPT:
+            for seg in orch.rhythm.process_text_with_metadata(text):
+                pieces.append(_FakeBatchEngine._audio(seg["text"]))
+                if seg["pause"] > 0:
+                    pieces.append(orch.rhythm.create_silence_frames(seg["pause"], orch.sample_rate))
+            pieces.append(orch.rhythm.create_silence_frames(0.5, orch.sample_rate))
+        expected = np.concatenate(pieces)
+        with mock.patch.object(np, "concatenate", side_effect=AssertionError("concatenate")):
+            audio = orch.process_chapter(self.SCRIPT)
+        assert audio.dtype == np.float32
+        np.testing.assert_array_equal(audio, expected)
+
+    def test_pauses_not_materialized(self):
+        from unittest import mock
+        orch = self._orch(_FakeBatchEngine())
+        with mock.patch.object(orch.rhythm, "create_silence_frames",
+                               side_effect=AssertionError("zero array per pause")):
+            audio = orch.process_chapter(self.SCRIPT, paragraph_pause=0.25)
+        assert not audio[-int(0.25 * orch.sample_rate):].any()
+
+    def test_int16_output_quantized_per_segment(self):
+        from modules.audiobook_orchestrator import _to_pcm16
+
+        class _QuietEngine(_FakeBatchEngine):
+            @staticmethod
+            def _audio(text):
+                return np.linspace(-1.5, 1.5, len(text) * 10, dtype=np.float32)
+
+        reference = self._orch(_QuietEngine()).process_chapter(self.SCRIPT)
+        audio = self._orch(_QuietEngine()).process_chapter(self.SCRIPT, dtype="int16")
+        assert audio.dtype == np.int16
+        np.testing.assert_array_equal(audio, _to_pcm16(reference))
+        assert audio.max() == 32767 and audio.min() == -32767
+
+    def test_from_text_streams_script(self):
+        from unittest import mock
+        import modules.audiobook_orchestrator as ao
+        text = "\n".join(f"{role}：{line}" for role, line in self.SCRIPT)
+        expected = self._orch(_FakeBatchEngine()).process_chapter(self.SCRIPT)
+        with mock.patch.object(ao, "parse_script", side_effect=AssertionError("list built")):
+            streamed = self._orch(_FakeBatchEngine()).process_chapter_from_text(text)
+        np.testing.assert_array_equal(streamed, expected)
+
+    def test_batch_failure_falls_back_per_segment(self):
+        engine = _FakeBatchEngine(fail_batch=True)
+        expected = self._orch(_FakeBatchEngine()).process_chapter(self.SCRIPT, batch_size=1)
+        audio = self._orch(engine).process_chapter(self.SCRIPT, batch_size=4)
+        np.testing.assert_array_equal(audio, expected)
+        assert engine.singles
+
 
 # ===========================================================================
 # CinecastMLXEngine Source Code Tests
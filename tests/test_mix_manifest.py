@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Tests for the phase-3 chapter mix manifest.
+
+Covers:
+- Fingerprints change when a dry-voice WAV is re-rendered
+- A pre-scanned wav_stats table yields the same fingerprint as per-file stat
+- Only a contiguous prefix of unchanged chapters is skipped
+- A remixed chapter that previously merged into the prior volume rolls back
+- Settings changes invalidate the whole manifest
+- phase_3_cinematic_mix skips unchanged chapters and records new entries
+- Resuming deletes only the stale volumes recorded in the manifest
+"""
+
+import json
+import os
+import sys
+import tempfile
+from unittest import mock
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def _producer(tmpdir):
+    try:
+        from main_producer import CineCastProducer
+    except ImportError:
+        pytest.skip("main_producer requires mlx (macOS-only)")
+    producer = CineCastProducer.__new__(CineCastProducer)
+    producer.config = {
+        "output_dir": os.path.join(tmpdir, "output"),
+        "ambient_theme": "iceland_wind",
+        "target_duration_min": 30,
+        "pure_narrator_mode": True,
+    }
+    producer.script_dir = os.path.join(tmpdir, "scripts")
+    producer.cache_dir = os.path.join(tmpdir, "cache")
+    for d in (producer.config["output_dir"], producer.script_dir, producer.cache_dir):
+        os.makedirs(d, exist_ok=True)
+    producer.assets = None
+    return producer
+
+
+def _touch(path, data=b"x"):
+    with open(path, "wb") as f:
+        f.write(data)
+
+
+SETTINGS = {"ambient_theme": "a", "pure_narrator_mode": False, "target_duration_min": 30}
+
+
+def _entry(fp, start, end):
+    return {"fingerprint": fp, "start_index": start, "end_index": end}
+
+
+class TestFingerprint:
+    def test_rerendered_wav_changes_fingerprint(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            producer = _producer(tmpdir)
+            _touch(os.path.join(producer.script_dir, "A_micro.json"))
+            _touch(os.path.join(producer.cache_dir, "c1.wav"))
+            script = [{"chunk_id": "c1"}, {"chunk_id": "c2"}]
+            before = producer._chapter_mix_fingerprint("A_micro.json", script)
+            assert before["chunks"]["c2"] is None
+            _touch(os.path.join(producer.cache_dir, "c1.wav"), b"longer data")
+            after = producer._chapter_mix_fingerprint("A_micro.json", script)
+            assert before != after
+
+    def test_wav_stats_table_matches_stat(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            producer = _producer(tmpdir)
+            _touch(os.path.join(producer.script_dir, "A_micro.json"))
+            _touch(os.path.join(producer.cache_dir, "c1.wav"))
+            script = [{"chunk_id": "c1"}, {"chunk_id": "c2"}]
+            with os.scandir(producer.cache_dir) as it:
+                wav_stats = {e.name: e.stat() for e in it}
+            assert (producer._chapter_mix_fingerprint("A_micro.json", script, wav_stats)
+                    == producer._chapter_mix_fingerprint("A_micro.json", script))
+
+
+class TestResumePoint:
+    def _resume(self, tmpdir, entries, fps, settings=SETTINGS, volumes=(1, 2, 3)):
+        producer = _producer(tmpdir)
+        out = producer.config["output_dir"]
+        for i in volumes:
+            _touch(os.path.join(out, f"Audiobook_Part_{i:03d}.mp3"))
+        manifest = {"settings": SETTINGS, "chapters": entries}
+        files = [f"{c}_micro.json" for c in "ABC"]
+        return producer._find_mix_resume_point(manifest, settings, files, fps, out)
+
+    def test_all_valid(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            entries = {"A_micro.json": _entry(1, 1, 2), "B_micro.json": _entry(2, 2, 3),
+                       "C_micro.json": _entry(3, 3, 4)}
+            assert self._resume(tmpdir, entries, [1, 2, 3]) == (3, 4)
+
+    def test_changed_middle_chapter(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            entries = {"A_micro.json": _entry(1, 1, 2), "B_micro.json": _entry(2, 2, 3),
+                       "C_micro.json": _entry(3, 3, 4)}
+            assert self._resume(tmpdir, entries, [1, 99, 3]) == (1, 2)
+
+    def test_changed_chapter_that_merged_rolls_back(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            # B produced no volume of its own: its tail went into A's volume 1
+            entries = {"A_micro.json": _entry(1, 1, 2), "B_micro.json": _entry(2, 2, 2),
+                       "C_micro.json": _entry(3, 2, 3)}
+            assert self._resume(tmpdir, entries, [1, 99, 3]) == (0, 1)
+
+    def test_missing_volume_invalidates(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            entries = {"A_micro.json": _entry(1, 1, 2), "B_micro.json": _entry(2, 2, 3),
+                       "C_micro.json": _entry(3, 3, 4)}
+            assert self._resume(tmpdir, entries, [1, 2, 3], volumes=(1, 3)) == (1, 2)
+
+    def test_settings_change_invalidates_all(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            entries = {"A_micro.json": _entry(1, 1, 2)}
+            other = dict(SETTINGS, ambient_theme="rain")
+            assert self._resume(tmpdir, entries, [1, 2, 3], settings=other) == (0, 1)
+
+
+class TestPhase3Manifest:
+    def test_unchanged_chapters_skip_process_from_cache(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            producer = _producer(tmpdir)
+            out = producer.config["output_dir"]
+            for name in ("A", "B"):
+                with open(os.path.join(producer.script_dir, f"{name}_micro.json"), "w") as f:
+                    json.dump([{"chunk_id": f"{name}1"}], f)
+                _touch(os.path.join(producer.cache_dir, f"{name}1.wav"))
+
+            calls = []
+
+            def fake_process(self_pkg, micro_script, *args, **kwargs):
+                calls.append(micro_script[0]["chunk_id"])
+                _touch(os.path.join(out, f"Audiobook_Part_{self_pkg.file_index:03d}.mp3"))
+                self_pkg.file_index += 1
+
+            with mock.patch("main_producer.CinematicPackager.process_from_cache", fake_process):
+                producer.phase_3_cinematic_mix()
+                assert calls == ["A1", "B1"]
+                # Re-render B's only WAV; A stays cached
+                _touch(os.path.join(producer.cache_dir, "B1.wav"), b"re-rendered")
+                calls.clear()
+                producer.phase_3_cinematic_mix()
+                assert calls == ["B1"]
+
+            with open(os.path.join(out, ".mix_manifest.json"), encoding="utf-8") as f:
+                manifest = json.load(f)
+            assert manifest["chapters"]["B_micro.json"]["start_index"] == 2
+
+    def test_resume_deletes_only_manifest_volumes(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            producer = _producer(tmpdir)
+            out = producer.config["output_dir"]
+            for name in ("A", "B"):
+                with open(os.path.join(producer.script_dir, f"{name}_micro.json"), "w") as f:
+                    json.dump([{"chunk_id": f"{name}1"}], f)
+                _touch(os.path.join(producer.cache_dir, f"{name}1.wav"))
+
+            def fake_process(self_pkg, micro_script, *args, **kwargs):
+                path = os.path.join(out, f"Audiobook_Part_{self_pkg.file_index:03d}.mp3")
+                if not os.path.exists(path):
+                    _touch(path)
+                self_pkg.file_index += 1
+
+            with mock.patch("main_producer.CinematicPackager.process_from_cache", fake_process):
+                producer.phase_3_cinematic_mix()
+                # 不在清单中的分卷（例如用户手动放入的）
+                _touch(os.path.join(out, "Audiobook_Part_009.mp3"), b"user")
+                stale = os.path.join(out, "Audiobook_Part_002.mp3")
+                _touch(stale, b"stale")
+                _touch(os.path.join(producer.cache_dir, "B1.wav"), b"re-rendered")
+                producer.phase_3_cinematic_mix()
+
+            with open(stale, "rb") as f:
+                assert f.read() == b"x"  # 清单中的旧分卷被删除并重新压制
+            with open(os.path.join(out, "Audiobook_Part_009.mp3"), "rb") as f:
+                assert f.read() == b"user"
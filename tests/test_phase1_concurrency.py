@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Tests for concurrent chapter scripting in phase 1 (llm_concurrency).
+
+Covers:
+- llm_concurrency > 1 runs chapter LLM calls in parallel on forked directors
+- Scripts are still handed to on_script_ready in chapter order
+- Auto recaps use the previous chapter's text even while it is still in flight
+- A chapter that fails to script is not used as the next chapter's recap source
+- llm_concurrency = 1 keeps the serial, single-director behaviour
+- LLMScriptDirector.fork shares the cast DB but not the sliding window
+"""
+
+import os
+import sys
+import tempfile
+import threading
+from unittest import mock
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.llm_director import LLMScriptDirector
+
+
+def _make_producer(tmpdir, **config):
+    try:
+        from main_producer import CineCastProducer
+    except ImportError:
+        pytest.skip("main_producer requires mlx (macOS-only)")
+    producer = CineCastProducer.__new__(CineCastProducer)
+    producer.config = {
+        "output_dir": os.path.join(tmpdir, "output"),
+        "model_path": "dummy",
+        "llm_api_key": "test-key",
+        "enable_recap": False,
+        "pure_narrator_mode": False,
+        **config,
+    }
+    producer.script_dir = os.path.join(tmpdir, "scripts")
+    producer.cache_dir = os.path.join(tmpdir, "cache")
+    os.makedirs(producer.script_dir)
+    os.makedirs(producer.cache_dir)
+    input_dir = os.path.join(tmpdir, "input")
+    os.makedirs(input_dir)
+    for i in range(1, 5):
+        with open(os.path.join(input_dir, f"ch{i}.txt"), "w", encoding="utf-8") as f:
+            f.write(f"第{i}章\n" + f"港口的第{i}个夜晚，风雪没有停。" * 60)
+    return producer, input_dir
+
+
+def _fake_parse(self, text, chapter_prefix="chunk", max_length=8000):
+    return [{"chunk_id": f"{chapter_prefix}_00001", "type": "narration",
+             "speaker": "narrator", "content": text[:20]}]
+
+
+def _run_phase_1(producer, input_dir, parse=_fake_parse):
+    ready = []
+    with mock.patch.object(producer, "check_api_connectivity", return_value=True), \
+         mock.patch.object(producer, "_get_http_client", return_value=None), \
+         mock.patch.object(LLMScriptDirector, "_test_api_connection", return_value=True), \
+         mock.patch.object(LLMScriptDirector, "parse_and_micro_chunk", parse):
+        assert producer.phase_1_generate_scripts(input_dir, on_script_ready=ready.append)
+    return ready
+
+
+class TestPhase1Concurrency:
+    def test_chapters_parsed_in_parallel_and_delivered_in_order(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            producer, input_dir = _make_producer(tmpdir, llm_concurrency=3)
+            # three chapters must be inside the LLM call at the same time to pass the barrier
+            barrier = threading.Barrier(3, timeout=10)
+            directors = set()
+
+            def parse(self, text, chapter_prefix="chunk", max_length=8000):
+                directors.add(id(self))
+                if chapter_prefix != "ch4":
+                    barrier.wait()
+                return _fake_parse(self, text, chapter_prefix, max_length)
+
+            ready = _run_phase_1(producer, input_dir, parse)
+            assert ready == [f"ch{i}_micro.json" for i in range(1, 5)]
+            assert len(directors) == 4
+
+    def test_auto_recap_uses_previous_chapter_text(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            producer, input_dir = _make_producer(tmpdir, llm_concurrency=4, enable_recap=True)
+            with mock.patch.object(LLMScriptDirector, "generate_chapter_recap",
+                                   side_effect=lambda prev: prev[:3]) as recap:
+                _run_phase_1(producer, input_dir)
+            assert sorted(call.args[0][:3] for call in recap.call_args_list) == ["第1章", "第2章", "第3章"]
+
+    def test_failed_chapter_not_used_as_recap_source(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            producer, input_dir = _make_producer(tmpdir, llm_concurrency=4, enable_recap=True)
+
+            def parse(self, text, chapter_prefix="chunk", max_length=8000):
+                return [] if chapter_prefix == "ch2" else _fake_parse(self, text, chapter_prefix, max_length)
+
+            with mock.patch.object(LLMScriptDirector, "generate_chapter_recap",
+                                   side_effect=lambda prev: prev[:3]) as recap:
+                ready = _run_phase_1(producer, input_dir, parse)
+            assert ready == ["ch1_micro.json", "ch3_micro.json", "ch4_micro.json"]
+            assert sorted(call.args[0][:3] for call in recap.call_args_list) == ["第1章", "第3章"]
+
+    def test_serial_by_default(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            producer, input_dir = _make_producer(tmpdir)
+            threads, directors = set(), set()
+
+            def parse(self, text, chapter_prefix="chunk", max_length=8000):
+                threads.add(threading.current_thread().name)
+                directors.add(id(self))
+                return _fake_parse(self, text, chapter_prefix, max_length)
+
+            assert len(_run_phase_1(producer, input_dir, parse)) == 4
+            assert threads == {threading.main_thread().name}
+            assert len(directors) == 1
+
+
+class TestDirectorFork:
+    def test_fork_shares_cast_db_not_window(self):
+        with tempfile.TemporaryDirectory() as tmpdir, \
+             mock.patch.object(LLMScriptDirector, "_test_api_connection", return_value=True):
+            director = LLMScriptDirector(api_key="k", cast_db_path=os.path.join(tmpdir, "cast.json"))
+            director._prev_characters = ["老渔夫"]
+            clone = director.fork()
+            assert clone._prev_characters == [] and director._prev_characters == ["老渔夫"]
+            assert clone.client is director.client
+            assert clone._cast_lock is director._cast_lock
+            clone._save_cast_profile("船长", "male", "A deep voice")
+            assert "船长" in director.cast_profiles
@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+Tests for background volume export in CinematicPackager.
+
+Covers:
+- export_workers=0 keeps the synchronous export path
+- export_workers>0 hands the buffer to the pool and keeps assembling
+- Tail merge waits for pending exports before reading the previous volume
+- Tail merge decodes the previous volume on a worker thread while the tail is mixed
+- Tail merge uses an equal-power (cos/sin) crossfade computed in NumPy
+- phase_3_cinematic_mix enables the pool and always closes the packager
+- Chapters are mixed in order while the next chapter's WAVs are prefetched into the page cache
+- MP3 volumes are encoded by piping raw PCM into ffmpeg (no temp WAV), written atomically
+"""
+
+import concurrent.futures
+import os
+import sys
+import tempfile
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pydub import AudioSegment
+
+import modules.cinematic_packager as cp
+from modules.cinematic_packager import CinematicPackager
+
+
+def _fake_export(audio, save_path, ambient, chime, fade_in_ms, fade_out_ms):
+    with open(save_path, "wb") as f:
+        f.write(b"mp3")
+    return save_path
+
+
+class TestBackgroundExport:
+    def test_sync_by_default(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            p = CinematicPackager(tmpdir)
+            p.buffer = AudioSegment.silent(duration=1000)
+            with mock.patch.object(cp, "_master_and_export", side_effect=_fake_export) as export:
+                p.export_volume()
+            export.assert_called_once()
+            assert p._export_pool is None
+            assert p.file_index == 2
+
+    def test_pool_submission_resets_buffer(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            p = CinematicPackager(tmpdir, export_workers=1)
+            p.buffer = AudioSegment.silent(duration=1000)
+            with mock.patch.object(cp.concurrent.futures, "ProcessPoolExecutor",
+                                   concurrent.futures.ThreadPoolExecutor), \
+                    mock.patch.object(cp, "_master_and_export", side_effect=_fake_export):
+                p.export_volume()
+                assert len(p.buffer) == 0
+                assert p.file_index == 2
+                assert len(p._pending_exports) == 1
+                p.close()
+            assert p._pending_exports == []
+            assert p._export_pool is None
+            assert os.path.exists(os.path.join(tmpdir, "Audiobook_Part_001.mp3"))
+
+    def test_failed_export_is_reported_not_raised(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            p = CinematicPackager(tmpdir, export_workers=1)
+            p.buffer = AudioSegment.silent(duration=1000)
+            with mock.patch.object(cp.concurrent.futures, "ProcessPoolExecutor",
+                                   concurrent.futures.ThreadPoolExecutor), \
+                    mock.patch.object(cp, "_master_and_export", side_effect=RuntimeError("boom")):
+                p.export_volume()
+                p.close()
+            assert p._pending_exports == []
+
+    def test_merge_waits_for_pending_exports(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            p = CinematicPackager(tmpdir, export_workers=1)
+            p.file_index = 2
+            p.buffer = AudioSegment.silent(duration=1000)
+            with mock.patch.object(p, "wait_for_exports") as wait, \
+                    mock.patch.object(p, "export_volume"):
+                p._merge_with_previous()
+            wait.assert_called_once()
+
+    def test_merge_decodes_previous_while_mixing(self):
+        import threading
+        threads = {}
+        decoded = threading.Event()
+
+        def fake_decode(path, format=None):
+            threads["decode"] = threading.current_thread()
+            decoded.set()
+            return AudioSegment.silent(duration=3000)
+
+        def fake_mix(audio, ambient):
+            threads["mix"] = threading.current_thread()
+            assert decoded.wait(5), "decode did not run concurrently with mixing"
+            return audio
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            open(os.path.join(tmpdir, "Audiobook_Part_001.mp3"), "wb").close()
+            p = CinematicPackager(tmpdir)
+            p.file_index = 2
+            p.buffer = AudioSegment.silent(duration=1000)
+            with mock.patch.object(cp.AudioSegment, "from_file", side_effect=fake_decode), \
+                    mock.patch.object(p, "mix_ambient", side_effect=fake_mix), \
+                    mock.patch.object(cp, "_export_mp3") as export:
+                p._merge_with_previous(ambient=AudioSegment.silent(duration=1000))
+            merged = export.call_args.args[0]
+            assert len(merged) == 3000 + 1000 - 1000  # 1 s crossfade
+            assert threads["mix"] is threading.main_thread()
+            assert threads["decode"] is not threads["mix"]
+            assert p._buffer_ms() == 0
+
+
+class TestEqualPowerCrossfade:
+    @staticmethod
+    def _const(value, frames, channels=1):
+        import numpy as np
+        data = np.full(frames * channels, value, dtype=np.int16)
+        return AudioSegment(data=data.tobytes(), sample_width=2, frame_rate=24000, channels=channels)
+
+    def test_overlap_is_equal_power(self):
+        import numpy as np
+        prev, tail = self._const(10000, 48000, 2), self._const(-10000, 36000, 2)
+        merged = cp._equal_power_crossfade(prev, tail, 1000)
+        out = np.frombuffer(merged.raw_data, dtype=np.int16).reshape(-1, 2)
+        assert len(out) == 48000 + 36000 - 24000
+        assert (out[:24000] == 10000).all() and (out[48000:] == -10000).all()
+        assert out[24000, 0] == 10000 and abs(out[47999, 0] + 10000) <= 1
+        ramp = np.linspace(0, np.pi / 2, 24000)
+        assert np.allclose(out[24000:48000, 0], 10000 * (np.cos(ramp) - np.sin(ramp)), atol=2)
+
+    def test_crossfade_longer_than_audio_is_clamped(self):
+        merged = cp._equal_power_crossfade(self._const(100, 2400), self._const(100, 1200), 2000)
+        assert len(merged.raw_data) // 2 == 2400
+
+    def test_non_16bit_falls_back_to_pydub(self):
+        prev = AudioSegment(data=bytes(range(256)) * 40, sample_width=1, frame_rate=8000, channels=1)
+        tail = AudioSegment(data=bytes(reversed(range(256))) * 40, sample_width=1, frame_rate=8000, channels=1)
+        assert cp._equal_power_crossfade(prev, tail, 200).raw_data == prev.append(tail, crossfade=200).raw_data
+
+
+class TestPhase3UsesBackgroundExport:
+    def test_source_enables_pool_and_closes(self):
+        source_path = os.path.join(
+            os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+            "main_producer.py",
+        )
+        with open(source_path, "r", encoding="utf-8") as f:
+            source = f.read()
+        assert "export_workers=export_workers" in source
+        assert "packager.close()" in source
+
+
+class TestPhase3ChapterPrefetch:
+    def _producer(self, tmpdir):
+        try:
+            from main_producer import CineCastProducer
+        except ImportError:
+            import pytest
+            pytest.skip("main_producer requires mlx (macOS-only)")
+        producer = CineCastProducer.__new__(CineCastProducer)
+        producer.config = {"output_dir": os.path.join(tmpdir, "out"), "pure_narrator_mode": True}
+        producer.script_dir = os.path.join(tmpdir, "scripts")
+        producer.cache_dir = os.path.join(tmpdir, "cache")
+        producer.assets = mock.Mock()
+        for d in (producer.config["output_dir"], producer.script_dir, producer.cache_dir):
+            os.makedirs(d)
+        for name in "ABC":
+            with open(os.path.join(producer.script_dir, f"{name}_micro.json"), "w") as f:
+                f.write(f'[{{"chunk_id": "{name}1"}}, {{"chunk_id": "{name}2"}}]')
+            with open(os.path.join(producer.cache_dir, f"{name}1.wav"), "wb") as f:
+                f.write(b"RIFF")
+        return producer
+
+    def test_chapters_mixed_in_order_with_next_chapter_prefetched(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            producer = self._producer(tmpdir)
+            calls = []
+
+            class InlineThread:
+                def __init__(self, target, args, **kwargs):
+                    self.target, self.args = target, args
+
+                def start(self):
+                    self.target(*self.args)
+
+            def fake_process(self_pkg, micro_script, *args, **kwargs):
+                calls.append(micro_script[0]["chunk_id"])
+
+            with mock.patch("main_producer.threading.Thread", InlineThread), \
+                    mock.patch("main_producer.prefetch_wavs") as prefetch, \
+                    mock.patch("main_producer.CinematicPackager.process_from_cache", fake_process), \
+                    mock.patch("main_producer.CinematicPackager.close"), \
+                    mock.patch("concurrent.futures.ProcessPoolExecutor",
+                               side_effect=AssertionError("decode pool")):
+                producer.phase_3_cinematic_mix()
+            assert calls == ["A1", "B1", "C1"]
+            # the next chapter's cached WAVs are warmed while the current one mixes
+            assert [[os.path.basename(p) for p in c.args[0]] for c in prefetch.call_args_list] == \
+                [["B1.wav"], ["C1.wav"]]
+
+    def test_prefetch_wavs_tolerates_missing_files(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "a.wav")
+            with open(path, "wb") as f:
+                f.write(b"RIFF" * 1000)
+            cp.prefetch_wavs([path, os.path.join(tmpdir, "missing.wav")])
+            with mock.patch.object(cp.os, "posix_fadvise", None, create=True):
+                cp.prefetch_wavs([path])
+
+
+class TestPipedMp3Export:
+    def _fake_ffmpeg(self, returncode=0):
+        calls = []
+
+        class FakeProc:
+            def __init__(self, command, **kwargs):
+                self.command, self.kwargs, self.returncode = command, kwargs, returncode
+                calls.append(self)
+
+            def communicate(self, data):
+                self.data = data
+                with open(self.command[-1], "wb") as f:
+                    f.write(b"partial" if returncode else b"mp3")
+                return b"", b"boom"
+        return FakeProc, calls
+
+    def test_pcm_piped_to_ffmpeg(self):
+        audio = AudioSegment.silent(duration=1000, frame_rate=24000)
+        FakeProc, calls = self._fake_ffmpeg()
+        with tempfile.TemporaryDirectory() as tmpdir:
+            out = os.path.join(tmpdir, "Audiobook_Part_001.mp3")
+            with mock.patch.object(cp.subprocess, "Popen", FakeProc), \
+                    mock.patch.object(AudioSegment, "export", side_effect=AssertionError("temp wav")):
+                cp._export_mp3(audio, out, parameters=["-q:a", "2"])
+            with open(out, "rb") as f:
+                assert f.read() == b"mp3"
+            assert os.listdir(tmpdir) == ["Audiobook_Part_001.mp3"]
+        command = calls[0].command
+        assert command[command.index("-i") + 1] == "pipe:0"
+        assert command[command.index("-f") + 1] == "s16le"
+        assert command[command.index("-ar") + 1] == "24000"
+        assert ["-b:a", "128k", "-q:a", "2"] == command[command.index("-b:a"):command.index("-b:a") + 4]
+        assert calls[0].data == audio.raw_data
+
+    def test_failed_encode_leaves_no_volume(self):
+        FakeProc, _ = self._fake_ffmpeg(returncode=1)
+        with tempfile.TemporaryDirectory() as tmpdir:
+            out = os.path.join(tmpdir, "Audiobook_Part_001.mp3")
+            with mock.patch.object(cp.subprocess, "Popen", FakeProc):
+                try:
+                    cp._export_mp3(AudioSegment.silent(duration=100), out)
+                except cp.CouldntEncodeError as e:
+                    assert "boom" in str(e)
+                else:
+                    raise AssertionError("expected CouldntEncodeError")
+            assert os.listdir(tmpdir) == []
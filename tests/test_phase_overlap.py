@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Tests for overlapping phase 1 (script generation) with phase 2 (TTS rendering).
+
+Covers:
+- phase_1_generate_scripts reports every ready script (new and pre-existing)
+- phase_2_render_dry_audio drains a script queue and loads the engine lazily
+- run_script_and_render renders all chapters and builds the engine in the worker thread
+- overlap_script_and_tts=False keeps the strict serial path
+- A crashed render worker is surfaced to the caller
+- Ambient / chime decoding is prewarmed on a background thread (skipped in pure narrator mode)
+"""
+
+import os
+import queue
+import sys
+import tempfile
+import threading
+from unittest import mock
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def _make_producer(tmpdir, overlap=True):
+    try:
+        from main_producer import CineCastProducer
+    except ImportError:
+        pytest.skip("main_producer requires mlx (macOS-only)")
+
+    producer = CineCastProducer.__new__(CineCastProducer)
+    producer.config = {
+        "output_dir": os.path.join(tmpdir, "output"),
+        "model_path": "dummy",
+        "llm_api_key": "test-key",  # pure narrator mode never calls the API
+        "enable_recap": False,
+        "pure_narrator_mode": True,
+        "overlap_script_and_tts": overlap,
+    }
+    producer.script_dir = os.path.join(tmpdir, "scripts")
+    producer.cache_dir = os.path.join(tmpdir, "cache")
+    os.makedirs(producer.script_dir, exist_ok=True)
+    os.makedirs(producer.cache_dir, exist_ok=True)
+    producer.assets = mock.Mock()
+    producer.assets.get_voice_for_role.return_value = {"mode": "preset", "voice": "aiden"}
+    return producer
+
+
+def _make_input(tmpdir, n=3):
+    input_dir = os.path.join(tmpdir, "input")
+    os.makedirs(input_dir)
+    for i in range(n):
+        with open(os.path.join(input_dir, f"ch{i}.txt"), "w", encoding="utf-8") as f:
+            f.write(f"第{i + 1}章\n夜幕降临港口。老渔夫望着海面。")
+    return input_dir
+
+
+class FakeEngine:
+    def __init__(self):
+        self.thread = threading.current_thread()
+        self.rendered = []
+
+    def warmup(self, modes):
+        pass
+
+    def render_dry_chunk(self, content, voice_cfg, save_path):
+        with open(save_path, "wb") as f:
+            f.write(b"RIFF")
+        self.rendered.append(save_path)
+        return True
+
+    def render_dry_batch(self, contents, voice_cfg, save_paths):
+        return [self.render_dry_chunk(c, voice_cfg, p) for c, p in zip(contents, save_paths)]
+
+    def destroy(self):
+        pass
+
+
+class TestScriptReadyCallback:
+    def test_reports_new_and_existing_scripts(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            producer = _make_producer(tmpdir)
+            input_dir = _make_input(tmpdir)
+            with open(os.path.join(producer.script_dir, "ch0_micro.json"), "w") as f:
+                f.write("[]")
+            ready = []
+            assert producer.phase_1_generate_scripts(input_dir, on_script_ready=ready.append)
+            assert ready == ["ch0_micro.json", "ch1_micro.json", "ch2_micro.json"]
+
+
+class TestQueuedRender:
+    def test_engine_not_loaded_for_empty_queue(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            producer = _make_producer(tmpdir)
+            q = queue.Queue()
+            q.put(None)
+            with mock.patch.object(producer, "_create_tts_engine") as create:
+                producer.phase_2_render_dry_audio(script_queue=q)
+            create.assert_not_called()
+
+
+class TestRunScriptAndRender:
+    def test_overlapped_run_renders_all_chunks_in_worker(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            producer = _make_producer(tmpdir)
+            input_dir = _make_input(tmpdir)
+            engines = []
+
+            def create():
+                engines.append(FakeEngine())
+                return engines[-1]
+
+            with mock.patch.object(producer, "_create_tts_engine", side_effect=create):
+                assert producer.run_script_and_render(input_dir) is True
+
+            assert len(engines) == 1
+            assert engines[0].thread is not threading.main_thread()
+            wavs = [f for f in os.listdir(producer.cache_dir) if f.endswith(".wav")]
+            assert len(wavs) == len(engines[0].rendered) >= 3
+
+    def test_serial_when_disabled(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            producer = _make_producer(tmpdir, overlap=False)
+            input_dir = _make_input(tmpdir)
+            with mock.patch.object(producer, "phase_2_render_dry_audio") as phase_2:
+                assert producer.run_script_and_render(input_dir) is True
+            phase_2.assert_called_once_with()
+
+    def test_worker_error_is_raised(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            producer = _make_producer(tmpdir)
+            input_dir = _make_input(tmpdir)
+            with mock.patch.object(producer, "_create_tts_engine",
+                                   side_effect=RuntimeError("metal lost")):
+                with pytest.raises(RuntimeError, match="metal lost"):
+                    producer.run_script_and_render(input_dir)
+
+
+class TestAssetPrewarm:
+    def test_prewarm_runs_in_background(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            producer = _make_producer(tmpdir)
+            producer.config.update(pure_narrator_mode=False, ambient_theme="rain")
+            worker = producer._start_asset_prewarm()
+            worker.join(timeout=5)
+            assert worker.daemon and worker is not threading.current_thread()
+            producer.assets.prewarm_audio.assert_called_once_with(("rain",))
+
+    def test_skipped_in_pure_narrator_mode(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            producer = _make_producer(tmpdir)
+            assert producer._start_asset_prewarm() is None
+            producer.assets.prewarm_audio.assert_not_called()
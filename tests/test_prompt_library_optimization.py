@@ -11,6 +11,8 @@ Covers:
 - Gender-voice conflict validation in _validate_script_elements
 - _normalize_text for number/symbol to Chinese conversion
 - JSON overflow protection for dialogue-heavy text
+- Static system-prompt prefix stays byte-identical while the cast DB grows (prefix caching)
+- The shared prefix is built once per director; prompt_cache marks it with cache_control
 """
 
 import inspect
@@ -317,3 +319,56 @@ class TestJsonOverflowProtection:
         # max_tokens should be set; dialogue-dense strategy now reduces
         # text chunk size instead of max_tokens to preserve speaker context.
         assert payload_max_tokens > 0
+
+
+# ---------------------------------------------------------------------------
+# Prefix-cache friendly prompt layout
+# ---------------------------------------------------------------------------
+
+class TestPromptPrefixCaching:
+    @staticmethod
+    def _director(tmp_path, **kwargs):
+        with mock.patch.object(LLMScriptDirector, "_test_api_connection", return_value=True):
+            director = LLMScriptDirector(api_key="k", cast_db_path=str(tmp_path / "cast.json"), **kwargs)
+        chunk = mock.MagicMock()
+        chunk.choices = [mock.MagicMock()]
+        chunk.choices[0].delta.content = json.dumps(
+            [{"type": "narration", "speaker": "narrator", "content": "夜。"}], ensure_ascii=False)
+        captured = []
+        director.client = mock.MagicMock()
+        director.client.chat.completions.create = lambda **kw: captured.append(kw) or iter([chunk])
+        return director, captured
+
+    def test_dynamic_cast_sections_follow_static_prefix(self, tmp_path):
+        director, captured = self._director(tmp_path)
+        director._request_llm("夜。")
+        director.cast_profiles["老渔夫"] = {"gender": "male"}
+        director._local_session_cast["老渔夫"] = "沧桑"
+        director._request_llm("夜。")
+
+        first, second = (kw["messages"][0]["content"] for kw in captured)
+        assert second.startswith(first)
+        assert "示例参考" in first and "老渔夫(male)" in second[len(first):]
+
+    def test_session_prefix_built_once(self, tmp_path):
+        director, _ = self._director(tmp_path, global_cast={"老渔夫": {"gender": "male"}})
+        director._request_llm("夜。")
+        prefix = director._session_prefix
+        assert '"老渔夫"(gender=male)' in prefix and prefix.rstrip().endswith("]")
+        with mock.patch.object(director, "_get_archetype_prompt") as archetypes:
+            director._request_llm("夜。")
+            director.fork()._request_llm("夜。")
+        archetypes.assert_not_called()
+        assert director._session_prefix is prefix
+
+    def test_prompt_cache_marks_prefix_block(self, tmp_path):
+        director, captured = self._director(tmp_path, prompt_cache=True)
+        director._request_llm("夜。")
+        director._local_session_cast["老渔夫"] = "沧桑"
+        director._request_llm("夜。")
+
+        first, second = (kw["messages"][0]["content"] for kw in captured)
+        assert first == [{"type": "text", "text": director._session_prefix,
+                          "cache_control": {"type": "ephemeral"}}]
+        assert second[0] == first[0]
+        assert "老渔夫" in second[1]["text"] and "cache_control" not in second[1]
@@ -195,6 +195,17 @@ class TestClonesScan:
         assert "villain" in manager.role_voice_map
         assert manager.role_voice_map["hero"]["mode"] == "clone"
 
+    def test_clone_extension_case_insensitive(self, tmp_path):
+        clones_dir = tmp_path / "Clones"
+        clones_dir.mkdir()
+        (clones_dir / "Hero.FLAC").write_bytes(b"\x00" * 40)
+        (clones_dir / "notes.txt").write_text("x")
+        (clones_dir / "take.wav.bak").write_bytes(b"\x00" * 40)
+        manager = AssetManager(asset_dir=str(tmp_path))
+        assert manager.role_voice_map["Hero"]["ref_audio"].endswith("Hero.FLAC")
+        assert "notes" not in manager.role_voice_map
+        assert "take.wav" not in manager.role_voice_map
+
     def test_no_clones_dir_no_error(self, tmp_path):
         voices_dir = tmp_path / "voices"
         voices_dir.mkdir()
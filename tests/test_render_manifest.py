@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Tests for the phase-2 render manifest (cache_dir/.render_manifest.json).
+
+Covers:
+- Each rendered script is recorded with a digest of its content and voice configs
+- Cached WAVs of an unchanged chapter are reused on the next run
+- A changed voice config drops that chapter's cached WAVs and re-renders them
+- Cached WAVs without a manifest entry keep the exists-means-skip behaviour
+"""
+
+import json
+import os
+import sys
+import tempfile
+from unittest import mock
+
+import numpy as np
+import pytest
+import soundfile as sf
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def _make_producer(tmpdir, voice="aiden"):
+    try:
+        from main_producer import CineCastProducer
+    except ImportError:
+        pytest.skip("main_producer requires mlx (macOS-only)")
+    producer = CineCastProducer.__new__(CineCastProducer)
+    producer.config = {"tts_batch_size": 1}
+    producer.script_dir = os.path.join(tmpdir, "scripts")
+    producer.cache_dir = os.path.join(tmpdir, "cache")
+    os.makedirs(producer.script_dir, exist_ok=True)
+    os.makedirs(producer.cache_dir, exist_ok=True)
+    producer.assets = mock.Mock()
+    producer.assets.get_voice_for_role.return_value = {"mode": "preset", "voice": voice}
+    for ch in "AB":
+        script = [{"chunk_id": f"{ch}{i}", "type": "narration", "speaker": "narrator",
+                   "content": f"{ch}{i}。"} for i in range(2)]
+        with open(os.path.join(producer.script_dir, f"{ch}_micro.json"), "w", encoding="utf-8") as f:
+            json.dump(script, f)
+    return producer
+
+
+def _render(producer):
+    """Run phase 2 with a fake engine that writes a WAV per chunk; return rendered names"""
+    rendered = []
+
+    def render(content, cfg, path):
+        sf.write(path, np.zeros(10, dtype=np.float32), 24000)
+        rendered.append(os.path.basename(path))
+        return True
+
+    engine = mock.Mock()
+    engine.render_dry_chunk.side_effect = render
+    with mock.patch.object(producer, "_create_tts_engine", return_value=engine):
+        producer.phase_2_render_dry_audio()
+    return sorted(rendered)
+
+
+def _manifest(producer):
+    with open(os.path.join(producer.cache_dir, ".render_manifest.json"), encoding="utf-8") as f:
+        return json.load(f)["chapters"]
+
+
+class TestRenderManifest:
+    def test_recorded_and_reused(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            producer = _make_producer(tmpdir)
+            assert _render(producer) == ["A0.wav", "A1.wav", "B0.wav", "B1.wav"]
+            assert sorted(_manifest(producer)) == ["A_micro.json", "B_micro.json"]
+            assert _render(_make_producer(tmpdir)) == []
+
+    def test_voice_change_rerenders(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            _render(_make_producer(tmpdir))
+            before = _manifest(_make_producer(tmpdir))
+            producer = _make_producer(tmpdir, voice="uncle_fu")
+            assert _render(producer) == ["A0.wav", "A1.wav", "B0.wav", "B1.wav"]
+            assert _manifest(producer) != before
+
+    def test_legacy_cache_trusted(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            producer = _make_producer(tmpdir)
+            for name in ("A0.wav", "A1.wav"):
+                sf.write(os.path.join(producer.cache_dir, name), np.zeros(10, dtype=np.float32), 24000)
+            assert _render(producer) == ["B0.wav", "B1.wav"]
+            assert "A_micro.json" in _manifest(producer)
@@ -8,11 +8,14 @@ Covers:
 - _log_content_diff: paragraph-level missing content analysis
 - parse_and_micro_chunk: automatic narration fallback when ratio < 90%
 - phase_2_render_dry_audio: enhanced exception and failure logging
+- _BufferedLogHandler: batches INFO records, flushes on WARNING and after flush_interval
+- _BufferedLogHandler: a background thread flushes the last buffered record without a new one arriving
 """
 
 import logging
 import os
 import sys
+import time
 from unittest import mock
 
 import pytest
@@ -226,3 +229,47 @@ class TestRenderMonitoringSourceCode:
             source = f.read()
         assert "ratio < 0.99" in source
         assert "_log_content_diff" in source
+
+
+# ---------------------------------------------------------------------------
+# Buffered file logging
+# ---------------------------------------------------------------------------
+
+class TestBufferedLogHandler:
+    def _handler(self, interval):
+        try:
+            from main_producer import _BufferedLogHandler
+        except ImportError:
+            pytest.skip("main_producer requires mlx (macOS-only)")
+        target = mock.Mock(spec=logging.Handler)
+        return _BufferedLogHandler(target, capacity=100, flush_interval=interval), target
+
+    def _record(self, level):
+        return logging.LogRecord("t", level, __file__, 1, "msg %d", (1,), None)
+
+    def test_info_records_are_batched(self):
+        handler, target = self._handler(interval=3600)
+        for _ in range(5):
+            handler.handle(self._record(logging.INFO))
+        target.handle.assert_not_called()
+        handler.handle(self._record(logging.WARNING))
+        assert target.handle.call_count == 6
+        handler.close()
+
+    def test_idle_buffer_flushed_by_timer(self):
+        handler, target = self._handler(interval=0.05)
+        handler._last_flush = time.monotonic() + 3600  # 让 shouldFlush 不触发，只靠后台线程
+        handler.handle(self._record(logging.INFO))
+        target.handle.assert_not_called()
+        deadline = time.monotonic() + 2
+        while not target.handle.called and time.monotonic() < deadline:
+            time.sleep(0.01)
+        handler.close()
+        target.handle.assert_called_once()
+
+    def test_interval_forces_flush(self):
+        handler, target = self._handler(interval=0)
+        handler.handle(self._record(logging.INFO))
+        handler.close()
+        target.handle.assert_called_once()
+
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Tests for the micro-script cache shared between phase 2 and phase 3.
+
+Covers:
+- _list_script_files is sorted and skips preview scripts
+- _load_script parses each file once and reuses the result
+- A rewritten script (new size/mtime) is parsed again
+- read_json parses with orjson when available and raises ValueError on bad input
+"""
+
+import json
+import os
+import sys
+import tempfile
+from unittest import mock
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.llm_director import read_json
+
+
+def _producer(tmpdir):
+    try:
+        from main_producer import CineCastProducer
+    except ImportError:
+        pytest.skip("main_producer requires mlx (macOS-only)")
+    producer = CineCastProducer.__new__(CineCastProducer)
+    producer.script_dir = tmpdir
+    return producer
+
+
+def _write(path, data):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+
+
+class TestScriptCache:
+    def test_list_skips_preview(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            for name in ("B_micro.json", "A_micro.json", "_preview_x_micro.json", "notes.txt"):
+                _write(os.path.join(tmpdir, name), [])
+            assert _producer(tmpdir)._list_script_files() == ["A_micro.json", "B_micro.json"]
+
+    def test_parsed_once_across_phases(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            _write(os.path.join(tmpdir, "A_micro.json"), [{"chunk_id": "a"}])
+            producer = _producer(tmpdir)
+            with mock.patch("main_producer.read_json", wraps=read_json) as load:
+                first = producer._load_all_scripts()
+                second = producer._load_all_scripts()
+            assert load.call_count == 1
+            assert first == second == [("A_micro.json", [{"chunk_id": "a"}])]
+
+    def test_rewritten_script_reparsed(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "A_micro.json")
+            _write(path, [{"chunk_id": "a"}])
+            producer = _producer(tmpdir)
+            producer._load_script("A_micro.json")
+            _write(path, [{"chunk_id": "a"}, {"chunk_id": "b"}])
+            assert len(producer._load_script("A_micro.json")) == 2
+
+
+class TestReadJson:
+    def test_round_trip_and_errors(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "A_micro.json")
+            _write(path, [{"chunk_id": "a", "content": "夜幕降临。"}])
+            assert read_json(path) == [{"chunk_id": "a", "content": "夜幕降临。"}]
+            with open(path, "w", encoding="utf-8") as f:
+                f.write('[{"chunk_id": ')
+            with pytest.raises(ValueError):
+                read_json(path)
+
+    def test_stdlib_fallback(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "m.json")
+            _write(path, {"chapters": {"A_micro.json": "x"}})
+            with mock.patch("modules.llm_director.orjson", None):
+                assert read_json(path) == {"chapters": {"A_micro.json": "x"}}
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Tests for the phase-1 script content manifest (scripts/.manifest.json).
+
+Covers:
+- Unchanged chapters are skipped and recorded by SHA-256
+- A chapter whose text changed under the same name is regenerated and its cached WAVs dropped
+- Legacy scripts without a manifest entry keep the exists-means-skip behaviour
+- A chapter identical to an existing one reuses that script with re-prefixed chunk_ids
+- phase_2 does not trust WAVs that phase_1 invalidated after the cache scan
+"""
+
+import json
+import os
+import sys
+import tempfile
+from unittest import mock
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def _make_producer(tmpdir):
+    try:
+        from main_producer import CineCastProducer
+    except ImportError:
+        pytest.skip("main_producer requires mlx (macOS-only)")
+    producer = CineCastProducer.__new__(CineCastProducer)
+    producer.config = {
+        "output_dir": os.path.join(tmpdir, "output"),
+        "model_path": "dummy",
+        "llm_api_key": "test-key",  # pure narrator mode never calls the API
+        "enable_recap": False,
+        "pure_narrator_mode": True,
+    }
+    producer.script_dir = os.path.join(tmpdir, "scripts")
+    producer.cache_dir = os.path.join(tmpdir, "cache")
+    os.makedirs(producer.script_dir)
+    os.makedirs(producer.cache_dir)
+    return producer
+
+
+def _write_chapters(input_dir, chapters):
+    os.makedirs(input_dir, exist_ok=True)
+    for name, text in chapters.items():
+        with open(os.path.join(input_dir, f"{name}.txt"), "w", encoding="utf-8") as f:
+            f.write(text)
+
+
+def _script(producer, name):
+    with open(os.path.join(producer.script_dir, f"{name}_micro.json"), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _manifest(producer):
+    with open(os.path.join(producer.script_dir, ".manifest.json"), encoding="utf-8") as f:
+        return json.load(f)["chapters"]
+
+
+class TestScriptManifest:
+    def test_unchanged_chapter_skipped(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            producer = _make_producer(tmpdir)
+            input_dir = os.path.join(tmpdir, "input")
+            _write_chapters(input_dir, {"ch1": "第一章\n夜幕降临港口。"})
+            assert producer.phase_1_generate_scripts(input_dir)
+            assert list(_manifest(producer)) == ["ch1_micro.json"]
+            with mock.patch("main_producer.LLMScriptDirector.generate_pure_narrator_script") as gen:
+                assert producer.phase_1_generate_scripts(input_dir)
+            gen.assert_not_called()
+
+    def test_changed_chapter_regenerated_and_wavs_dropped(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            producer = _make_producer(tmpdir)
+            input_dir = os.path.join(tmpdir, "input")
+            _write_chapters(input_dir, {"ch1": "第一章\n夜幕降临港口。"})
+            assert producer.phase_1_generate_scripts(input_dir)
+            old_ids = [item["chunk_id"] for item in _script(producer, "ch1")]
+            for chunk_id in old_ids:
+                open(os.path.join(producer.cache_dir, f"{chunk_id}.wav"), "wb").close()
+
+            _write_chapters(input_dir, {"ch1": "第一章\n清晨的海面很平静。"})
+            assert producer.phase_1_generate_scripts(input_dir)
+            assert "清晨" in "".join(item["content"] for item in _script(producer, "ch1"))
+            assert os.listdir(producer.cache_dir) == []
+            assert producer._stale_wavs == {f"{cid}.wav" for cid in old_ids}
+
+    def test_legacy_script_without_entry_kept(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            producer = _make_producer(tmpdir)
+            input_dir = os.path.join(tmpdir, "input")
+            _write_chapters(input_dir, {"ch1": "第一章\n夜幕降临港口。"})
+            with open(os.path.join(producer.script_dir, "ch1_micro.json"), "w") as f:
+                f.write("[]")
+            assert producer.phase_1_generate_scripts(input_dir)
+            assert _script(producer, "ch1") == []
+
+    def test_identical_chapter_reuses_script(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            producer = _make_producer(tmpdir)
+            input_dir = os.path.join(tmpdir, "input")
+            text = "第一章\n夜幕降临港口。\n老渔夫望着海面。"
+            _write_chapters(input_dir, {"a": text})
+            assert producer.phase_1_generate_scripts(input_dir)
+
+            _write_chapters(input_dir, {"b": text})
+            with mock.patch("main_producer.LLMScriptDirector.generate_pure_narrator_script") as gen:
+                assert producer.phase_1_generate_scripts(input_dir)
+            gen.assert_not_called()
+            original, reused = _script(producer, "a"), _script(producer, "b")
+            assert [i["content"] for i in reused] == [i["content"] for i in original]
+            assert all(i["chunk_id"].startswith("b_") for i in reused)
+            assert _manifest(producer)["b_micro.json"] == _manifest(producer)["a_micro.json"]
+
+
+class TestPhase2StaleWavs:
+    def test_invalidated_wavs_are_rendered_again(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            producer = _make_producer(tmpdir)
+            producer.config["tts_batch_size"] = 1
+            producer.assets = mock.Mock()
+            producer.assets.get_voice_for_role.return_value = {"mode": "preset"}
+            with open(os.path.join(producer.script_dir, "a_micro.json"), "w", encoding="utf-8") as f:
+                json.dump([{"chunk_id": "a_1", "type": "narration", "speaker": "narrator",
+                            "content": "好。"}], f)
+            open(os.path.join(producer.cache_dir, "a_1.wav"), "wb").close()
+            producer._stale_wavs = {"a_1.wav"}
+            engine = mock.Mock()
+            engine.render_dry_chunk.return_value = True
+            with mock.patch.object(producer, "_create_tts_engine", return_value=engine):
+                producer.phase_2_render_dry_audio()
+            engine.render_dry_chunk.assert_called_once()
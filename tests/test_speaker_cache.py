@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Tests for reference-audio and speaker-embedding caching in MLXRenderEngine.
+
+Covers:
+- _ref_audio decodes each reference WAV once and invalidates on mtime change
+- Non-path / missing references are passed through untouched
+- _install_speaker_cache runs the speaker encoder once per distinct reference
+- The speaker cache is bounded by SPEAKER_CACHE_SIZE
+- Clone renders hand the cached array (not the path) to the model
+- destroy() frees the model despite the cache wrapper's reference cycle
+"""
+
+import os
+import sys
+import tempfile
+import weakref
+from types import SimpleNamespace
+from unittest import mock
+
+import numpy as np
+import pytest
+import soundfile as sf
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+mx = pytest.importorskip("mlx.core")
+
+
+def _engine_module():
+    try:
+        import modules.mlx_tts_engine as engine_module
+    except ImportError:
+        pytest.skip("mlx_tts_engine requires mlx_audio")
+    return engine_module
+
+
+def _engine(model=None):
+    em = _engine_module()
+    engine = em.MLXRenderEngine.__new__(em.MLXRenderEngine)
+    engine.model = model or SimpleNamespace(sample_rate=24000)
+    engine.sample_rate = 24000
+    engine.max_chars = 150
+    engine.default_voice = "aiden"
+    engine.current_mode = "clone"
+    engine._model_paths = {}
+    return engine
+
+
+class TestRefAudioCache:
+    def test_decoded_once_and_invalidated_on_change(self):
+        em = _engine_module()
+        with tempfile.TemporaryDirectory() as tmpdir:
+            ref = os.path.join(tmpdir, "ref.wav")
+            sf.write(ref, np.zeros(2400, dtype=np.float32), 24000)
+            engine = _engine()
+            with mock.patch.object(em, "load_audio", wraps=em.load_audio) as load:
+                a = engine._ref_audio(ref)
+                b = engine._ref_audio(ref)
+                assert a is b
+                assert load.call_count == 1
+                os.utime(ref, ns=(0, 10**9))
+                engine._ref_audio(ref)
+                assert load.call_count == 2
+
+    def test_passthrough(self):
+        engine = _engine()
+        arr = mx.zeros((10,))
+        assert engine._ref_audio(arr) is arr
+        assert engine._ref_audio("") == ""
+        assert engine._ref_audio("/nonexistent/ref.wav") == "/nonexistent/ref.wav"
+
+    def test_prewarm_voice_ignores_failures(self):
+        engine = _engine()
+        with mock.patch.object(engine, "_ref_audio", side_effect=RuntimeError("bad wav")):
+            engine.prewarm_voice({"mode": "clone", "ref_audio": "x.wav"})
+        engine.prewarm_voice({"mode": "preset", "voice": "aiden"})
+
+
+class TestSpeakerEmbeddingCache:
+    def test_encoder_runs_once_per_reference(self):
+        em = _engine_module()
+        calls = []
+        model = SimpleNamespace(extract_speaker_embedding=lambda audio, sr=24000: calls.append(sr) or mx.ones((1, 4)))
+        em.MLXRenderEngine._install_speaker_cache(model)
+        em.MLXRenderEngine._install_speaker_cache(model)  # idempotent
+        ref_a, ref_b = mx.zeros((100,)), mx.ones((100,))
+        first = model.extract_speaker_embedding(ref_a)
+        assert model.extract_speaker_embedding(mx.zeros((100,))) is first
+        model.extract_speaker_embedding(ref_b)
+        assert len(calls) == 2
+
+    def test_cache_is_bounded(self):
+        em = _engine_module()
+        calls = []
+        model = SimpleNamespace(extract_speaker_embedding=lambda audio, sr=24000: calls.append(1) or mx.ones((1,)))
+        em.MLXRenderEngine._install_speaker_cache(model)
+        with mock.patch.object(em, "SPEAKER_CACHE_SIZE", 2):
+            for value in (1.0, 2.0, 3.0, 1.0):
+                model.extract_speaker_embedding(mx.full((4,), value))
+        assert len(calls) == 4  # 1.0 was evicted before it was requested again
+
+
+class TestCloneRenderUsesCachedArray:
+    def test_generate_receives_array(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            ref = os.path.join(tmpdir, "ref.wav")
+            sf.write(ref, np.zeros(2400, dtype=np.float32), 24000)
+            seen = []
+
+            def generate(**kwargs):
+                seen.append(kwargs["ref_audio"])
+                return [SimpleNamespace(audio=mx.zeros((50,)))]
+
+            engine = _engine(SimpleNamespace(sample_rate=24000, generate=generate))
+            cfg = {"mode": "clone", "ref_audio": ref, "ref_text": "参考"}
+            for i in range(2):
+                assert engine.render_dry_chunk("你好。", cfg, os.path.join(tmpdir, f"c{i}.wav"))
+            assert all(isinstance(a, mx.array) for a in seen)
+            assert seen[0] is seen[1]
+
+
+class TestDestroyReleasesModel:
+    def test_model_collected_before_metal_cache_clear(self):
+        em = _engine_module()
+
+        class Model:
+            def extract_speaker_embedding(self, audio, sr=24000):
+                return mx.ones((1,))
+
+        model = Model()
+        em.MLXRenderEngine._install_speaker_cache(model)  # model -> wrapper -> bound method -> model
+        engine = _engine(model)
+        engine.io_executor = None
+        engine._ref_audio_cache = {"ref": mx.zeros((4,))}
+        ref = weakref.ref(model)
+        del model
+        alive_at_clear = []
+        with mock.patch.object(em.mx, "clear_cache", side_effect=lambda: alive_at_clear.append(ref() is not None)):
+            engine.destroy()
+        assert alive_at_clear == [False]
+        assert "_ref_audio_cache" not in engine.__dict__
@@ -0,0 +1,335 @@
+#!/usr/bin/env python3
+"""
+Tests for batched dry-voice rendering (MLXRenderEngine.render_dry_batch).
+
+Covers:
+- Same-voice chunks go through one batch_generate call and land in the right files
+- Punctuation-only chunks get a pause WAV and are kept out of the batch
+- Voice configs that cannot be batched (preset + reference audio) fall back to per-chunk
+- A failing batch_generate falls back to per-chunk rendering
+- The batch capability is checked on the model loaded for the voice's mode
+- Batched results are written on the I/O pool and flushed by wait_for_writes
+- write_wav emits the whole PCM_16 file with a single write() call
+- background_writes moves single-chunk writes onto the I/O pool as well
+- Rendering never mutates the shared voice config it was handed
+- phase_2_render_dry_audio splits voice groups into tts_batch_size batches
+- Partial batches of the same voice are carried over and filled by later chapters
+- Voices that cannot really batch are rendered and timed chunk by chunk
+- A timed-out batch restarts the engine and its chunks are re-rendered one by one
+"""
+
+import concurrent.futures
+import json
+import os
+import sys
+import tempfile
+from types import SimpleNamespace
+from unittest import mock
+
+import numpy as np
+import pytest
+import soundfile as sf
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+mx = pytest.importorskip("mlx.core")
+
+
+class FakeModel:
+    def __init__(self, fail_batch=False):
+        self.fail_batch = fail_batch
+        self.batch_calls = []
+        self.single_calls = []
+
+    def batch_generate(self, texts, **kwargs):
+        self.batch_calls.append((texts, kwargs))
+        if self.fail_batch:
+            raise RuntimeError("batch OOM")
+        # yield out of order; each sequence's length encodes its index
+        for idx in reversed(range(len(texts))):
+            yield SimpleNamespace(sequence_idx=idx, audio=mx.zeros((100 * (idx + 1),)))
+
+    def generate(self, text, **kwargs):
+        self.single_calls.append((text, kwargs))
+        return [SimpleNamespace(audio=mx.zeros((50,)))]
+
+
+def _engine(model):
+    try:
+        from modules.mlx_tts_engine import MLXRenderEngine
+    except ImportError:
+        pytest.skip("mlx_tts_engine requires mlx_audio")
+    engine = MLXRenderEngine.__new__(MLXRenderEngine)
+    engine.model = model
+    engine.default_voice = "aiden"
+    engine.sample_rate = 24000
+    engine.max_chars = 150
+    engine.current_mode = "preset"
+    engine._model_paths = {}
+    engine.io_executor = concurrent.futures.ThreadPoolExecutor(max_workers=2)
+    engine._pending_writes = []
+    return engine
+
+
+def _frames(path):
+    return sf.info(path).frames
+
+
+class TestRenderDryBatch:
+    def test_single_batch_call_writes_each_file(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            model = FakeModel()
+            paths = [os.path.join(tmpdir, f"c{i}.wav") for i in range(3)]
+            engine = _engine(model)
+            ok = engine.render_dry_batch(["甲说话。", "乙说话。", "丙说话。"],
+                                         {"mode": "preset", "voice": "uncle_fu"}, paths)
+            engine.wait_for_writes()
+            assert ok == [True, True, True]
+            assert engine._pending_writes == []
+            assert len(model.batch_calls) == 1
+            assert model.batch_calls[0][1]["voices"] == ["uncle_fu"] * 3
+            assert [_frames(p) for p in paths] == [100, 200, 300]
+
+    def test_punctuation_only_chunk_not_batched(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            model = FakeModel()
+            paths = [os.path.join(tmpdir, f"c{i}.wav") for i in range(3)]
+            engine = _engine(model)
+            ok = engine.render_dry_batch(["甲。", "……", "丙。"], {"mode": "preset"}, paths)
+            engine.wait_for_writes()
+            assert ok == [True, True, True]
+            assert model.batch_calls[0][0] == ["甲。", "丙。"]
+            assert _frames(paths[1]) == int(24000 * 0.6)
+
+    def test_preset_with_reference_audio_falls_back(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            model = FakeModel()
+            paths = [os.path.join(tmpdir, f"c{i}.wav") for i in range(2)]
+            cfg = {"mode": "preset", "voice": "aiden", "audio": "ref.wav", "text": "ref"}
+            assert _engine(model).render_dry_batch(["甲。", "乙。"], cfg, paths) == [True, True]
+            assert model.batch_calls == []
+            assert len(model.single_calls) == 2
+
+    def test_writes_go_through_io_pool(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            engine = _engine(FakeModel())
+            paths = [os.path.join(tmpdir, f"c{i}.wav") for i in range(2)]
+            with mock.patch.object(engine.io_executor, "submit",
+                                   wraps=engine.io_executor.submit) as submit:
+                engine.render_dry_batch(["甲。", "乙。"], {"mode": "preset"}, paths)
+            engine.wait_for_writes()
+            assert submit.call_count == 2
+            assert sf.info(paths[0]).subtype == "PCM_16"
+
+    def test_failed_batch_falls_back_to_single(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            model = FakeModel(fail_batch=True)
+            paths = [os.path.join(tmpdir, f"c{i}.wav") for i in range(2)]
+            assert _engine(model).render_dry_batch(["甲。", "乙。"], {"mode": "preset"}, paths) == [True, True]
+            assert len(model.single_calls) == 2
+            assert all(os.path.exists(p) for p in paths)
+
+    def test_capability_checked_after_mode_switch(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            design_model = FakeModel()
+            engine = _engine(SimpleNamespace())  # 当前 preset 模型不支持 batch_generate
+            engine._model_paths = {"design": "design-model"}
+
+            def _do_load(path, mode):
+                engine.model, engine.current_mode = design_model, mode
+
+            engine._do_load = _do_load
+            paths = [os.path.join(tmpdir, f"c{i}.wav") for i in range(2)]
+            cfg = {"mode": "design", "instruct": "低沉的男声"}
+            assert engine.render_dry_batch(["甲。", "乙。"], cfg, paths) == [True, True]
+            engine.wait_for_writes()
+            assert len(design_model.batch_calls) == 1
+            assert design_model.single_calls == []
+
+    def test_voice_cfg_not_mutated(self):
+        import copy
+        with tempfile.TemporaryDirectory() as tmpdir:
+            engine = _engine(FakeModel())
+            cfgs = [{"mode": "preset", "voice": "uncle_fu", "speed": 1.05},
+                    {"mode": "preset", "voice": "aiden", "audio": "ref.wav", "text": "ref"}]
+            for cfg in cfgs:
+                before = copy.deepcopy(cfg)
+                paths = [os.path.join(tmpdir, f"c{i}.wav") for i in range(2)]
+                engine.render_dry_batch(["甲。", "乙。"], cfg, paths)
+                engine.render_dry_chunk("丙。", cfg, os.path.join(tmpdir, "c9.wav"))
+                assert cfg == before
+
+
+class TestBackgroundSingleWrites:
+    def test_single_chunk_written_on_io_pool(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            engine = _engine(FakeModel())
+            engine.background_writes = True
+            path = os.path.join(tmpdir, "c0.wav")
+            with mock.patch.object(engine.io_executor, "submit",
+                                   wraps=engine.io_executor.submit) as submit:
+                assert engine.render_dry_chunk("甲说话。", {"mode": "preset"}, path)
+            engine.wait_for_writes()
+            submit.assert_called_once()
+            assert _frames(path) == 50
+
+    def test_synchronous_by_default(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            engine = _engine(FakeModel())
+            path = os.path.join(tmpdir, "c0.wav")
+            with mock.patch.object(engine.io_executor, "submit") as submit:
+                assert engine.render_dry_chunk("甲说话。", {"mode": "preset"}, path)
+            submit.assert_not_called()
+            assert _frames(path) == 50
+
+    def test_producer_engine_enables_background_writes(self):
+        try:
+            from main_producer import CineCastProducer
+        except ImportError:
+            pytest.skip("main_producer requires mlx (macOS-only)")
+        producer = CineCastProducer.__new__(CineCastProducer)
+        producer.config = {"model_path": "dummy"}
+        with mock.patch("main_producer.MLXRenderEngine") as local:
+            engine = producer._create_tts_engine()
+        assert engine is local.return_value
+        assert engine.background_writes is True
+
+
+class TestPhase2Batching:
+    def test_groups_split_by_batch_size(self):
+        try:
+            from main_producer import CineCastProducer
+        except ImportError:
+            pytest.skip("main_producer requires mlx (macOS-only)")
+        with tempfile.TemporaryDirectory() as tmpdir:
+            producer = CineCastProducer.__new__(CineCastProducer)
+            producer.config = {"tts_batch_size": 4}
+            producer.script_dir = os.path.join(tmpdir, "scripts")
+            producer.cache_dir = os.path.join(tmpdir, "cache")
+            os.makedirs(producer.script_dir)
+            os.makedirs(producer.cache_dir)
+            producer.assets = mock.Mock()
+            producer.assets.get_voice_for_role.return_value = {"mode": "preset"}
+            script = [{"chunk_id": f"c{i}", "type": "narration", "speaker": "narrator",
+                       "content": f"第{i}句。"} for i in range(10)]
+            with open(os.path.join(producer.script_dir, "A_micro.json"), "w", encoding="utf-8") as f:
+                json.dump(script, f)
+            # c0 is already cached and must not be re-rendered
+            sf.write(os.path.join(producer.cache_dir, "c0.wav"), np.zeros(10, dtype=np.float32), 24000)
+
+            engine = mock.Mock()
+            engine.render_dry_batch.side_effect = lambda contents, cfg, paths: [True] * len(paths)
+            engine.render_dry_chunk.return_value = True
+            with mock.patch.object(producer, "_create_tts_engine", return_value=engine):
+                producer.phase_2_render_dry_audio()
+
+            sizes = [len(call.args[2]) for call in engine.render_dry_batch.call_args_list]
+            assert sizes == [4, 4]
+            engine.render_dry_chunk.assert_called_once()
+            assert engine.render_dry_chunk.call_args.args[2].endswith("c9.wav")
+
+
+def _phase2_producer(tmpdir, n_chunks):
+    try:
+        from main_producer import CineCastProducer
+    except ImportError:
+        pytest.skip("main_producer requires mlx (macOS-only)")
+    producer = CineCastProducer.__new__(CineCastProducer)
+    producer.config = {"tts_batch_size": 4}
+    producer.script_dir = os.path.join(tmpdir, "scripts")
+    producer.cache_dir = os.path.join(tmpdir, "cache")
+    os.makedirs(producer.script_dir)
+    os.makedirs(producer.cache_dir)
+    producer.assets = mock.Mock()
+    producer.assets.get_voice_for_role.return_value = {"mode": "preset", "audio": "n.wav", "text": "ref"}
+    script = [{"chunk_id": f"c{i}", "type": "narration", "speaker": "narrator",
+               "content": f"第{i}句。"} for i in range(n_chunks)]
+    with open(os.path.join(producer.script_dir, "A_micro.json"), "w", encoding="utf-8") as f:
+        json.dump(script, f)
+    return producer
+
+
+class TestPhase2Watchdog:
+    def test_unbatchable_voice_renders_per_chunk(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            producer = _phase2_producer(tmpdir, 4)
+            engine = mock.Mock()
+            engine.can_batch.return_value = False
+            engine.render_dry_chunk.return_value = True
+            with mock.patch.object(producer, "_create_tts_engine", return_value=engine):
+                producer.phase_2_render_dry_audio()
+            engine.render_dry_batch.assert_not_called()
+            assert engine.render_dry_chunk.call_count == 4
+
+    def test_timed_out_batch_is_rerendered_per_chunk(self):
+        import time
+        with tempfile.TemporaryDirectory() as tmpdir:
+            producer = _phase2_producer(tmpdir, 2)
+            hung, fresh = mock.Mock(), mock.Mock()
+            hung.render_dry_batch.side_effect = lambda contents, cfg, paths: time.sleep(0.3) or [True] * len(paths)
+            fresh.render_dry_chunk.return_value = True
+            with mock.patch.object(producer, "_create_tts_engine", side_effect=[hung, fresh]), \
+                    mock.patch("main_producer.ENGINE_COLD_START_THRESHOLD_SECONDS", 0.1), \
+                    mock.patch("main_producer.ENGINE_WARM_THRESHOLD_SECONDS", 0.1):
+                producer.phase_2_render_dry_audio()
+            hung.destroy.assert_called_once()
+            rerendered = [os.path.basename(call.args[2]) for call in fresh.render_dry_chunk.call_args_list]
+            assert rerendered == ["c0.wav", "c1.wav"]
+
+
+class TestPhase2CrossChapterBatching:
+    def test_tails_merge_across_chapters(self):
+        try:
+            from main_producer import CineCastProducer
+        except ImportError:
+            pytest.skip("main_producer requires mlx (macOS-only)")
+        with tempfile.TemporaryDirectory() as tmpdir:
+            producer = CineCastProducer.__new__(CineCastProducer)
+            producer.config = {"tts_batch_size": 4}
+            producer.script_dir = os.path.join(tmpdir, "scripts")
+            producer.cache_dir = os.path.join(tmpdir, "cache")
+            os.makedirs(producer.script_dir)
+            os.makedirs(producer.cache_dir)
+            producer.assets = mock.Mock()
+            producer.assets.get_voice_for_role.side_effect = lambda t, speaker, g: {"mode": "preset", "voice": speaker}
+            # three chapters, each with two lines from the same side character
+            for ch in "ABC":
+                script = [{"chunk_id": f"{ch}{i}", "type": "dialogue", "speaker": "老渔夫",
+                           "content": f"{ch}{i}。"} for i in range(2)]
+                with open(os.path.join(producer.script_dir, f"{ch}_micro.json"), "w", encoding="utf-8") as f:
+                    json.dump(script, f)
+
+            engine = mock.Mock()
+            engine.render_dry_batch.side_effect = lambda contents, cfg, paths: [True] * len(paths)
+            with mock.patch.object(producer, "_create_tts_engine", return_value=engine):
+                producer.phase_2_render_dry_audio()
+
+            batches = [[os.path.basename(p) for p in call.args[2]] for call in engine.render_dry_batch.call_args_list]
+            assert batches == [["A0.wav", "A1.wav", "B0.wav", "B1.wav"], ["C0.wav", "C1.wav"]]
+            engine.render_dry_chunk.assert_not_called()
+
+
+class TestWriteWav:
+    def test_single_write_matches_soundfile(self):
+        try:
+            from modules.mlx_tts_engine import write_wav
+        except ImportError:
+            pytest.skip("mlx_tts_engine requires mlx_audio")
+        with tempfile.TemporaryDirectory() as tmpdir:
+            data = (np.random.rand(48000).astype(np.float32) - 0.5) * 0.5
+            fast, ref = os.path.join(tmpdir, "fast.wav"), os.path.join(tmpdir, "ref.wav")
+            real_open = open
+            writes = []
+
+            def tracking_open(*args, **kwargs):
+                f = real_open(*args, **kwargs)
+                original = f.write
+                f.write = lambda b: writes.append(len(b)) or original(b)
+                return f
+
+            with mock.patch("builtins.open", tracking_open):
+                write_wav(fast, data, 24000)
+            sf.write(ref, data, 24000, format="WAV", subtype="PCM_16")
+            assert len(writes) == 1
+            with real_open(fast, "rb") as a, real_open(ref, "rb") as b:
+                assert a.read() == b.read()
@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+"""
+Tests for the persistent TTS daemon (modules.tts_daemon).
+
+Covers:
+- RemoteRenderEngine round-trips chunk / batch / warmup / can_batch requests over the Unix socket
+- The daemon flushes background writes before answering a batch request
+- A failing engine call is reported as ok=false instead of dropping the connection
+- Output paths outside the daemon's out_dir are rejected
+- The socket file is created owner-only (0600) and the default path is per user
+- ping() reports stale socket files as dead and answers while a render is in progress
+- ping() replies carry a config hash; a daemon started with another model/config is not matched
+- config_hash resolves relative model paths, so it does not depend on how they were spelled
+- launch() reuses a matching daemon, restarts one whose config hash differs and spawns with absolute paths
+- stop() force-kills a daemon that does not exit after shutdown
+- _create_tts_engine uses the daemon only when one is alive on tts_daemon_socket with the same config
+- The phase-2 watchdog restarts the daemon instead of reconnecting to the hung one
+"""
+
+import os
+import stat
+import sys
+import tempfile
+import threading
+from unittest import mock
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules import tts_daemon
+
+
+def _producer_hash(cache_dir):
+    # 与 TestProducerDaemonClient 中 producer 的 model_path / 引擎配置 / 缓存目录一致
+    return tts_daemon.config_hash("dummy", {}, cache_dir)
+
+
+class FakeEngine:
+    def __init__(self):
+        self.calls = []
+        self.release = threading.Event()
+        self.release.set()
+
+    def warmup(self, modes=None):
+        self.calls.append(("warmup", modes))
+
+    def render_dry_chunk(self, content, voice_cfg, save_path):
+        if content == "boom":
+            raise RuntimeError("metal lost")
+        self.release.wait()
+        self.calls.append(("chunk", content, voice_cfg["voice"], save_path))
+        return True
+
+    def can_batch(self, voice_cfg):
+        return voice_cfg.get("mode") == "design"
+
+    def render_dry_batch(self, contents, voice_cfg, save_paths):
+        self.calls.append(("batch", list(contents), save_paths))
+        return [True] * len(contents)
+
+    def wait_for_writes(self):
+        self.calls.append(("wait",))
+
+
+def _start_server(socket_path, engine, out_dir, config_hash):
+    server = tts_daemon._RenderServer(socket_path, engine, out_dir, config_hash)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+@pytest.fixture
+def daemon():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        socket_path = os.path.join(tmpdir, "tts.sock")
+        cache_dir = os.path.join(tmpdir, "cache")
+        os.makedirs(cache_dir)
+        engine = FakeEngine()
+        server = _start_server(socket_path, engine, cache_dir, _producer_hash(cache_dir))
+        try:
+            yield socket_path, engine, cache_dir
+        finally:
+            engine.release.set()
+            server.shutdown()
+            server.server_close()
+
+
+class TestRemoteRenderEngine:
+    def test_chunk_and_warmup_round_trip(self, daemon):
+        socket_path, engine, cache_dir = daemon
+        out = os.path.join(cache_dir, "c1.wav")
+        client = tts_daemon.RemoteRenderEngine(socket_path)
+        client.warmup(["preset", "clone"])
+        assert client.render_dry_chunk("夜幕降临。", {"mode": "preset", "voice": "aiden"}, out) is True
+        client.destroy()
+        assert engine.calls == [("warmup", ["preset", "clone"]),
+                                ("chunk", "夜幕降临。", "aiden", out)]
+
+    def test_batch_waits_for_writes_before_reply(self, daemon, monkeypatch):
+        socket_path, engine, cache_dir = daemon
+        monkeypatch.chdir(cache_dir)
+        client = tts_daemon.RemoteRenderEngine(socket_path)
+        assert client.render_dry_batch(["甲。", "乙。"], {"voice": "aiden"}, ["a.wav", "b.wav"]) == [True, True]
+        client.close()
+        assert engine.calls[-1] == ("wait",)
+        assert engine.calls[0][2] == [os.path.abspath("a.wav"), os.path.abspath("b.wav")]
+
+    def test_can_batch_round_trip(self, daemon):
+        socket_path, _, _ = daemon
+        client = tts_daemon.RemoteRenderEngine(socket_path)
+        assert client.can_batch({"mode": "design", "instruct": "x"}) is True
+        assert client.can_batch({"mode": "preset", "audio": "n.wav"}) is False
+        client.close()
+
+    def test_engine_error_is_reported(self, daemon):
+        socket_path, _, cache_dir = daemon
+        client = tts_daemon.RemoteRenderEngine(socket_path)
+        assert client.render_dry_chunk("boom", {"voice": "aiden"}, os.path.join(cache_dir, "x.wav")) is False
+        # the connection survives the failed request
+        assert client.render_dry_chunk("好。", {"voice": "aiden"}, os.path.join(cache_dir, "y.wav")) is True
+        client.close()
+
+    def test_rejects_out_paths_outside_cache_dir(self, daemon):
+        socket_path, engine, cache_dir = daemon
+        client = tts_daemon.RemoteRenderEngine(socket_path)
+        escape = os.path.join(cache_dir, "..", "evil.wav")
+        assert client.render_dry_chunk("好。", {"voice": "aiden"}, escape) is False
+        assert client.render_dry_batch(["甲。", "乙。"], {"voice": "aiden"},
+                                       [os.path.join(cache_dir, "a.wav"), "/etc/evil.wav"]) == [False, False]
+        client.close()
+        assert engine.calls == []
+
+    def test_socket_is_owner_only(self, daemon):
+        socket_path, _, _ = daemon
+        assert stat.S_IMODE(os.stat(socket_path).st_mode) == 0o600
+
+    def test_default_socket_path_is_per_user(self, tmp_path):
+        with mock.patch.dict(os.environ, {"XDG_RUNTIME_DIR": str(tmp_path)}):
+            assert tts_daemon._default_socket_path() == str(tmp_path / "cinecast_tts.sock")
+        with mock.patch.dict(os.environ, {"XDG_RUNTIME_DIR": ""}):
+            assert tts_daemon._default_socket_path() == f"/tmp/cinecast_tts-{os.getuid()}.sock"
+
+    def test_ping(self, daemon):
+        socket_path, _, _ = daemon
+        assert tts_daemon.ping(socket_path) is True
+
+    def test_ping_answers_during_render(self, daemon):
+        socket_path, engine, cache_dir = daemon
+        engine.release.clear()
+        client = tts_daemon.RemoteRenderEngine(socket_path)
+        worker = threading.Thread(target=client.render_dry_chunk,
+                                  args=("好。", {"voice": "aiden"}, os.path.join(cache_dir, "y.wav")))
+        worker.start()
+        try:
+            assert tts_daemon.ping(socket_path) is True
+        finally:
+            engine.release.set()
+            worker.join()
+            client.close()
+
+    def test_ping_stale_socket_file(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            stale = os.path.join(tmpdir, "tts.sock")
+            open(stale, "w").close()
+            assert tts_daemon.ping(stale) is False
+            assert tts_daemon.ping(os.path.join(tmpdir, "missing.sock")) is False
+
+    def test_ping_checks_config_hash(self, daemon):
+        socket_path, _, cache_dir = daemon
+        assert tts_daemon.ping(socket_path, expected_hash=_producer_hash(cache_dir)) is True
+        other = tts_daemon.config_hash("dummy", {"tts_precision": "int8"}, cache_dir)
+        assert other != _producer_hash(cache_dir)
+        assert tts_daemon.ping(socket_path, expected_hash=other) is False
+
+
+class TestConfigHash:
+    def test_relative_and_absolute_paths_match(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        rel = tts_daemon.config_hash("models/m", {"model_path_base": "./models/base"}, "cache")
+        absolute = tts_daemon.config_hash(str(tmp_path / "models/m"),
+                                          {"model_path_base": str(tmp_path / "models/base")},
+                                          str(tmp_path / "cache"))
+        assert rel == absolute
+
+    def test_working_directory_changes_hash(self, tmp_path, monkeypatch):
+        (tmp_path / "a").mkdir()
+        (tmp_path / "b").mkdir()
+        monkeypatch.chdir(tmp_path / "a")
+        first = tts_daemon.config_hash("models/m", {}, str(tmp_path / "cache"))
+        monkeypatch.chdir(tmp_path / "b")
+        assert tts_daemon.config_hash("models/m", {}, str(tmp_path / "cache")) != first
+
+
+class TestLaunch:
+    def test_reuses_matching_daemon(self, daemon):
+        socket_path, _, cache_dir = daemon
+        with mock.patch("modules.tts_daemon.subprocess.Popen") as popen:
+            assert tts_daemon.launch(socket_path, "dummy", {}, cache_dir) is True
+        popen.assert_not_called()
+
+    def test_restarts_daemon_with_other_config(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            socket_path = os.path.join(tmpdir, "tts.sock")
+            old = tts_daemon._RenderServer(socket_path, FakeEngine(), tmpdir, "stale")
+
+            def serve_old():
+                # 与 serve() 的收尾一致：退出后关闭监听并删除 socket 文件
+                old.serve_forever()
+                old.server_close()
+                os.remove(socket_path)
+
+            threading.Thread(target=serve_old, daemon=True).start()
+            config = {"tts_precision": "int8", "model_path_base": "models/base"}
+            new_hash = tts_daemon.config_hash("dummy", config, tmpdir)
+            servers = []
+
+            def fake_popen(cmd, **kwargs):
+                servers.append(_start_server(socket_path, FakeEngine(), tmpdir, new_hash))
+                return mock.Mock(poll=mock.Mock(return_value=None))
+
+            # 测试中的"守护进程"就是当前进程：以 socket 是否还在代替 pid 存活检查
+            with mock.patch("modules.tts_daemon.subprocess.Popen", side_effect=fake_popen) as popen, \
+                    mock.patch("modules.tts_daemon._pid_alive", lambda pid: os.path.exists(socket_path)):
+                assert tts_daemon.launch(socket_path, "dummy", config, tmpdir) is True
+            popen.assert_called_once()
+            cmd = popen.call_args.args[0]
+            assert cmd[cmd.index("--model-path") + 1] == os.path.abspath("dummy")
+            assert '"model_path_base": "%s"' % os.path.abspath("models/base") in cmd[cmd.index("--config") + 1]
+            assert cmd[cmd.index("--out-dir") + 1] == os.path.realpath(tmpdir)
+            assert tts_daemon.ping(socket_path, expected_hash=new_hash) is True
+            for server in servers:
+                server.shutdown()
+                server.server_close()
+
+
+class TestStop:
+    def test_kills_daemon_that_does_not_exit(self, daemon):
+        socket_path, _, _ = daemon
+        with mock.patch("modules.tts_daemon._pid_alive", return_value=True), \
+                mock.patch("modules.tts_daemon.os.kill") as kill:
+            tts_daemon.stop(socket_path, timeout=0.2)
+        kill.assert_called_once_with(os.getpid(), tts_daemon.signal.SIGKILL)
+
+
+class TestProducerDaemonClient:
+    def _producer(self, socket_path, cache_dir="/nonexistent/cache"):
+        try:
+            from main_producer import CineCastProducer
+        except ImportError:
+            pytest.skip("main_producer requires mlx (macOS-only)")
+        producer = CineCastProducer.__new__(CineCastProducer)
+        producer.config = {"model_path": "dummy", "tts_daemon_socket": socket_path}
+        producer.cache_dir = cache_dir
+        return producer
+
+    def test_uses_live_daemon(self, daemon):
+        socket_path, _, cache_dir = daemon
+        producer = self._producer(socket_path, cache_dir)
+        with mock.patch("main_producer.MLXRenderEngine") as local:
+            engine = producer._create_tts_engine()
+        local.assert_not_called()
+        assert isinstance(engine, tts_daemon.RemoteRenderEngine)
+        engine.destroy()
+
+    def test_falls_back_to_local_engine(self):
+        producer = self._producer("/nonexistent/tts.sock")
+        with mock.patch("main_producer.MLXRenderEngine") as local:
+            producer._create_tts_engine()
+        local.assert_called_once_with("dummy", config={})
+
+    def test_refuses_daemon_with_other_config(self, daemon):
+        socket_path, _, cache_dir = daemon
+        producer = self._producer(socket_path, cache_dir)
+        producer.config["tts_precision"] = "int8"
+        with mock.patch("main_producer.MLXRenderEngine") as local:
+            producer._create_tts_engine()
+        local.assert_called_once_with("dummy", config={"tts_precision": "int8"})
+
+    def test_refuses_daemon_for_other_cache_dir(self, daemon):
+        socket_path, _, _ = daemon
+        producer = self._producer(socket_path, "/elsewhere/cache")
+        with mock.patch("main_producer.MLXRenderEngine") as local:
+            producer._create_tts_engine()
+        local.assert_called_once()
+
+    def test_watchdog_restarts_daemon(self, daemon):
+        socket_path, _, cache_dir = daemon
+        producer = self._producer(socket_path, cache_dir)
+        client = tts_daemon.RemoteRenderEngine(socket_path)
+        with mock.patch("main_producer.tts_daemon.stop") as stop, \
+                mock.patch.object(producer, "ensure_tts_daemon") as ensure, \
+                mock.patch.object(producer, "_create_tts_engine") as create:
+            assert producer._restart_tts_engine(client) is create.return_value
+        stop.assert_called_once_with(socket_path)
+        ensure.assert_called_once()
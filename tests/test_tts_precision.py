@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Tests for the configurable TTS weight precision in MLXRenderEngine.
+
+Covers:
+- bf16 casts floating-point weights
+- int8 / int4 quantize Linear layers
+- Already-quantized (4bit) models and unset precision are left untouched
+- tts_precision from the producer config reaches the model loaded by _create_tts_engine
+"""
+
+import os
+import sys
+from unittest import mock
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+mx = pytest.importorskip("mlx.core")
+nn = pytest.importorskip("mlx.nn")
+
+
+def _engine(precision):
+    try:
+        from modules.mlx_tts_engine import MLXRenderEngine
+    except ImportError:
+        pytest.skip("mlx_tts_engine requires mlx_audio")
+    engine = MLXRenderEngine.__new__(MLXRenderEngine)
+    engine.precision = precision
+    return engine
+
+
+class _Tiny(nn.Module):
+    def __init__(self):
+        super().__init__()
+        self.proj = nn.Linear(64, 64)
+
+
+class TestApplyPrecision:
+    def test_unset_keeps_dtype(self):
+        model = _Tiny()
+        _engine(None)._apply_precision(model)
+        assert model.proj.weight.dtype == mx.float32
+
+    def test_bf16(self):
+        model = _Tiny()
+        _engine("bf16")._apply_precision(model)
+        assert model.proj.weight.dtype == mx.bfloat16
+
+    def test_int8(self):
+        model = _Tiny()
+        _engine("int8")._apply_precision(model)
+        assert isinstance(model.proj, nn.QuantizedLinear)
+        assert model.proj.bits == 8
+
+    def test_int4(self):
+        model = _Tiny()
+        _engine("int4")._apply_precision(model)
+        assert isinstance(model.proj, nn.QuantizedLinear)
+        assert model.proj.bits == 4
+
+    def test_prequantized_model_untouched(self):
+        model = _Tiny()
+        nn.quantize(model, group_size=64, bits=4)
+        _engine("int8")._apply_precision(model)
+        assert model.proj.bits == 4
+
+
+class TestPrecisionConfigThreading:
+    def _create_engine(self, model, **overrides):
+        try:
+            from main_producer import CineCastProducer
+        except ImportError:
+            pytest.skip("main_producer requires mlx (macOS-only)")
+        producer = CineCastProducer.__new__(CineCastProducer)
+        producer.config = dict(producer._get_default_config(), **overrides)
+        with mock.patch("modules.mlx_tts_engine.load_model", return_value=model):
+            return producer._create_tts_engine()
+
+    def test_int8_quantizes_loaded_model(self):
+        model = _Tiny()
+        with mock.patch("modules.mlx_tts_engine.nn.quantize") as quantize:
+            engine = self._create_engine(model, tts_precision="int8")
+        engine.destroy()
+        quantize.assert_called_once_with(model, group_size=64, bits=8)
+
+    def test_bf16_casts_loaded_model(self):
+        model = _Tiny()
+        with mock.patch.object(_Tiny, "set_dtype", autospec=True) as set_dtype:
+            engine = self._create_engine(model, tts_precision="bf16")
+        engine.destroy()
+        set_dtype.assert_called_once_with(model, mx.bfloat16)
+
+    def test_default_config_keeps_model_precision(self):
+        model = _Tiny()
+        with mock.patch("modules.mlx_tts_engine.nn.quantize") as quantize, \
+                mock.patch.object(_Tiny, "set_dtype", autospec=True) as set_dtype:
+            engine = self._create_engine(model)
+        engine.destroy()
+        quantize.assert_not_called()
+        set_dtype.assert_not_called()
@@ -7,12 +7,16 @@ Covers:
 - Single .md file is read correctly as a single-chapter dict
 - Non-UTF-8 encoded TXT file returns False gracefully
 - TXT directory mode still works as before
+- TXT directory listing skips sub-directories whose names end in .txt
+- TXT directory chapters are read one at a time with no handle held across yields
+- _read_text_file decodes large files from mmap with read_text semantics
 - Preview mode works with a single TXT file
 """
 
 import os
 import sys
 import tempfile
+from unittest import mock
 
 import pytest
 
@@ -122,11 +126,80 @@ class TestTxtDirectoryModeUnchanged:
             scripts = [f for f in os.listdir(producer.script_dir) if f.endswith("_micro.json")]
             assert len(scripts) == 2
 
+    def test_directory_named_like_txt_is_skipped(self, monkeypatch):
+        from modules.llm_director import LLMScriptDirector
+        with tempfile.TemporaryDirectory() as tmpdir:
+            producer = _make_producer(tmpdir)
+            producer.config["llm_api_key"] = "sk-test"
+            monkeypatch.chdir(tmpdir)
+            monkeypatch.setattr(LLMScriptDirector, "_test_api_connection", lambda self: True)
+
+            input_dir = os.path.join(tmpdir, "chapters")
+            os.makedirs(os.path.join(input_dir, "attachments.txt"))
+            with open(os.path.join(input_dir, "ch01.txt"), "w", encoding="utf-8") as f:
+                f.write("第1章\n这是第1章的内容。" * 20)
+
+            assert producer.phase_1_generate_scripts(input_dir) is True
+            assert os.listdir(producer.script_dir).count("ch01_micro.json") == 1
+            assert not any(f.startswith("attachments") for f in os.listdir(producer.script_dir))
+
 
 # ---------------------------------------------------------------------------
 # Test: Preview mode with single TXT file
 # ---------------------------------------------------------------------------
 
+class TestIterTextChapters:
+    def test_reads_lazily_and_closes_before_yield(self):
+        try:
+            from main_producer import CineCastProducer
+        except ImportError:
+            pytest.skip("main_producer requires mlx (macOS-only)")
+        with tempfile.TemporaryDirectory() as tmpdir:
+            for name in ("a.txt", "b.txt"):
+                with open(os.path.join(tmpdir, name), "w", encoding="utf-8") as f:
+                    f.write(f"{name} 内容")
+            chapters = CineCastProducer._iter_text_chapters(tmpdir, ["a.txt", "b.txt"])
+            assert next(chapters) == ("a", "a.txt 内容")
+            # the generator is suspended; the next file can be removed (no open handle / not read yet)
+            os.remove(os.path.join(tmpdir, "a.txt"))
+            with open(os.path.join(tmpdir, "b.txt"), "w", encoding="utf-8") as f:
+                f.write("edited")
+            assert next(chapters) == ("b", "edited")
+
+
+class TestReadTextFile:
+    def _reader(self):
+        try:
+            import main_producer
+        except ImportError:
+            pytest.skip("main_producer requires mlx (macOS-only)")
+        return main_producer
+
+    def test_large_file_matches_read_text(self):
+        mp = self._reader()
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "big.txt")
+            with open(path, "w", encoding="utf-8", newline="") as f:
+                f.write("夜幕降临港口。\n" * 20000)
+            assert os.path.getsize(path) >= mp.TEXT_MMAP_MIN_BYTES
+            with mock.patch.object(mp.mmap, "mmap", wraps=mp.mmap.mmap) as mapped:
+                assert mp._read_text_file(path) == "夜幕降临港口。\n" * 20000
+            mapped.assert_called_once()
+
+    def test_crlf_and_invalid_utf8(self):
+        mp = self._reader()
+        with tempfile.TemporaryDirectory() as tmpdir:
+            crlf = os.path.join(tmpdir, "crlf.txt")
+            with open(crlf, "wb") as f:
+                f.write("第一章\r\n".encode("utf-8") * 10000)
+            assert mp._read_text_file(crlf) == "第一章\n" * 10000
+            bad = os.path.join(tmpdir, "gbk.txt")
+            with open(bad, "wb") as f:
+                f.write("第一章 风雪".encode("gbk") * 10000)
+            with pytest.raises(UnicodeDecodeError):
+                mp._read_text_file(bad)
+
+
 class TestPreviewWithSingleTxt:
     def test_preview_mode_single_txt(self):
         """Preview mode should work with a single .txt file (is_preview=True)."""
@@ -4,9 +4,11 @@ Tests for voice consistency fixes.
 
 Covers:
 - AssetManager voice config: "narration" key exists and maps to narrator voice
+- Default voices are built per instance from the module template (no shared dicts)
 - get_voice_for_role: gender=None defaults to "male"
 - get_voice_for_role: dialogue without speaker_name returns narrator (not random)
 - get_voice_for_role: same speaker always returns the same voice (hash-based)
+- get_voice_for_role: same speaker gets the same voice across fresh AssetManager instances
 - get_voice_for_role: narration type always returns the same voice config
 """
 
@@ -55,6 +57,19 @@ class TestNarrationVoiceKey:
         voice = manager.get_voice_for_role("narration")
         assert voice["audio"] == manager.voices["narrator"]["audio"]
 
+    def test_default_voices_independent_per_instance(self, tmp_path):
+        import modules.asset_manager as am
+        a = AssetManager(asset_dir=str(tmp_path / "a"))
+        b = AssetManager(asset_dir=str(tmp_path / "b"))
+        assert a.voices["narrator"]["audio"] == f"{tmp_path / 'a'}/voices/narrator.wav"
+        assert isinstance(a.voices["male_pool"], list)
+        a.voices["male_pool"][0]["text"] = "改过"
+        a.voices["narration"]["speed"] = 2.0
+        assert b.voices["male_pool"][0]["text"] != "改过"
+        assert b.voices["narration"]["speed"] == 1.0
+        assert a.voices["narrator"] is not a.voices["narration"]
+        assert am._DEFAULT_VOICES["narrator"]["audio"] == "voices/narrator.wav"
+
 
 # ---------------------------------------------------------------------------
 # Pure narrator mode: all narration chunks get the same voice
@@ -117,6 +132,20 @@ class TestDialogueVoiceConsistency:
         for v in voices[1:]:
             assert v["audio"] == first["audio"]
 
+    def test_same_speaker_same_voice_across_instances(self, tmp_path):
+        """A fresh AssetManager (e.g. a resumed run) assigns every speaker the same voice again."""
+        voices_dir = tmp_path / "voices"
+        voices_dir.mkdir()
+        for name in ("narrator.wav", "m1.wav", "m2.wav", "f1.wav", "f2.wav"):
+            (voices_dir / name).write_bytes(b"RIFF" + b"\x00" * 40)
+        speakers = [("老渔夫", "male"), ("艾米莉", "female"), ("路人甲", None), ("新角色", "female")]
+
+        def assign():
+            mgr = AssetManager(asset_dir=str(tmp_path))
+            return [mgr.get_voice_for_role("dialogue", name, gender)["audio"] for name, gender in speakers]
+
+        assert assign() == assign()
+
     def test_different_speakers_can_differ(self, manager):
         """Different speaker names may get different voices."""
         # Just verify they are both valid, not necessarily different
@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+Tests for the mmap-backed WAV cache reader used in phase 3.
+
+Covers:
+- stream_wav returns the same PCM data as pydub's own WAV reader
+- PCM_16 cache files are read without pydub.from_file or any ffmpeg/ffprobe subprocess
+- Unsupported encodings fall back to AudioSegment.from_file
+- process_from_cache reads dry-voice WAVs through stream_wav
+- process_from_cache trusts a pre-scanned cached_wavs set instead of stat-ing
+- process_from_cache no longer resolves a voice config per chunk
+- The volume buffer accumulates chunks and joins once, byte-identical to buffer += audio
+- Per-speaker Audacity tracks accumulate chunks too, byte-identical to the old track += padding
+- Inter-line pauses reuse a cached, pre-resampled silence instead of segment + AudioSegment.silent per line
+"""
+
+import os
+import sys
+import tempfile
+from unittest import mock
+
+import numpy as np
+import soundfile as sf
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pydub import AudioSegment
+
+from modules.cinematic_packager import CinematicPackager
+
+
+def _write_wav(path, n_samples=24000, subtype=None):
+    data = (np.random.rand(n_samples).astype(np.float32) - 0.5) * 0.5
+    sf.write(path, data, 24000, format="WAV", subtype=subtype)
+
+
+class TestStreamWav:
+    def test_matches_pydub_decode(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "chunk.wav")
+            _write_wav(path)
+            fast = CinematicPackager.stream_wav(path)
+            ref = AudioSegment.from_file(path, format="wav")
+            assert fast.raw_data == ref.raw_data
+            assert (fast.frame_rate, fast.sample_width, fast.channels) == (
+                ref.frame_rate, ref.sample_width, ref.channels)
+
+    def test_pcm16_read_without_subprocess(self):
+        import pydub.audio_segment as pydub_segment
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "chunk.wav")
+            _write_wav(path)
+            with mock.patch.object(pydub_segment.subprocess, "Popen") as popen, \
+                    mock.patch.object(AudioSegment, "from_file") as from_file:
+                audio = CinematicPackager.stream_wav(path)
+            popen.assert_not_called()
+            from_file.assert_not_called()
+            expected, _ = sf.read(path, dtype="int16")
+            assert np.array_equal(np.frombuffer(audio.raw_data, dtype=np.int16), expected)
+
+    def test_float_wav_falls_back(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "chunk.wav")
+            _write_wav(path, subtype="FLOAT")
+            sentinel = AudioSegment.silent(duration=10)
+            with mock.patch.object(AudioSegment, "from_file", return_value=sentinel) as from_file:
+                assert CinematicPackager.stream_wav(path) is sentinel
+            from_file.assert_called_once_with(path, format="wav")
+
+    def test_process_from_cache_uses_stream_wav(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            cache_dir = os.path.join(tmpdir, "cache")
+            os.makedirs(cache_dir)
+            _write_wav(os.path.join(cache_dir, "c1.wav"))
+            p = CinematicPackager(os.path.join(tmpdir, "out"))
+            assets = mock.Mock()
+            assets.get_voice_for_role.return_value = {"speed": 1.0}
+            script = [{"chunk_id": "c1", "type": "narration", "speaker": "narrator", "content": "x"}]
+            with mock.patch.object(CinematicPackager, "stream_wav",
+                                   wraps=CinematicPackager.stream_wav) as sw, \
+                    mock.patch.object(CinematicPackager, "finalize"):
+                p.process_from_cache(script, cache_dir, assets)
+            sw.assert_called_once_with(os.path.join(cache_dir, "c1.wav"))
+            assert len(p.buffer) > 1000
+
+    def test_cached_wavs_set_skips_exists_check(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            cache_dir = os.path.join(tmpdir, "cache")
+            os.makedirs(cache_dir)
+            _write_wav(os.path.join(cache_dir, "c1.wav"))
+            _write_wav(os.path.join(cache_dir, "c2.wav"))
+            p = CinematicPackager(os.path.join(tmpdir, "out"))
+            assets = mock.Mock()
+            assets.get_voice_for_role.return_value = {"speed": 1.0}
+            script = [{"chunk_id": c, "type": "narration", "speaker": "narrator", "content": "x"}
+                      for c in ("c1", "c2")]
+            with mock.patch.object(CinematicPackager, "stream_wav",
+                                   wraps=CinematicPackager.stream_wav) as sw, \
+                    mock.patch.object(CinematicPackager, "finalize"), \
+                    mock.patch("modules.cinematic_packager.os.path.exists", return_value=False) as exists:
+                p.process_from_cache(script, cache_dir, assets, cached_wavs={"c1.wav"})
+            sw.assert_called_once_with(os.path.join(cache_dir, "c1.wav"))
+            # only the up-front volume check stats the filesystem
+            assert exists.call_count == 1
+
+    def test_process_from_cache_skips_voice_lookup(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            cache_dir = os.path.join(tmpdir, "cache")
+            os.makedirs(cache_dir)
+            _write_wav(os.path.join(cache_dir, "c1.wav"))
+            p = CinematicPackager(os.path.join(tmpdir, "out"))
+            assets = mock.Mock()
+            script = [{"chunk_id": "c1", "type": "dialogue", "speaker": "老渔夫", "content": "x"}]
+            with mock.patch.object(CinematicPackager, "finalize"):
+                p.process_from_cache(script, cache_dir, assets)
+            assets.get_voice_for_role.assert_not_called()
+
+
+class TestVolumeBuffer:
+    def _segments(self):
+        rng = np.random.default_rng(0)
+        return [AudioSegment(rng.integers(-3000, 3000, n).astype(np.int16).tobytes(),
+                             sample_width=2, frame_rate=24000, channels=1)
+                for n in (2400, 4801, 1200)]
+
+    def test_join_matches_concatenation(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            p = CinematicPackager(tmpdir)
+            expected = AudioSegment.empty()
+            for seg in self._segments():
+                piece = seg + AudioSegment.silent(duration=250)
+                expected += piece
+                p._append_to_buffer(piece)
+                assert p._buffer_ms() == len(expected)
+            assert len(p._chunks) == 3
+            assert p.buffer.raw_data == expected.raw_data
+            assert p.buffer.frame_rate == 24000 and len(p._chunks) == 1
+
+    def test_add_audio_defers_concatenation(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            p = CinematicPackager(tmpdir)
+            first, *rest = self._segments()
+            p.add_audio(first)
+            with mock.patch.object(AudioSegment, "__add__", side_effect=AssertionError("concat")):
+                for seg in rest * 50:
+                    p.add_audio(seg)
+            assert len(p._chunks) == 101
+            assert p.get_buffer_status()["buffer_length_ms"] == len(p.buffer)
+
+    def test_format_change_falls_back_to_pydub(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            p = CinematicPackager(tmpdir)
+            first, second = self._segments()[0], AudioSegment.silent(duration=100, frame_rate=16000)
+            p._append_to_buffer(first)
+            p._append_to_buffer(second)
+            assert p.buffer.raw_data == (AudioSegment.empty() + first + second).raw_data
+            p.buffer = AudioSegment.empty()
+            assert p._buffer_ms() == 0 and p._chunks == []
+
+
+class TestSpeakerTracks:
+    def _reference_tracks(self, segments, micro_script):
+        from modules.cinematic_packager import CROSS_SPEAKER_PAUSE_MS, SAME_SPEAKER_PAUSE_MS
+        tracks, timeline, prev = {}, 0, None
+        for seg, item in zip(segments, micro_script):
+            speaker = item["speaker"]
+            pause = SAME_SPEAKER_PAUSE_MS if speaker == prev else max(item.get("pause_ms", 0),
+                                                                      CROSS_SPEAKER_PAUSE_MS)
+            prev = speaker
+            if speaker not in tracks:
+                tracks[speaker] = AudioSegment.silent(duration=timeline)
+            elif len(tracks[speaker]) < timeline:
+                tracks[speaker] += AudioSegment.silent(duration=timeline - len(tracks[speaker]))
+            tracks[speaker] += seg
+            timeline += len(seg) + pause
+        return tracks
+
+    def test_volume_pauses_reuse_cached_silence(self):
+        import modules.cinematic_packager as cp
+        rng = np.random.default_rng(2)
+        speakers = ["narrator", "narrator", "老渔夫", "narrator", "narrator", "老渔夫"]
+        segments = {f"c{i}": AudioSegment(rng.integers(-3000, 3000, 4000 + 37 * i).astype(np.int16).tobytes(),
+                                          sample_width=2, frame_rate=24000, channels=1)
+                    for i in range(len(speakers))}
+        micro_script = [{"chunk_id": f"c{i}", "speaker": sp} for i, sp in enumerate(speakers)]
+        expected = AudioSegment.empty()
+        prev = None
+        for item in micro_script:
+            pause = cp.SAME_SPEAKER_PAUSE_MS if item["speaker"] == prev else cp.CROSS_SPEAKER_PAUSE_MS
+            prev = item["speaker"]
+            expected += segments[item["chunk_id"]] + AudioSegment.silent(duration=pause)
+        cp._synced_silence.cache_clear()
+        with tempfile.TemporaryDirectory() as tmpdir:
+            p = CinematicPackager(tmpdir)
+            for chunk_id, seg in segments.items():
+                seg.export(os.path.join(tmpdir, f"{chunk_id}.wav"), format="wav")
+            with mock.patch.object(p, "finalize"):
+                p.process_from_cache(micro_script, tmpdir, None, cached_wavs={f"{c}.wav" for c in segments})
+            assert p.buffer.raw_data == expected.raw_data
+        assert cp._synced_silence.cache_info().misses == 2  # 250ms + 500ms
+
+    def test_tracks_match_concatenation(self):
+        rng = np.random.default_rng(1)
+        speakers = ["narrator", "老渔夫", "narrator", "narrator", "年轻人", "老渔夫", "narrator"]
+        segments = [AudioSegment(rng.integers(-3000, 3000, n).astype(np.int16).tobytes(),
+                                 sample_width=2, frame_rate=24000, channels=1)
+                    for n in rng.integers(2000, 30000, len(speakers))]
+        micro_script = [{"chunk_id": f"c{i}", "speaker": sp, "pause_ms": 300}
+                        for i, sp in enumerate(speakers)]
+        with tempfile.TemporaryDirectory() as tmpdir:
+            p = CinematicPackager(tmpdir)
+            for i, seg in enumerate(segments):
+                seg.export(os.path.join(tmpdir, f"c{i}.wav"), format="wav")
+            with mock.patch.object(p, "finalize"):
+                p.process_from_cache(micro_script, tmpdir, None, cached_wavs={f"c{i}.wav" for i in range(7)})
+            expected = self._reference_tracks(segments, micro_script)
+            assert set(p._speaker_tracks) == set(expected)
+            for speaker, track in p._speaker_tracks.items():
+                assert len(track) == len(expected[speaker])
+                assert track.to_segment().raw_data == expected[speaker].raw_data
+                assert track.to_segment().frame_rate == 24000
@@ -358,14 +358,10 @@ def extract_preview_sentences(book_file, num_sentences=10):
     text = ""
     try:
         if file_path.lower().endswith(".epub"):
-            import ebooklib
-            from ebooklib import epub
-            from bs4 import BeautifulSoup
-
-            book = epub.read_epub(file_path)
-            for item in book.get_items_of_type(ebooklib.ITEM_DOCUMENT):
-                soup = BeautifulSoup(item.get_body_content(), "html.parser")
-                chapter_text = soup.get_text(separator="\n").strip()
+            from modules.epub_extractor import iter_epub_documents, parse_chapter
+
+            for raw in iter_epub_documents(file_path):
+                chapter_text = parse_chapter(raw)
                 if len(chapter_text) > 100:
                     text = chapter_text
                     break
@@ -738,8 +734,7 @@ def run_cinecast(epub_file, mode_choice,
             mp3 = producer.run_preview_mode(epub_file.name, preview_text=preview_text)
             return mp3, "✅ 试听生成成功！(已应用全局外脑设定)"
         else:
-            if producer.phase_1_generate_scripts(epub_file.name):
-                producer.phase_2_render_dry_audio()
+            if producer.run_script_and_render(epub_file.name):
                 producer.phase_3_cinematic_mix()
                 # 🌟 混音完成后自动进行无头质检
                 qc_report = run_headless_qc(config["output_dir"])